@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline de documentación EBI 360
+Mide markdown_to_html, create_professional_html y la conversión con pandoc
+por ebi_docs.pandoc (sin cache y desde el cache de AST, con pandoc server si hay)
+sobre el corpus real de .agent y sobre documentos sintéticos 1×, 10× y 100×
+"""
+
+import argparse
+import atexit
+import glob
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ebi_docs import pandoc
+from ebi_docs.manifest import CACHE_DIR
+from ebi_docs.markdown import markdown_to_html
+from generate_html_guides import create_professional_html
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = CACHE_DIR / "bench-baseline.json"
+SCALES = (1, 10, 100)
+
+WORDS = (
+    "bienestar", "encuesta", "dominio", "colaborador", "empresa", "reporte",
+    "pregunta", "severidad", "peso", "área", "índice", "evaluación", "plan",
+)
+
+
+def synthetic_markdown(scale, seed=360):
+    """Documento con la mezcla de bloques de las guías, repetido `scale` veces"""
+    rnd = random.Random(seed)
+
+    def sentence(n=12):
+        return " ".join(rnd.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+    blocks = []
+    for section in range(40):
+        blocks.append(f"## Sección {section}")
+        blocks.append(f"{sentence()} **{sentence(3)}** con *énfasis* y `codigo_{section}`.")
+        blocks.append("")
+        blocks.extend(f"- {sentence(6)} [link](#s{section}-{i})" for i in range(5))
+        blocks.append("")
+        blocks.extend(f"{i}. {sentence(5)}" for i in range(1, 4))
+        blocks.append("- [ ] Tarea pendiente")
+        blocks.append("- [x] Tarea lista")
+        blocks.append("```sql")
+        blocks.append("SELECT * FROM survey_responses;")
+        blocks.append("```")
+        blocks.append("")
+    unit = "\n".join(blocks) + "\n"
+    return unit * scale
+
+
+def datasets():
+    """{nombre: [(ruta o None, texto)]}"""
+    corpus = []
+    for path in sorted(glob.glob(f"{AGENT_DIR}/**/*.md", recursive=True)):
+        with open(path, 'r', encoding='utf-8') as f:
+            corpus.append((path, f.read()))
+    result = {"corpus": corpus}
+    for scale in SCALES:
+        result[f"synthetic-{scale}x"] = [(None, synthetic_markdown(scale))]
+    return result
+
+
+def stage_markdown(path, text, workdir):
+    markdown_to_html(text)
+
+
+def _source(text, workdir):
+    # Una fuente por documento, escrita una sola vez fuera de la medición
+    source = workdir / f"{hashlib.sha1(text.encode('utf-8')).hexdigest()}.md"
+    if not source.exists():
+        source.write_text(text, encoding='utf-8')
+    return source
+
+
+def stage_template(path, text, workdir):
+    source = _source(text, workdir)
+    create_professional_html(source, source.with_suffix(".html"), "Benchmark", "EBI 360", "#6366f1")
+
+
+def stage_pandoc(path, text, workdir):
+    # Sin cache: parseo a AST y AST a HTML por ebi_docs.pandoc (servidor o subprocess)
+    ast = pandoc._convert(text, pandoc.READER_ARGS[1], "json")
+    pandoc._convert(ast, "json", "html")
+
+
+def stage_pandoc_cached(path, text, workdir):
+    # Lo que paga un build sin cambios: el AST y el HTML salen del cache
+    pandoc.ast_to_html(pandoc.markdown_ast(_source(text, workdir)))
+
+
+STAGES = {
+    "markdown_to_html": stage_markdown,
+    "create_professional_html": stage_template,
+    "pandoc": stage_pandoc,
+    "pandoc_cached": stage_pandoc_cached,
+}
+PANDOC_STAGES = ("pandoc", "pandoc_cached")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def measure(stage, docs, repeat, workdir):
+    latencies = []
+    total_bytes = 0
+    total_time = 0.0
+    for path, text in docs:
+        size = len(text.encode('utf-8'))
+        stage(path, text, workdir)  # calentamiento
+        for _ in range(repeat):
+            start = time.perf_counter()
+            stage(path, text, workdir)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed * 1000)
+            total_bytes += size
+            total_time += elapsed
+    return {
+        "documents": len(docs),
+        "bytes": total_bytes // repeat,
+        "mb_per_s": round(total_bytes / total_time / 1e6, 3) if total_time else None,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p90_ms": round(percentile(latencies, 90), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def run(stages, repeat):
+    data = datasets()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        # El cache de AST del benchmark no se mezcla con el de los generadores
+        pandoc.AST_DIR = workdir / "pandoc-ast"
+        for name in stages:
+            results[name] = {}
+            for dataset, docs in data.items():
+                # pandoc a 100× tarda minutos y no agrega información
+                if name in PANDOC_STAGES and dataset == "synthetic-100x":
+                    continue
+                results[name][dataset] = measure(STAGES[name], docs, repeat, workdir)
+                r = results[name][dataset]
+                print(f"  {name:<26} {dataset:<16} {r['mb_per_s']:>9} MB/s   "
+                      f"p50 {r['p50_ms']:>9} ms   p90 {r['p90_ms']:>9} ms   p99 {r['p99_ms']:>9} ms")
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "stages": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Lista de regresiones: etapas cuyo MB/s cayó más de `threshold` por ciento"""
+    regressions = []
+    for stage, by_dataset in current["stages"].items():
+        for dataset, result in by_dataset.items():
+            base = baseline.get("stages", {}).get(stage, {}).get(dataset)
+            if not base or not base.get("mb_per_s") or not result.get("mb_per_s"):
+                continue
+            change = (result["mb_per_s"] / base["mb_per_s"] - 1) * 100
+            if change < -threshold:
+                regressions.append((stage, dataset, base["mb_per_s"], result["mb_per_s"], change))
+    return regressions
+
+
+def connect_pandoc(args):
+    """Mide el mismo camino que generate_pdfs: pandoc server si hay (o se puede levantar)"""
+    if args.subprocess:
+        print("🔌 pandoc por subprocess")
+        return
+    if not pandoc.PandocServer(args.pandoc_server).available():
+        process = pandoc.start_server(args.pandoc_server)
+        if not process:
+            print("🔌 pandoc server no disponible: pandoc por subprocess")
+            return
+        atexit.register(process.terminate)
+    pandoc.use_server(args.pandoc_server)
+    print(f"🔌 Usando pandoc server en {args.pandoc_server}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de documentación")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por documento")
+    parser.add_argument("--save", nargs="?", const=str(DEFAULT_BASELINE), metavar="JSON",
+                        help="Guardar los resultados como baseline")
+    parser.add_argument("--compare", nargs="?", const=str(DEFAULT_BASELINE), metavar="JSON",
+                        help="Comparar contra un baseline y fallar si hay regresiones")
+    parser.add_argument("--pandoc-server", metavar="URL", default=pandoc.DEFAULT_SERVER_URL,
+                        help="Servidor pandoc a usar (o levantar) en las etapas de pandoc")
+    parser.add_argument("--subprocess", action="store_true",
+                        help="Medir pandoc por subprocess en lugar del servidor")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Porcentaje de caída de MB/s que se considera regresión")
+    args = parser.parse_args()
+
+    stages = list(args.stages)
+    if any(stage in stages for stage in PANDOC_STAGES) and not shutil.which("pandoc"):
+        print("⚠️  Pandoc no está instalado: se omiten las etapas de pandoc")
+        stages = [stage for stage in stages if stage not in PANDOC_STAGES]
+
+    print("⏱️  Benchmark del pipeline de documentación - EBI 360")
+    print("=" * 70)
+    if any(stage in stages for stage in PANDOC_STAGES):
+        connect_pandoc(args)
+    current = run(stages, args.repeat)
+
+    # Primero se compara (contra el baseline anterior) y después se guarda:
+    # con --save y --compare en la misma ruta, al revés compararía la corrida consigo misma
+    regressions = []
+    if args.compare and not os.path.exists(args.compare):
+        print(f"\nℹ️  No hay baseline en {args.compare}: nada que comparar (se crea con --save)")
+    elif args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Regresiones de más de {args.threshold}%:")
+            for stage, dataset, before, after, change in regressions:
+                print(f"   {stage} / {dataset}: {before} → {after} MB/s ({change:+.1f}%)")
+        else:
+            print(f"\n✅ Sin regresiones de más de {args.threshold}% contra {args.compare}")
+
+    if args.save and not regressions:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"\n💾 Baseline guardado en {args.save}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
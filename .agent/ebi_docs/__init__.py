@@ -0,0 +1,3 @@
+"""
+Herramientas compartidas para generar la documentación HTML de EBI 360
+"""
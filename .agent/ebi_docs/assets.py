@@ -0,0 +1,171 @@
+"""
+Hojas de estilo compartidas de la documentación HTML
+
+Cada tema (guias, encuestas, estrategia) vive en ebi_docs/themes/<tema>.css
+y se publica una sola vez por directorio de salida, minificado y con el
+hash del contenido en el nombre (assets/ebi-<tema>.<hash>.css). Las páginas
+solo lo enlazan, así que el navegador lo cachea entre documentos y entre
+visitas, y como el nombre cambia con el contenido nunca sirve uno viejo.
+
+Lo que cambia por documento (el color de portada) va como propiedad CSS
+(--cover-color) en el <html> de cada página. Si hay Inter local (ver
+ebi_docs.fonts), su @font-face va en la misma hoja y el woff2 al lado; si
+no, la hoja la importa de Google Fonts.
+
+Publicar no borra las versiones anteriores: las páginas que no se
+regeneraron (y las de otros generadores que escriben en el mismo
+directorio) pueden seguir enlazándolas. prune_assets las borra al final del
+build, cuando ninguna página del directorio las enlaza, y con ellas los
+woff2 que solo usaban esas hojas.
+"""
+
+import hashlib
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from ebi_docs.fonts import FONT_SOURCE, font_charset, font_rule, publish_font
+from ebi_docs.manifest import write_if_changed
+
+THEMES_DIR = Path(__file__).resolve().parent / "themes"
+ASSETS_DIRNAME = "assets"
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_SPACE_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+# Assets publicados, con el hash del contenido en el nombre (ebi-guias.<hash>.css, inter.<hash>.woff2)
+_ASSET_RE = re.compile(r"(?:ebi-[\w-]+|inter)\.[0-9a-f]{10}\.(?:css|woff2)")
+_ASSET_GLOBS = ("ebi-*.css", "inter.*.woff2")
+
+
+def theme_source(theme):
+    """Ruta del CSS fuente de un tema"""
+    path = THEMES_DIR / f"{theme}.css"
+    if not path.exists():
+        raise ValueError(f"Tema desconocido: {theme} (no existe {path})")
+    return str(path)
+
+
+def theme_sources(theme):
+    """Fuentes de las que depende el CSS publicado (para el manifest de los generadores)"""
+    return [theme_source(theme), __file__]
+
+
+def minify_css(css):
+    """Quita comentarios, espacios y el último ';' de cada bloque
+
+    Solo toca espacios alrededor de { } ; , > y después de ':', así que
+    selectores como 'a:hover' o valores como '0 10px 40px' quedan iguales.
+    """
+    css = _COMMENT_RE.sub("", css)
+    css = _SPACE_RE.sub(" ", css)
+    css = _PUNCT_RE.sub(r"\1", css)
+    css = css.replace(": ", ":").replace(";}", "}")
+    return css.strip()
+
+
+@lru_cache(maxsize=16)
+def _theme_css(path, mtime_ns):
+    with open(path, 'r', encoding='utf-8') as f:
+        return minify_css(f.read())
+
+
+def stylesheet(theme, font=None):
+    """(nombre con hash, CSS minificado) de un tema
+
+    `font` es el nombre del woff2 de Inter publicado junto al CSS (ver
+    ebi_docs.fonts); el @font-face (o, sin font, el @import de Google Fonts)
+    va al principio de la hoja.
+    """
+    path = theme_source(theme)
+    css = font_rule(font) + _theme_css(path, os.stat(path).st_mtime_ns)
+    digest = hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]
+    return f"ebi-{theme}.{digest}.css", css
+
+
+# href publicado en este proceso por (tema, directorio de salida)
+_published = {}
+
+
+def stylesheet_href(theme, output_dir):
+    """href del CSS del tema publicado en output_dir
+
+    Es el que devolvió publish_stylesheet en este proceso. Si la etapa de
+    assets no corrió (una página generada suelta, el benchmark), el tema se
+    publica ahora, sin Inter local: el href nunca apunta a un archivo que no
+    se escribió.
+    """
+    href = _published.get((theme, str(Path(output_dir))))
+    return href or publish_stylesheet(theme, output_dir)
+
+
+def publish_stylesheet(theme, output_dir, corpus=None):
+    """Escribe el CSS del tema (y la Inter recortada a `corpus`) en output_dir/assets
+
+    Es la etapa de assets del build: se corre una vez antes de generar las
+    páginas y devuelve el href que tienen que enlazar. Las versiones
+    anteriores del CSS quedan hasta prune_assets.
+    """
+    font = None
+    if corpus is not None:
+        font = publish_font(output_dir, font_charset(corpus))
+        if font is None:
+            _warn_missing_font()
+
+    name, css = stylesheet(theme, font)
+    assets = Path(output_dir) / ASSETS_DIRNAME
+    assets.mkdir(parents=True, exist_ok=True)
+    write_if_changed(assets / name, css + "\n")
+    href = _published[(theme, str(Path(output_dir)))] = f"{ASSETS_DIRNAME}/{name}"
+    return href
+
+
+def _references(path, pattern):
+    """Nombres que coinciden con pattern en un archivo de texto, leído por línea"""
+    found = set()
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            found.update(pattern.findall(line))
+    return found
+
+
+def prune_assets(output_dir):
+    """Borra de output_dir/assets los CSS y woff2 que ya no usa ninguna página
+
+    Se corre al final del build, con todas las páginas ya escritas; mira
+    todos los .html del directorio, no solo los de este generador. Un woff2
+    sigue en uso si lo enlaza una página (el @font-face en línea de pandoc)
+    o una hoja en uso. Devuelve los nombres borrados.
+    """
+    output_dir = Path(output_dir)
+    assets = output_dir / ASSETS_DIRNAME
+    live = set()
+    for page in output_dir.glob("*.html"):
+        live |= _references(page, _ASSET_RE)
+    for name in [name for name in live if name.endswith(".css")]:
+        if (assets / name).exists():
+            live |= _references(assets / name, _ASSET_RE)
+    removed = []
+    for pattern in _ASSET_GLOBS:
+        for path in sorted(assets.glob(pattern)):
+            if path.name not in live:
+                path.unlink()
+                removed.append(path.name)
+    return removed
+
+
+_warned = False
+
+
+def _warn_missing_font():
+    global _warned
+    if not _warned:
+        print(f"⚠️  Inter no se publica (falta {FONT_SOURCE} o fontTools/brotli): "
+              "las páginas la piden a fonts.googleapis.com")
+        _warned = True
+
+
+def cover_style(cover_color):
+    """Atributo style del <html> con las propiedades del documento"""
+    return f"--cover-color: {cover_color}"
@@ -0,0 +1,98 @@
+"""
+Driver de build para los generadores de documentación
+
+Reparte los documentos en un pool de procesos y devuelve los resultados en el
+mismo orden de la lista de configuraciones, sin importar cuál termina antes.
+"""
+
+import argparse
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+BuildResult = namedtuple("BuildResult", "config value error")
+
+
+def build_parser(description):
+    """Parser de línea de comandos común a los generadores"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Procesos en paralelo (por defecto, uno por núcleo)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenera todos los documentos aunque el manifest diga que no cambiaron",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Queda observando los .md y regenera solo lo que cambió",
+    )
+    return parser
+
+
+def source_date(path):
+    """Fecha a imprimir en un documento: SOURCE_DATE_EPOCH o la mtime de su fuente
+
+    Así la salida depende solo de las entradas y un build sin cambios produce
+    exactamente los mismos bytes.
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return datetime.fromtimestamp(int(epoch))
+    return datetime.fromtimestamp(os.stat(path).st_mtime)
+
+
+def _run_one(func, config):
+    try:
+        return BuildResult(config, func(config), None)
+    except Exception as e:
+        return BuildResult(config, None, e)
+
+
+def run_jobs(func, configs, jobs=None):
+    """Ejecuta func(config) para cada documento y devuelve una lista de BuildResult
+
+    `func` tiene que ser una función de nivel de módulo para poder enviarla
+    a otro proceso. Con jobs=1 (o un solo documento) corre en el proceso
+    actual, sin levantar el pool.
+    """
+    configs = list(configs)
+    workers = min(jobs or os.cpu_count() or 1, len(configs))
+
+    if workers <= 1:
+        return [_run_one(func, config) for config in configs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_one, func, config) for config in configs]
+        return [future.result() for future in futures]
+
+
+def run_incremental(func, configs, manifest, template_sources, jobs=None, force=False):
+    """Como run_jobs, pero solo para los documentos cuyas entradas cambiaron
+
+    Cada config necesita las claves "input" y "output". `template_sources`
+    son los archivos que definen el template y el motor (por ejemplo el
+    propio generador). Devuelve (resultados, configs omitidas). Un paso que
+    devuelve False ya reportó su error y no se registra en el manifest.
+    """
+    stale, keys, skipped = [], [], []
+    for config in configs:
+        key = manifest.key(config, [config["input"], *template_sources])
+        if not force and manifest.is_fresh(config["output"], key):
+            skipped.append(config)
+        else:
+            stale.append(config)
+            keys.append(key)
+
+    results = run_jobs(func, stale, jobs)
+    for result, key in zip(results, keys):
+        if result.error is None and result.value is not False:
+            manifest.record(result.config["output"], key)
+    manifest.save()
+    return results, skipped
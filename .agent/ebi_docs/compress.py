@@ -0,0 +1,300 @@
+"""
+Etapa posterior al build: HTML minificado, copias .gz/.br y manifest de assets
+
+La documentación se sirve como archivos estáticos y casi nunca cambia, así
+que se comprime una sola vez acá, al máximo nivel, en lugar de en cada
+request. Las páginas ya se escriben minificadas (open_minified: sin tocar
+<pre>, <textarea>, <script> ni <style>, donde los espacios importan) y acá
+se escriben al lado <archivo>.gz (gzip 9) y <archivo>.br (brotli 11),
+leyendo el original por bloques.
+
+Además, en el directorio de salida queda asset-manifest.json con el
+tamaño, el hash del contenido y el tamaño de cada copia comprimida de cada
+página y asset (CSS, fuentes). El servidor lo usa para el ETag y para
+servir con Cache-Control largo lo que tiene el hash en el nombre
+(immutable). El hash también dice si las copias comprimidas están al día:
+si no cambió desde el manifest anterior, no se recomprime. Las páginas que
+ya no se generan pierden su entrada y sus copias comprimidas.
+
+brotli es opcional: sin él solo se escriben los .gz.
+"""
+
+import gzip
+import json
+import os
+import re
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+
+from ebi_docs.assets import prune_assets
+from ebi_docs.manifest import file_digest, open_if_changed, write_if_changed
+
+MANIFEST_NAME = "asset-manifest.json"
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Lo que se comprime: texto. Las fuentes woff2 ya vienen comprimidas
+COMPRESSIBLE = (".html", ".css", ".js", ".svg")
+ASSET_GLOBS = ("assets/*.css", "assets/*.woff2")
+
+# Bloques donde los espacios y saltos de línea son parte del contenido
+_VERBATIM_RE = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.S | re.I)
+_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.S)
+_SPACE_RE = re.compile(r"\s+")
+# Lo mismo por partes: dónde empieza cada bloque o comentario
+_OPEN_RE = re.compile(r"<(pre|textarea|script|style)\b|<!--(?!\[if)", re.I)
+_COMMENT_END = "-->"
+_CHUNK_SIZE = 1 << 16
+
+# Las páginas salen minificadas: si cambia el minificador, cambian todas
+MINIFY_SOURCES = (__file__,)
+# Archivos con el hash del contenido en el nombre (ebi-guias.<hash>.css, inter.<hash>.woff2)
+_HASHED_RE = re.compile(r"\.[0-9a-f]{10}\.[a-z0-9]+$")
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _collapse(match):
+    return "\n" if "\n" in match.group(0) else " "
+
+
+def minify_html(html):
+    """Quita comentarios y la indentación del HTML
+
+    Cada tramo de espacios se reduce a uno solo (o a un salto de línea si
+    tenía alguno), que es lo que ya hace el navegador al mostrarlo; el texto
+    de <pre>, <textarea>, <script> y <style> queda igual.
+    """
+    parts = _VERBATIM_RE.split(html)
+    out = []
+    # split con dos grupos: texto, bloque completo, nombre de la etiqueta, texto...
+    for i in range(0, len(parts), 3):
+        text = _COMMENT_RE.sub("", parts[i])
+        out.append(_SPACE_RE.sub(_collapse, text))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return "".join(out).strip() + "\n"
+
+
+class MinifyingWriter:
+    """Stream de texto que escribe en out el HTML minificado, a medida que llega
+
+    Da lo mismo que minify_html sobre la página entera, pero solo guarda lo
+    que todavía no puede decidir: un bloque o comentario sin cerrar, una
+    etiqueta cortada, el espacio pendiente entre dos palabras. Los write
+    llegan de a una línea, así que se juntan y se minifican por bloques de
+    _CHUNK_SIZE.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.buffer = ""
+        self.pending = []     # lo escrito que todavía no pasó por _drain
+        self.size = 0
+        self.space = None     # espacio pendiente: " " o "\n"
+        self.started = False  # el espacio del principio se descarta (strip)
+
+    def write(self, text):
+        self.pending.append(text)
+        self.size += len(text)
+        if self.size >= _CHUNK_SIZE:
+            self._flush(final=False)
+        return len(text)
+
+    def close(self):
+        """Escribe lo pendiente y el salto final"""
+        self._flush(final=True)
+        self.out.write("\n")
+
+    def _flush(self, final):
+        self.buffer += "".join(self.pending)
+        self.pending = []
+        self.size = 0
+        self._drain(final)
+
+    def _text(self, text):
+        """Un tramo de texto: un solo _SPACE_RE.sub, como minify_html
+
+        Los espacios de las puntas no se pueden decidir acá (dependen de lo
+        que vino antes y de lo que sigue), así que se suman al pendiente.
+        """
+        body = text.strip()
+        if not body:
+            self._space(text)
+            return
+        start = len(text) - len(text.lstrip())
+        self._space(text[:start])
+        self._word(_SPACE_RE.sub(_collapse, body))
+        self._space(text[start + len(body):])
+
+    def _space(self, space):
+        if space:
+            self.space = "\n" if "\n" in space or self.space == "\n" else " "
+
+    def _word(self, word):
+        """Escribe texto sin espacios en las puntas, precedido del espacio pendiente"""
+        if self.space and self.started:
+            self.out.write(self.space)
+        self.space = None
+        self.started = True
+        self.out.write(word)
+
+    def _block_end(self, match):
+        """Fin del bloque o comentario que empieza en match (-1 si todavía no llegó)"""
+        if match.group(1):
+            end = re.compile(rf"</{match.group(1)}\s*>", re.I).search(self.buffer, match.end())
+            return end.end() if end else -1
+        end = self.buffer.find(_COMMENT_END, match.end())
+        return end + len(_COMMENT_END) if end >= 0 else -1
+
+    def _drain(self, final):
+        while self.buffer:
+            match = _OPEN_RE.search(self.buffer)
+            # Hace falta ver lo que sigue: '<pre' puede ser '<prefix' y '<!--' puede ser '<!--[if'
+            wait = match is not None and match.end() + 3 > len(self.buffer) and not final
+            end = self._block_end(match) if match and not wait else -1
+            if end < 0:
+                if final:
+                    # Un bloque sin cierre queda como texto, igual que en minify_html
+                    cut = len(self.buffer)
+                elif match:
+                    cut = match.start()
+                else:
+                    # Lo que sigue al último '<' puede ser una etiqueta cortada
+                    cut = self.buffer.rfind("<")
+                    if cut < 0 or ">" in self.buffer[cut:]:
+                        cut = len(self.buffer)
+                self._text(self.buffer[:cut])
+                self.buffer = self.buffer[cut:]
+                return
+            self._text(self.buffer[:match.start()])
+            if match.group(1):
+                self._word(self.buffer[match.start():end])
+            # los comentarios se descartan
+            self.buffer = self.buffer[end:]
+
+
+@contextmanager
+def open_minified(path):
+    """open_if_changed para una página HTML: lo que se escribe queda minificado"""
+    with open_if_changed(path) as f:
+        out = MinifyingWriter(f)
+        yield out
+        out.close()
+
+
+def _gzip_copy(src, target):
+    # mtime=0 y sin nombre: el mismo contenido da siempre los mismos bytes
+    with open(target, 'wb') as raw, gzip.GzipFile("", 'wb', GZIP_LEVEL, raw, mtime=0) as out:
+        shutil.copyfileobj(src, out, _CHUNK_SIZE)
+
+
+def _brotli_copy(src, target):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    with open(target, 'wb') as out:
+        for chunk in iter(lambda: src.read(_CHUNK_SIZE), b''):
+            out.write(compressor.process(chunk))
+        out.write(compressor.finish())
+
+
+def compress_file(path, digest=None, previous=None):
+    """Escribe path.gz y path.br (si hay brotli); devuelve {"gzip": tamaño, "br": tamaño}
+
+    `previous` es la entrada anterior del archivo en el manifest de assets:
+    si tiene el mismo hash y las copias siguen ahí, no se recomprime (con
+    quality 11 brotli tarda).
+    """
+    digest = digest or file_digest(path)
+    if not previous or previous.get("sha256") != digest:
+        previous = {}
+    sizes = {"gzip": _compressed(path, ".gz", previous.get("gzip"), _gzip_copy)}
+    if brotli is not None:
+        sizes["br"] = _compressed(path, ".br", previous.get("br"), _brotli_copy)
+    return sizes
+
+
+def _compressed(path, suffix, size, copy):
+    """Copia comprimida de path en path+suffix; devuelve su tamaño
+
+    `size` es el de la copia que se hizo del mismo contenido: si el archivo
+    sigue ahí con ese tamaño, no se rehace.
+    """
+    target = f"{path}{suffix}"
+    try:
+        if size is not None and os.path.getsize(target) == size:
+            return size
+    except FileNotFoundError:
+        pass
+    tmp = f"{target}.tmp"
+    try:
+        with open(path, 'rb') as src:
+            copy(src, tmp)
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return os.path.getsize(target)
+
+
+def _entry(path, previous=None):
+    entry = {
+        "size": os.path.getsize(path),
+        "sha256": file_digest(path),
+        "immutable": bool(_HASHED_RE.search(path.name)),
+    }
+    if path.suffix in COMPRESSIBLE:
+        entry.update(compress_file(path, entry["sha256"], previous))
+    return entry
+
+
+def publish_compressed(output_dir, pages):
+    """Escribe los .gz/.br de las páginas y los assets y actualiza el manifest de assets
+
+    `pages` son los HTML (ya minificados) que este generador dejó en
+    output_dir; los assets/ del directorio se agregan siempre. Otros
+    generadores pueden escribir en el mismo directorio, así que el manifest
+    se actualiza (no se reemplaza) y pierde solo las entradas de archivos
+    que ya no existen. Antes se borran los CSS y woff2 que ya no usa ninguna
+    página (prune_assets).
+    """
+    output_dir = Path(output_dir)
+    manifest_path = output_dir / MANIFEST_NAME
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        entries = {}
+
+    files = [Path(page) for page in pages]
+    prune_assets(output_dir)
+    for pattern in ASSET_GLOBS:
+        files += sorted(output_dir.glob(pattern))
+
+    for path in files:
+        name = path.relative_to(output_dir).as_posix()
+        entries[name] = _entry(path, entries.get(name))
+    entries = {name: entry for name, entry in entries.items() if (output_dir / name).exists()}
+
+    # Copias comprimidas de archivos que ya no existen: páginas que se dejaron
+    # de generar y versiones del CSS que ya nadie enlaza
+    for suffix in (".gz", ".br"):
+        for pattern in (f"*.html{suffix}", f"assets/*{suffix}"):
+            for packed in output_dir.glob(pattern):
+                if not packed.with_suffix("").exists():
+                    packed.unlink()
+
+    write_if_changed(manifest_path, json.dumps(entries, indent=2, sort_keys=True) + "\n")
+    return entries
+
+
+def report(entries, names):
+    """Línea de resumen: bytes originales y comprimidos de las entradas `names`"""
+    chosen = [entries[name] for name in names if name in entries]
+    size = sum(e["size"] for e in chosen)
+    packed = sum(e.get("br", e.get("gzip", e["size"])) for e in chosen)
+    kind = "br" if brotli is not None else "gzip"
+    return f"🗜️  {len(chosen)} archivos: {size / 1024:.0f} KB → {packed / 1024:.0f} KB ({kind})"
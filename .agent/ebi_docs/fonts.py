@@ -0,0 +1,129 @@
+"""
+Inter servida desde el propio sitio, recortada a los caracteres del corpus
+
+En lugar de pedir Inter a fonts.googleapis.com en cada página, el build
+recorta la fuente variable de Inter (wght 100-900) a los caracteres que
+aparecen en los .md y en los generadores, más el latín básico y los
+acentos del castellano, y la publica como woff2 con el hash del contenido
+en el nombre. Los emoji quedan afuera: Inter no los tiene y los dibuja la
+fuente de emoji del sistema.
+
+La fuente de origen no viene en el repo (licencia OFL, ~800 KB), así que
+por defecto las páginas piden Inter a Google Fonts (FONT_CDN_URL) y el
+build lo avisa. Para activar la fuente local:
+
+1. bajar InterVariable.ttf (https://rsms.me/inter/, está en el zip de cada
+   release) a .agent/ebi_docs/fonts/, o exportar EBI_INTER_FONT con su ruta
+2. pip install fonttools brotli (el recorte y el woff2)
+
+y volver a correr el generador.
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+from ebi_docs.manifest import CACHE_DIR, file_digest
+
+FONT_SOURCE = Path(os.environ.get(
+    "EBI_INTER_FONT", Path(__file__).resolve().parent / "fonts" / "InterVariable.ttf"))
+FONT_FAMILY = "Inter"
+FONT_WEIGHTS = "100 900"
+# Alternativa cuando no se puede publicar la fuente local
+FONT_CDN_URL = "https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700;900&display=swap"
+
+# Siempre incluidos, aparezcan o no en el corpus de hoy
+BASE_CHARS = (
+    "".join(chr(c) for c in range(0x20, 0x7F))
+    + "áéíóúüñÁÉÍÓÚÜÑ¿¡ºª°«»€"
+    + "\u00a0–—‘’“”•…→"
+)
+
+# Bloques de emoji y sus modificadores: no están en Inter
+_EMOJI_RANGES = ((0x2600, 0x27BF), (0x1F000, 0x1FAFF), (0xFE00, 0xFE0F), (0x200D, 0x200D), (0xE0000, 0xE007F))
+
+
+def _is_text_char(ch):
+    code = ord(ch)
+    if code < 0x20 or 0x7F <= code < 0xA0:
+        return False
+    return not any(low <= code <= high for low, high in _EMOJI_RANGES)
+
+
+def corpus_files(root):
+    """Fuentes de texto de la documentación: los .md y los generadores"""
+    root = Path(root)
+    files = [p for p in root.rglob("*.md") if ".cache" not in p.parts]
+    files += root.glob("generate_*.py")
+    return sorted(files)
+
+
+def font_charset(paths):
+    """Caracteres a incluir en la fuente: BASE_CHARS más los del corpus, sin emoji"""
+    chars = set(BASE_CHARS)
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                chars.update(line)
+    return "".join(sorted(ch for ch in chars if _is_text_char(ch)))
+
+
+def subset_font(charset, source=FONT_SOURCE):
+    """woff2 recortado a charset, en el cache; devuelve su ruta o None si no se puede
+
+    El nombre lleva el hash de la fuente y del charset, así que un corpus
+    sin caracteres nuevos reutiliza el archivo ya recortado.
+    """
+    if not Path(source).exists():
+        return None
+    try:
+        from fontTools import subset
+        import brotli  # noqa: F401  (woff2 lo necesita)
+    except ImportError:
+        return None
+
+    digest = hashlib.sha256(f"{file_digest(source)}:{charset}".encode('utf-8')).hexdigest()[:10]
+    path = CACHE_DIR / "fonts" / f"inter.{digest}.woff2"
+    if path.exists():
+        return path
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    font = subset.load_font(str(source), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=charset)
+    subsetter.subset(font)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    subset.save_font(font, str(tmp), options)
+    os.replace(tmp, path)
+    return path
+
+
+def publish_font(output_dir, charset):
+    """Copia el woff2 recortado a output_dir/assets; devuelve su nombre o None"""
+    font = subset_font(charset)
+    if font is None:
+        return None
+    assets = Path(output_dir) / "assets"
+    assets.mkdir(parents=True, exist_ok=True)
+    target = assets / font.name
+    if not target.exists():
+        shutil.copyfile(font, target)
+    return font.name
+
+
+def font_face(url):
+    """Regla @font-face de Inter apuntando a url (relativa al CSS que la incluye)"""
+    return (f"@font-face{{font-family:'{FONT_FAMILY}';font-style:normal;font-weight:{FONT_WEIGHTS};"
+            f"font-display:swap;src:url({url}) format('woff2')}}")
+
+
+def font_rule(url=None):
+    """Regla de Inter para el principio de una hoja: @font-face local o, sin url, el @import del CDN"""
+    if url:
+        return font_face(url)
+    return f"@import url('{FONT_CDN_URL}');"
@@ -0,0 +1,91 @@
+"""
+Build de PDF con cache de LaTeX
+
+En lugar de `pandoc --pdf-engine=xelatex`, que compila en un directorio
+temporal y descarta todo, cada documento tiene su directorio en
+.agent/.cache/latex/<nombre>/ con el .tex, .aux, .toc y el PDF. LaTeX solo se
+vuelve a correr si el .tex generado cambió, y como los .aux/.toc de la
+corrida anterior se conservan, casi siempre alcanza con una pasada.
+"""
+
+import filecmp
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+from ebi_docs.manifest import CACHE_DIR, write_if_changed
+from ebi_docs.pandoc import ast_to_file
+
+LATEX_DIR = CACHE_DIR / "latex"
+ENGINE = "xelatex"
+
+# Archivos cuyo cambio obliga a otra pasada (referencias, índice)
+_RERUN_FILES = (".aux", ".toc", ".out")
+MAX_PASSES = 4
+
+
+def _snapshot(workdir, name):
+    # Se compara el contenido: LaTeX puede reescribirlos en el mismo instante
+    state = {}
+    for ext in _RERUN_FILES:
+        path = workdir / f"{name}{ext}"
+        state[ext] = path.read_bytes() if path.exists() else None
+    return state
+
+
+def _run_latex(workdir, name, source_dir):
+    env = dict(os.environ)
+    # Imágenes y archivos incluidos se buscan relativos al Markdown
+    env["TEXINPUTS"] = f"{source_dir}{os.pathsep}{env.get('TEXINPUTS', '')}"
+    cmd = [ENGINE, "-interaction=nonstopmode", "-halt-on-error", f"{name}.tex"]
+    result = subprocess.run(cmd, cwd=workdir, env=env, capture_output=True)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, cmd, output=result.stdout, stderr=result.stdout[-4000:]
+        )
+
+
+def build_pdf(ast, input_file, output_file, writer_args):
+    """Genera output_file desde el AST reutilizando el directorio de LaTeX del documento
+
+    `writer_args` son las opciones de pandoc para el PDF; --pdf-engine se
+    ignora porque acá el motor lo corre este módulo. Devuelve la cantidad de
+    pasadas de LaTeX que hicieron falta (0 si el .tex no cambió).
+    """
+    name = Path(output_file).stem
+    workdir = LATEX_DIR / name
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    tex = workdir / f"{name}.tex"
+    pdf = workdir / f"{name}.pdf"
+    new_tex = workdir / f"{name}.tex.new"
+    args = ["-s", *(a for a in writer_args if not a.startswith("--pdf-engine"))]
+    ast_to_file(ast, new_tex, ["-t", "latex", *args])
+
+    with open(new_tex, 'r', encoding='utf-8') as f:
+        changed = write_if_changed(tex, f.read())
+    new_tex.unlink()
+
+    passes = 0
+    if changed or not pdf.exists():
+        source_dir = Path(input_file).resolve().parent
+        before = _snapshot(workdir, name)
+        try:
+            while passes < MAX_PASSES:
+                _run_latex(workdir, name, source_dir)
+                passes += 1
+                after = _snapshot(workdir, name)
+                if after == before:
+                    break
+                before = after
+        except Exception:
+            # Sin esto el próximo build vería el .tex igual y el PDF viejo
+            # presente, y copiaría ese PDF como si la compilación hubiera andado
+            tex.unlink(missing_ok=True)
+            pdf.unlink(missing_ok=True)
+            raise
+
+    if not Path(output_file).exists() or not filecmp.cmp(output_file, pdf, shallow=False):
+        shutil.copyfile(pdf, output_file)
+    return passes
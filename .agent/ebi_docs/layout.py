@@ -0,0 +1,106 @@
+"""
+Layouts de página compilados una vez por proceso
+
+Cada layout vive en ebi_docs/layouts/<nombre>.html con huecos {{ nombre }}.
+Al compilarlo se separa en partes fijas (ya unidas, una cadena por tramo
+entre huecos) y la lista de huecos; renderizar es escribir en el stream de
+salida una parte fija, el valor de un hueco, la siguiente parte, etc., sin
+armar de nuevo el template completo en cada documento.
+
+Los valores se escapan según el filtro del hueco:
+
+- {{ titulo }}       texto: se escapa como HTML (también sirve en atributos)
+- {{ titulo|js }}    literal de string de JavaScript, con comillas
+- {{ contenido|raw }} HTML ya generado (el cuerpo del documento), o una
+  función que lo escribe ella misma en el stream (ver markdown.html_writer)
+"""
+
+import html
+import io
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+LAYOUTS_DIR = Path(__file__).resolve().parent / "layouts"
+
+_SLOT_RE = re.compile(r"\{\{\s*(\w+)\s*(?:\|\s*(\w+)\s*)?\}\}")
+
+
+def _js(value):
+    # '</' cortaría el <script> que contiene al string
+    return json.dumps(str(value), ensure_ascii=False).replace("</", "<\\/")
+
+
+FILTERS = {
+    "html": lambda value: html.escape(str(value)),
+    "js": _js,
+    "raw": str,
+}
+
+
+class Layout:
+    """Template compilado: partes fijas y huecos alternados"""
+
+    def __init__(self, source, name="<layout>"):
+        self.name = name
+        self.chunks = []
+        self.slots = []
+        pos = 0
+        for match in _SLOT_RE.finditer(source):
+            slot, filter_name = match.group(1), match.group(2) or "html"
+            if filter_name not in FILTERS:
+                raise ValueError(f"{name}: filtro desconocido '{filter_name}' en {{{{ {slot} }}}}")
+            self.chunks.append(source[pos:match.start()])
+            self.slots.append((slot, filter_name == "raw", FILTERS[filter_name]))
+            pos = match.end()
+        self.chunks.append(source[pos:])
+        self.names = frozenset(slot for slot, _, _ in self.slots)
+
+    def render(self, out, **values):
+        """Escribe la página en el stream de texto out"""
+        missing = self.names - values.keys()
+        if missing:
+            raise ValueError(f"{self.name}: faltan valores para {', '.join(sorted(missing))}")
+        write = out.write
+        for chunk, (slot, raw, escape) in zip(self.chunks, self.slots):
+            write(chunk)
+            value = values[slot]
+            if raw and callable(value):
+                # Cuerpo en streaming: no pasa nunca entero por memoria
+                value(out)
+            else:
+                write(escape(value))
+        write(self.chunks[-1])
+
+    def render_string(self, **values):
+        """La página como str, para quien no escribe a un archivo"""
+        out = io.StringIO()
+        self.render(out, **values)
+        return out.getvalue()
+
+
+def layout_source(name):
+    """Ruta del archivo de un layout"""
+    path = LAYOUTS_DIR / f"{name}.html"
+    if not path.exists():
+        raise ValueError(f"Layout desconocido: {name} (no existe {path})")
+    return str(path)
+
+
+def layout_sources(name):
+    """Fuentes de las que depende un layout (para el manifest de los generadores)"""
+    return [layout_source(name), __file__]
+
+
+@lru_cache(maxsize=16)
+def _compiled(path, mtime_ns):
+    with open(path, 'r', encoding='utf-8') as f:
+        return Layout(f.read(), Path(path).stem)
+
+
+def get_layout(name):
+    """Layout compilado; se recompila solo si el archivo cambió (modo --watch)"""
+    path = layout_source(name)
+    return _compiled(path, os.stat(path).st_mtime_ns)
@@ -0,0 +1,119 @@
+"""
+Manifest de build incremental
+
+Guarda, por cada archivo generado, el hash de sus entradas (Markdown, fuentes
+del template y diccionario de configuración) y el hash de la salida escrita.
+Un documento solo se regenera si cambió alguna entrada o si la salida ya no
+es la que se escribió (borrada o pisada por otro generador).
+"""
+
+import filecmp
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+
+@lru_cache(maxsize=256)
+def _digest(path, mtime_ns, size):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_digest(path):
+    """sha256 de un archivo, cacheado mientras no cambie su mtime/tamaño"""
+    st = os.stat(path)
+    return _digest(str(path), st.st_mtime_ns, st.st_size)
+
+
+def write_if_changed(path, text):
+    """Escribe el archivo solo si el contenido es distinto; devuelve True si escribió"""
+    data = text.encode('utf-8')
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+@contextmanager
+def open_if_changed(path):
+    """Como write_if_changed, para escribir por partes en un stream
+
+    Se escribe a un temporal al lado; al cerrar, si quedó igual al archivo
+    existente se descarta (el original conserva su mtime) y si no, lo
+    reemplaza. Si hay un error, el original queda como estaba.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            yield f
+        if path.exists() and filecmp.cmp(tmp, path, shallow=False):
+            tmp.unlink()
+        else:
+            os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class Manifest:
+    """Estado de un generador: salida -> hash de entradas y de salida"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    @classmethod
+    def for_generator(cls, name):
+        """Manifest en .agent/.cache/<name>.json"""
+        return cls(CACHE_DIR / f"{name}.json")
+
+    @staticmethod
+    def key(config, sources):
+        """Hash de la configuración y del contenido de los archivos de entrada"""
+        h = hashlib.sha256()
+        h.update(json.dumps(config, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        for source in sources:
+            h.update(file_digest(source).encode('ascii'))
+        return h.hexdigest()
+
+    def is_fresh(self, output, key):
+        entry = self.entries.get(str(output))
+        if not entry or entry["key"] != key:
+            return False
+        try:
+            return file_digest(output) == entry["output"]
+        except FileNotFoundError:
+            return False
+
+    def record(self, output, key):
+        self.entries[str(output)] = {"key": key, "output": file_digest(output)}
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._dirty = False
@@ -0,0 +1,148 @@
+"""
+Motor de Markdown a HTML compartido por los generadores de documentación
+
+Un solo camino de conversión: el tokenizador emite bloques por línea y
+`render_lines` maneja listas, párrafos y líneas vacías. Lo que cambia entre
+documentos (cómo se escribe cada bloque) vive en una clase Renderer, así que
+cada generador puede enchufar la suya sin copiar el conversor.
+
+Los documentos grandes no se leen enteros: `read_lines` recorre el .md línea
+por línea y `write_html` escribe cada línea HTML en el archivo de salida a
+medida que sale, así que la memoria no crece con el tamaño del documento.
+"""
+
+from ebi_docs import tokenizer
+from ebi_docs.tokenizer import (
+    tokenize,
+    BULLET,
+    ORDERED,
+    BLANK,
+    HTML,
+    ORDERED_PREFIX_RE,
+)
+
+# Fuentes del motor: si cambian, el manifest de build invalida los documentos
+ENGINE_SOURCES = (tokenizer.__file__, __file__)
+
+
+class HtmlRenderer:
+    """Renderer HTML por defecto (guías y sistema de encuestas)"""
+
+    # Reglas del tokenizador
+    header_levels = 4
+    code = True
+    links = True
+    checkboxes = True
+
+    def list_open(self, tag):
+        return f'<{tag}>'
+
+    def list_close(self, tag):
+        return f'</{tag}>'
+
+    def list_item(self, text):
+        return f'<li>{text}</li>'
+
+    def paragraph(self, line):
+        return f'<p>{line}</p>'
+
+    def raw(self, line):
+        return line
+
+    def blank(self):
+        """Línea vacía; devolver None para no emitir nada"""
+        return '<br>'
+
+
+class StrategyRenderer(HtmlRenderer):
+    """Dossier de estrategia: el espaciado lo resuelve el CSS, sin <br>"""
+
+    # El conversor original del dossier solo tenía h1-h3
+    header_levels = 3
+
+    def blank(self):
+        return None
+
+
+DEFAULT_RENDERER = HtmlRenderer()
+
+
+def render_lines(lines, renderer=DEFAULT_RENDERER):
+    """Convierte líneas de Markdown y emite las líneas HTML resultantes"""
+    current = None  # 'ul' u 'ol' mientras haya una lista abierta
+
+    tokens = tokenize(
+        lines,
+        header_levels=renderer.header_levels,
+        code=renderer.code,
+        links=renderer.links,
+        checkboxes=renderer.checkboxes,
+    )
+    for kind, line, stripped in tokens:
+        tag = None
+        if kind == BULLET:
+            tag, item = 'ul', renderer.list_item(stripped[2:])
+        elif kind == ORDERED and ORDERED_PREFIX_RE.match(stripped):
+            tag, item = 'ol', renderer.list_item(ORDERED_PREFIX_RE.sub('', stripped))
+        elif kind == HTML and stripped.startswith('<li'):
+            # Checkboxes: ya vienen como <li> desde el tokenizador
+            tag, item = 'ul', stripped
+
+        if tag:
+            if current != tag:
+                if current:
+                    yield renderer.list_close(current)
+                yield renderer.list_open(tag)
+                current = tag
+            yield item
+            continue
+
+        if current:
+            yield renderer.list_close(current)
+            current = None
+
+        if kind == BLANK:
+            blank = renderer.blank()
+            if blank is not None:
+                yield blank
+        elif kind == HTML:
+            yield renderer.raw(line)
+        else:
+            yield renderer.paragraph(line)
+
+    if current:
+        yield renderer.list_close(current)
+
+
+def markdown_to_html(markdown_text, renderer=DEFAULT_RENDERER):
+    """Convierte Markdown básico a HTML"""
+    return '\n'.join(render_lines(markdown_text.split('\n'), renderer))
+
+
+def read_lines(path):
+    """Líneas del archivo sin el salto final, igual que f.read().split('\n'), sin leerlo entero"""
+    with open(path, 'r', encoding='utf-8') as f:
+        ended = True  # un archivo vacío o terminado en '\n' da una última línea vacía
+        for line in f:
+            ended = line.endswith('\n')
+            yield line[:-1] if ended else line
+        if ended:
+            yield ''
+
+
+def write_html(out, lines, renderer=DEFAULT_RENDERER):
+    """Como markdown_to_html, pero escribe cada línea HTML en el stream out a medida que sale"""
+    write = out.write
+    sep = ''
+    for html in render_lines(lines, renderer):
+        write(sep)
+        write(html)
+        sep = '\n'
+
+
+def html_writer(path, renderer=DEFAULT_RENDERER):
+    """Cuerpo de un .md para Layout.render: una función que lo escribe en el stream
+
+    El archivo se lee recién cuando el layout llega al hueco del contenido.
+    """
+    return lambda out: write_html(out, read_lines(path), renderer)
@@ -0,0 +1,241 @@
+"""
+Conversión con pandoc a partir de un AST cacheado
+
+Cada Markdown se parsea una sola vez a la representación JSON de pandoc y se
+guarda en .agent/.cache/pandoc-ast/ con el hash de la fuente como nombre. El
+HTML y el PDF se escriben desde ese AST, así que el Markdown no se vuelve a
+leer ni a parsear mientras no cambie.
+
+Hay dos motores: un `pandoc server` local, al que se le mandan las
+conversiones en lote por HTTP sin pagar el arranque de un proceso por
+documento, y el modo subprocess de siempre. Si el servidor no responde se
+vuelve a subprocess. El PDF siempre va por subprocess (el servidor no corre
+LaTeX).
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from functools import lru_cache
+
+from ebi_docs.build import run_jobs
+from ebi_docs.manifest import CACHE_DIR, file_digest
+
+AST_DIR = CACHE_DIR / "pandoc-ast"
+
+# Lector usado para todas las guías
+READER_ARGS = ("-f", "markdown")
+
+# Lo que decide la salida de pandoc además de la fuente: este módulo y
+# pandoc_version(); los pasos que usan pandoc los suman a su clave de build
+PANDOC_SOURCES = (__file__,)
+
+# URL del servidor activo; se pasa por entorno para que la vean los procesos del pool
+SERVER_ENV = "EBI_PANDOC_SERVER"
+DEFAULT_SERVER_URL = "http://127.0.0.1:3030"
+
+
+class PandocServerError(RuntimeError):
+    """El servidor respondió, pero la conversión falló"""
+
+
+class PandocServer:
+    """Cliente mínimo de la API HTTP de `pandoc server`"""
+
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, path, payload=None, timeout=None):
+        data = None if payload is None else json.dumps(payload).encode('utf-8')
+        request = urllib.request.Request(
+            self.url + path,
+            data=data,
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return response.read().decode('utf-8')
+        except urllib.error.HTTPError as e:
+            raise PandocServerError(e.read().decode('utf-8', 'replace')) from e
+
+    def version(self):
+        return self._request("/version", timeout=1).strip()
+
+    def available(self):
+        try:
+            self.version()
+            return True
+        except (OSError, PandocServerError):
+            return False
+
+    @staticmethod
+    def _output(result):
+        if isinstance(result, str):
+            return result
+        if "error" in result:
+            raise PandocServerError(result["error"])
+        return result["output"]
+
+    def convert(self, text, from_, to):
+        body = self._request("/", {"text": text, "from": from_, "to": to})
+        try:
+            return self._output(json.loads(body))
+        except ValueError:
+            # Versiones que responden texto plano
+            return body
+
+    def batch(self, conversions):
+        """Convierte una lista de (texto, from, to) en un solo request"""
+        payload = [{"text": text, "from": from_, "to": to} for text, from_, to in conversions]
+        return [self._output(result) for result in json.loads(self._request("/batch", payload))]
+
+
+def use_server(url):
+    """Activa el motor servidor para este proceso y sus workers"""
+    os.environ[SERVER_ENV] = url
+
+
+def start_server(url=DEFAULT_SERVER_URL, wait=5.0):
+    """Levanta `pandoc server` en el puerto de url; devuelve el Popen o None si no arrancó"""
+    port = url.rstrip('/').rsplit(':', 1)[-1]
+    try:
+        process = subprocess.Popen(
+            ["pandoc", "server", "--port", port, "--timeout", "120"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        return None
+
+    client = PandocServer(url)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return None
+        if client.available():
+            return process
+        time.sleep(0.05)
+    process.terminate()
+    return None
+
+
+@lru_cache(maxsize=None)
+def _client(url):
+    return PandocServer(url)
+
+
+def server():
+    """Cliente del servidor activo, o None si se trabaja con subprocess"""
+    url = os.environ.get(SERVER_ENV)
+    return _client(url) if url else None
+
+
+def _run(args, stdin=None):
+    result = subprocess.run(["pandoc", *args], input=stdin, check=True, capture_output=True)
+    return result.stdout.decode()
+
+
+def _convert(text, from_, to):
+    """Conversión texto a texto: por el servidor si está, si no por subprocess"""
+    client = server()
+    if client:
+        try:
+            return client.convert(text, from_, to)
+        except OSError:
+            pass
+    return _run(["-f", from_, "-t", to], stdin=text.encode('utf-8'))
+
+
+@lru_cache(maxsize=1)
+def pandoc_version():
+    """Versión de pandoc (lanza FileNotFoundError si no está instalado)"""
+    client = server()
+    if client:
+        try:
+            return client.version()
+        except OSError:
+            pass
+    return _run(["--version"]).splitlines()[0].split()[-1]
+
+
+def ast_path(input_file):
+    """Ruta del AST cacheado para el contenido actual de input_file"""
+    h = hashlib.sha256()
+    h.update(file_digest(input_file).encode('ascii'))
+    h.update(pandoc_version().encode('utf-8'))
+    h.update(" ".join(READER_ARGS).encode('utf-8'))
+    return AST_DIR / f"{h.hexdigest()}.json"
+
+
+def _store(path, text):
+    AST_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def markdown_ast(input_file):
+    """Devuelve la ruta al AST JSON de input_file, parseándolo solo si no está en cache"""
+    path = ast_path(input_file)
+    if not path.exists():
+        with open(input_file, 'r', encoding='utf-8') as f:
+            _store(path, _convert(f.read(), READER_ARGS[1], "json"))
+    return path
+
+
+def ast_to_html(ast):
+    """Fragmento HTML (sin documento completo) a partir de un AST cacheado
+
+    El fragmento se guarda junto al AST, así que una guía sin cambios no
+    vuelve a pasar por pandoc.
+    """
+    html_path = ast.with_suffix('.html')
+    if not html_path.exists():
+        _store(html_path, _convert(ast.read_text(encoding='utf-8'), "json", "html"))
+    return html_path.read_text(encoding='utf-8')
+
+
+def ast_to_file(ast, output_file, args):
+    """Escribe output_file desde el AST con las opciones de escritura dadas (p. ej. PDF)"""
+    _run(["-f", "json", str(ast), "-o", str(output_file), *args])
+
+
+def _prepare_one(input_file):
+    ast_to_html(markdown_ast(input_file))
+
+
+def prepare(inputs, jobs=None):
+    """Deja en cache el AST y el fragmento HTML de cada fuente
+
+    Con servidor, todo lo que falta se convierte en dos requests /batch
+    (parseo y HTML). Sin servidor, se reparte en el pool de procesos.
+    """
+    client = server()
+    if not client:
+        return run_jobs(_prepare_one, inputs, jobs)
+
+    try:
+        paths = [ast_path(i) for i in inputs]
+        missing = [(i, p) for i, p in zip(inputs, paths) if not p.exists()]
+        if missing:
+            texts = [open(i, 'r', encoding='utf-8').read() for i, _ in missing]
+            outputs = client.batch([(t, READER_ARGS[1], "json") for t in texts])
+            for (_, path), output in zip(missing, outputs):
+                _store(path, output)
+
+        missing = [p for p in paths if not p.with_suffix('.html').exists()]
+        if missing:
+            texts = [p.read_text(encoding='utf-8') for p in missing]
+            outputs = client.batch([(t, "json", "html") for t in texts])
+            for path, output in zip(missing, outputs):
+                _store(path.with_suffix('.html'), output)
+    except (OSError, PandocServerError):
+        # Los pasos vuelven a intentar documento por documento y reportan el error
+        pass
+    return []
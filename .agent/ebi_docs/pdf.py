@@ -0,0 +1,77 @@
+"""
+Backends de PDF que corren dentro del proceso
+
+Convierten el HTML final de un documento (el mismo que genera
+create_professional_html) en PDF, sin pandoc ni una distribución de TeX.
+Cada backend depende de una librería opcional; si no está instalada el
+backend figura como no disponible y se elige otro. El orden de registro es
+el de preferencia: primero xhtml2pdf, que es Python puro (pip install
+xhtml2pdf alcanza), y después WeasyPrint, que respeta más CSS pero
+necesita Pango y Cairo instalados en el sistema.
+"""
+
+import importlib.util
+from abc import ABC, abstractmethod
+
+BACKENDS = {}
+
+
+def register_backend(cls):
+    """Registra un backend por su nombre (usable como decorador)"""
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+class PdfBackend(ABC):
+    """Interfaz: convierte un archivo HTML en un PDF"""
+
+    name = None
+    module = None  # librería opcional que necesita
+
+    def available(self):
+        return importlib.util.find_spec(self.module) is not None
+
+    @abstractmethod
+    def write_pdf(self, html_file, output_file):
+        """Escribe output_file a partir de html_file"""
+
+
+@register_backend
+class XhtmlPdfBackend(PdfBackend):
+    """xhtml2pdf: Python puro sobre ReportLab, con soporte de CSS más limitado"""
+
+    name = "xhtml2pdf"
+    module = "xhtml2pdf"
+
+    def write_pdf(self, html_file, output_file):
+        from xhtml2pdf import pisa
+
+        with open(html_file, 'r', encoding='utf-8') as src, open(output_file, 'wb') as dst:
+            # path: base para resolver los recursos relativos (assets/ del HTML)
+            status = pisa.CreatePDF(src.read(), dest=dst, encoding='utf-8', path=str(html_file))
+        if status.err:
+            raise RuntimeError(f"xhtml2pdf no pudo convertir {html_file}")
+
+
+@register_backend
+class WeasyPrintBackend(PdfBackend):
+    """WeasyPrint: respeta casi todo el CSS del template (gradientes, flex, @page)"""
+
+    name = "weasyprint"
+    module = "weasyprint"
+
+    def write_pdf(self, html_file, output_file):
+        from weasyprint import HTML
+
+        HTML(filename=str(html_file)).write_pdf(str(output_file))
+
+
+def get_backend(name=None):
+    """Backend por nombre, o el primero disponible si name es None (None si no hay)"""
+    if name:
+        return BACKENDS[name]()
+    for cls in BACKENDS.values():
+        backend = cls()
+        if backend.available():
+            return backend
+    return None
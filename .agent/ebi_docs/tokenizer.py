@@ -0,0 +1,140 @@
+"""
+Tokenizador de Markdown por líneas para los generadores de documentación
+
+Recorre el documento una sola vez, línea por línea, y emite un token de
+bloque por línea con el formato inline (negritas, itálicas, código, links,
+checkboxes) ya aplicado. Reproduce exactamente la salida de la cadena de
+`re.sub` que usaban los generadores, incluidos los bloques de código inline
+que abarcan varias líneas (por ejemplo las vallas ```).
+"""
+
+import re
+from collections import namedtuple
+
+# Tipos de token de bloque
+BLANK = "blank"
+BULLET = "bullet"
+ORDERED = "ordered"
+HTML = "html"
+TEXT = "text"
+
+Token = namedtuple("Token", "kind line stripped")
+
+# Patrones precompilados (mismas reglas que la cadena de re.sub original)
+BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+ITALIC_RE = re.compile(r'\*(.*?)\*')
+LINK_RE = re.compile(r'\[(.*?)\]\((.*?)\)')
+ORDERED_RE = re.compile(r'^\d+\.')
+ORDERED_PREFIX_RE = re.compile(r'^\d+\.\s+')
+
+CHECKBOX_OPEN = '<li class="checkbox">☐'
+CHECKBOX_CHECKED = '<li class="checkbox checked">☑'
+
+# Marca para un backtick de apertura cuyo cierre todavía no apareció
+_PENDING = "\x00"
+
+
+def _header(line, levels):
+    """Convierte `# Título` en <hN> si el nivel está habilitado"""
+    n = len(line) - len(line.lstrip('#'))
+    if n <= levels and line[n:n + 1] == ' ':
+        return f'<h{n}>{line[n + 1:]}</h{n}>'
+    return line
+
+
+def _code(line, pending):
+    """Aplica `código` inline sobre una línea arrastrando el estado entre líneas
+
+    Devuelve la línea convertida y si quedó un backtick abierto al final.
+    Un backtick abierto se deja marcado hasta saber si tiene cierre.
+    """
+    i = line.find('`')
+    if i == -1:
+        return line, pending
+
+    parts = []
+    pos = 0
+    while i != -1:
+        if pending:
+            parts.append(line[pos:i])
+            parts.append('</code>')
+            pos = i + 1
+            pending = False
+            i = line.find('`', pos)
+        elif line[i + 1:i + 2] == '`':
+            # Dos backticks seguidos: el primero queda literal
+            i = line.find('`', i + 1)
+        else:
+            j = line.find('`', i + 1)
+            if j == -1:
+                parts.append(line[pos:i])
+                parts.append(_PENDING)
+                pos = i + 1
+                pending = True
+                break
+            parts.append(line[pos:i])
+            parts.append('<code>')
+            parts.append(line[i + 1:j])
+            parts.append('</code>')
+            pos = j + 1
+            i = line.find('`', pos)
+
+    parts.append(line[pos:])
+    return ''.join(parts), pending
+
+
+def _classify(line):
+    """Genera el token de bloque para una línea ya convertida"""
+    stripped = line.strip()
+    if stripped.startswith('- ') or stripped.startswith('* '):
+        return Token(BULLET, line, stripped)
+    if ORDERED_RE.match(stripped):
+        return Token(ORDERED, line, stripped)
+    if not stripped:
+        return Token(BLANK, line, stripped)
+    if stripped.startswith('<'):
+        return Token(HTML, line, stripped)
+    return Token(TEXT, line, stripped)
+
+
+def tokenize(lines, header_levels=4, code=True, links=True, checkboxes=True):
+    """Recorre las líneas del documento y emite un Token por línea
+
+    Las líneas que siguen a un backtick abierto se retienen hasta encontrar
+    el siguiente backtick (o el final del documento), que es lo que decide
+    si la apertura se convierte en <code> o queda literal.
+    """
+    held = []
+    pending = False
+
+    for line in lines:
+        if line[:1] == '#':
+            line = _header(line, header_levels)
+        if '*' in line:
+            if '**' in line:
+                line = BOLD_RE.sub(r'<strong>\1</strong>', line)
+            line = ITALIC_RE.sub(r'<em>\1</em>', line)
+
+        if code:
+            if pending and '`' in line:
+                held[0] = held[0].replace(_PENDING, '<code>', 1)
+                for held_line in held:
+                    yield _classify(held_line)
+                held.clear()
+            line, pending = _code(line, pending)
+
+        if links and '[' in line:
+            line = LINK_RE.sub(r'<a href="\2">\1</a>', line)
+        if checkboxes and '- [' in line:
+            line = line.replace('- [ ]', CHECKBOX_OPEN).replace('- [x]', CHECKBOX_CHECKED)
+
+        if pending:
+            held.append(line)
+        else:
+            yield _classify(line)
+
+    if held:
+        # Sin cierre en el resto del documento: el backtick queda literal
+        held[0] = held[0].replace(_PENDING, '`', 1)
+        for held_line in held:
+            yield _classify(held_line)
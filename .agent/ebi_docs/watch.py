@@ -0,0 +1,76 @@
+"""
+Modo watch para los generadores de documentación
+
+Sondea las mtimes de los Markdown (sin dependencias externas) y, cuando un
+editor termina de guardar, regenera solo los documentos afectados dentro del
+mismo proceso, con el motor y los templates ya cargados.
+"""
+
+import os
+import time
+from pathlib import Path
+
+# Relativos al directorio .agent
+WATCH_PATTERNS = ("*.md", "documentation/**/*.md")
+
+
+def scan(root, patterns=WATCH_PATTERNS):
+    """Devuelve {ruta: (mtime_ns, tamaño)} de los archivos observados"""
+    state = {}
+    for pattern in patterns:
+        for path in Path(root).glob(pattern):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            state[os.path.realpath(path)] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def _changed(before, after):
+    paths = set(before) | set(after)
+    return {path for path in paths if before.get(path) != after.get(path)}
+
+
+def watch(on_change, root, patterns=WATCH_PATTERNS, interval=0.5, debounce=0.3):
+    """Llama a on_change(rutas) cada vez que cambian archivos observados
+
+    Una ráfaga de guardados (archivo temporal, renombrado, formateo al
+    guardar) se agrupa en una sola llamada: se espera hasta que pasen
+    `debounce` segundos sin cambios nuevos.
+    """
+    print(f"\n👀 Observando {root} (Ctrl+C para salir)...")
+    state = scan(root, patterns)
+    try:
+        while True:
+            time.sleep(interval)
+            current = scan(root, patterns)
+            changed = _changed(state, current)
+            if not changed:
+                continue
+
+            while True:
+                time.sleep(debounce)
+                latest = scan(root, patterns)
+                more = _changed(current, latest)
+                if not more:
+                    break
+                changed |= more
+                current = latest
+
+            state = current
+            on_change(sorted(changed))
+    except KeyboardInterrupt:
+        print("\n👋 Watch detenido")
+
+
+def watch_documents(configs, rebuild, root, patterns=WATCH_PATTERNS, **kwargs):
+    """Observa las fuentes y llama a rebuild(configs) solo con los documentos afectados"""
+    def on_change(paths):
+        paths = set(paths)
+        affected = [c for c in configs if os.path.realpath(c["input"]) in paths]
+        if affected:
+            print(f"\n🔄 Cambios en {len(affected)} documento(s)")
+            rebuild(affected)
+
+    watch(on_change, root, patterns, **kwargs)
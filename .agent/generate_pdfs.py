@@ -4,15 +4,51 @@ Generador de PDFs Profesionales para Guías de Usuario EBI 360
 Convierte los archivos Markdown a PDFs con diseño profesional
 """
 
+import atexit
 import os
+import shutil
 import subprocess
 from pathlib import Path
 
+from ebi_docs.assets import prune_assets, publish_stylesheet, theme_sources
+from ebi_docs.compress import MINIFY_SOURCES, open_minified, publish_compressed, report
+from ebi_docs.build import build_parser, run_incremental
+from ebi_docs.fonts import corpus_files, font_charset, font_rule, publish_font
+from ebi_docs.layout import get_layout, layout_sources
+from ebi_docs.manifest import CACHE_DIR, Manifest
+from ebi_docs.watch import watch_documents
+from ebi_docs.latex import build_pdf, ENGINE as LATEX_ENGINE
+from ebi_docs.markdown import ENGINE_SOURCES
+from ebi_docs.pdf import BACKENDS, get_backend
+
+from ebi_docs.pandoc import (
+    DEFAULT_SERVER_URL,
+    PANDOC_SOURCES,
+    PandocServer,
+    ast_to_file,
+    ast_to_html,
+    markdown_ast,
+    pandoc_version,
+    prepare,
+    server as pandoc_server,
+    start_server,
+    use_server,
+)
+
+import generate_html_guides
+from generate_html_guides import create_professional_html
+
 # Configuración
 WORKSPACE = "/Users/leandrofierro/Workspaces/ebi-360"
 AGENT_DIR = f"{WORKSPACE}/.agent"
 OUTPUT_DIR = f"{AGENT_DIR}/pdfs"
 
+# Layout de las versiones HTML que arma pandoc (CSS en línea, sin la hoja del tema)
+PANDOC_LAYOUT = "pandoc"
+
+# HTML intermedio para los backends de PDF en proceso
+PDF_HTML_DIR = CACHE_DIR / "pdf-html"
+
 # Crear directorio de salida
 Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
 
@@ -38,6 +74,8 @@ files_to_convert = [
 
 def check_pandoc():
     """Verifica si pandoc está instalado"""
+    if pandoc_server():
+        return True
     try:
         subprocess.run(["pandoc", "--version"], capture_output=True, check=True)
         return True
@@ -61,11 +99,8 @@ def create_pdf_with_pandoc(config):
     input_file = config["input"]
     output_file = config["output"]
     
-    # Configuración de pandoc
+    # Configuración de pandoc (escritura desde el AST cacheado)
     pandoc_args = [
-        "pandoc",
-        input_file,
-        "-o", output_file,
         "--pdf-engine=xelatex",
         "--toc",  # Tabla de contenidos
         "--toc-depth=3",
@@ -86,8 +121,12 @@ def create_pdf_with_pandoc(config):
     
     try:
         print(f"📄 Generando {output_file}...")
-        subprocess.run(pandoc_args, check=True, capture_output=True)
-        print(f"✅ PDF generado: {output_file}")
+        if config.get("latex_cache"):
+            passes = build_pdf(markdown_ast(input_file), input_file, output_file, pandoc_args)
+            print(f"✅ PDF generado: {output_file} ({passes} pasada(s) de LaTeX)")
+        else:
+            ast_to_file(markdown_ast(input_file), output_file, pandoc_args)
+            print(f"✅ PDF generado: {output_file}")
         return True
     except subprocess.CalledProcessError as e:
         print(f"❌ Error al generar PDF: {e.stderr.decode()}")
@@ -99,223 +138,33 @@ def create_html_version(config):
     input_file = config["input"]
     output_file = config["output"].replace(".pdf", ".html")
     
-    # HTML template con diseño profesional
-    html_template = """
-<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700;900&display=swap');
-        
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-            line-height: 1.6;
-            color: #1f2937;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 2rem;
-        }}
-        
-        .container {{
-            max-width: 900px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 24px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            overflow: hidden;
-        }}
-        
-        .cover {{
-            background: {cover_color};
-            background: linear-gradient(135deg, {cover_color} 0%, #764ba2 100%);
-            color: white;
-            padding: 4rem 3rem;
-            text-align: center;
-        }}
-        
-        .cover h1 {{
-            font-size: 2.5rem;
-            font-weight: 900;
-            margin-bottom: 1rem;
-            text-shadow: 0 2px 10px rgba(0,0,0,0.2);
-        }}
-        
-        .cover p {{
-            font-size: 1.25rem;
-            opacity: 0.95;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .cover .date {{
-            font-size: 0.9rem;
-            opacity: 0.8;
-            margin-top: 2rem;
-        }}
-        
-        .content {{
-            padding: 3rem;
-        }}
-        
-        h1, h2, h3, h4 {{
-            color: #111827;
-            margin-top: 2rem;
-            margin-bottom: 1rem;
-            font-weight: 700;
-        }}
-        
-        h1 {{ font-size: 2rem; border-bottom: 3px solid {cover_color}; padding-bottom: 0.5rem; }}
-        h2 {{ font-size: 1.5rem; color: {cover_color}; }}
-        h3 {{ font-size: 1.25rem; }}
-        
-        p {{
-            margin-bottom: 1rem;
-        }}
-        
-        ul, ol {{
-            margin-left: 2rem;
-            margin-bottom: 1rem;
-        }}
-        
-        li {{
-            margin-bottom: 0.5rem;
-        }}
-        
-        code {{
-            background: #f3f4f6;
-            padding: 0.2rem 0.4rem;
-            border-radius: 4px;
-            font-family: 'Monaco', 'Courier New', monospace;
-            font-size: 0.9em;
-        }}
-        
-        pre {{
-            background: #1f2937;
-            color: #f3f4f6;
-            padding: 1.5rem;
-            border-radius: 12px;
-            overflow-x: auto;
-            margin-bottom: 1.5rem;
-        }}
-        
-        pre code {{
-            background: none;
-            color: inherit;
-            padding: 0;
-        }}
-        
-        blockquote {{
-            border-left: 4px solid {cover_color};
-            padding-left: 1.5rem;
-            margin: 1.5rem 0;
-            font-style: italic;
-            color: #4b5563;
-        }}
-        
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 1.5rem 0;
-        }}
-        
-        th, td {{
-            padding: 0.75rem;
-            text-align: left;
-            border-bottom: 1px solid #e5e7eb;
-        }}
-        
-        th {{
-            background: #f9fafb;
-            font-weight: 700;
-            color: {cover_color};
-        }}
-        
-        .toc {{
-            background: #f9fafb;
-            padding: 2rem;
-            border-radius: 12px;
-            margin-bottom: 2rem;
-        }}
-        
-        .toc h2 {{
-            margin-top: 0;
-        }}
-        
-        .toc ul {{
-            list-style: none;
-            margin-left: 0;
-        }}
-        
-        .toc a {{
-            color: {cover_color};
-            text-decoration: none;
-        }}
-        
-        .toc a:hover {{
-            text-decoration: underline;
-        }}
-        
-        @media print {{
-            body {{
-                background: white;
-                padding: 0;
-            }}
-            
-            .container {{
-                box-shadow: none;
-                border-radius: 0;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="cover">
-            <h1>{title}</h1>
-            <p>{subtitle}</p>
-            <p class="date">Diciembre 2025 • Versión 1.0</p>
-        </div>
-        <div class="content">
-            {content}
-        </div>
-    </div>
-</body>
-</html>
-"""
+    if not config.get("pandoc", True):
+        # Sin pandoc: mismo HTML que generate_html_guides.py, con el motor propio
+        create_professional_html(
+            input_file,
+            output_file,
+            config["title"],
+            config["subtitle"],
+            config["cover_color"],
+            stylesheet=config.get("stylesheet"),
+        )
+        print(f"✅ HTML generado: {output_file}")
+        return True
     
     try:
-        # Leer el markdown
-        with open(input_file, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
-        
-        # Convertir markdown a HTML usando pandoc
-        result = subprocess.run(
-            ["pandoc", "-f", "markdown", "-t", "html"],
-            input=markdown_content.encode(),
-            capture_output=True,
-            check=True
-        )
-        
-        html_content = result.stdout.decode()
-        
-        # Crear HTML completo
-        final_html = html_template.format(
-            title=config['title'],
-            subtitle=config['subtitle'],
-            cover_color=config['cover_color'],
-            content=html_content
-        )
-        
-        # Guardar HTML
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(final_html)
+        # Convertir a HTML desde el AST (el mismo que usa el PDF)
+        html_content = ast_to_html(markdown_ast(input_file))
+        
+        # HTML completo y minificado con el layout de pandoc (sin tocar el archivo si no cambió)
+        with open_minified(output_file) as out:
+            get_layout(PANDOC_LAYOUT).render(
+                out,
+                title=config['title'],
+                subtitle=config['subtitle'],
+                cover_color=config['cover_color'],
+                font_face=config.get("font_face", ""),
+                content=html_content,
+            )
         
         print(f"✅ HTML generado: {output_file}")
         return True
@@ -324,41 +173,211 @@ def create_html_version(config):
         print(f"❌ Error al generar HTML: {e}")
         return False
 
+def create_pdf_from_html(config):
+    """Crea PDF dentro del proceso a partir del HTML de create_professional_html"""
+    
+    output_file = config["output"]
+    html_file = PDF_HTML_DIR / f"{Path(output_file).stem}.html"
+    
+    try:
+        print(f"📄 Generando {output_file} ({config['backend']})...")
+        PDF_HTML_DIR.mkdir(parents=True, exist_ok=True)
+        create_professional_html(
+            config["input"],
+            html_file,
+            config["title"],
+            config["subtitle"],
+            config["cover_color"],
+            stylesheet=config.get("stylesheet"),
+        )
+        get_backend(config["backend"]).write_pdf(html_file, output_file)
+        print(f"✅ PDF generado: {output_file}")
+        return True
+    except Exception as e:
+        print(f"❌ Error al generar PDF: {e}")
+        return False
+
+def pdf_step(config, backend, latex_cache=False):
+    return dict(config, step="pdf", backend=backend, latex_cache=latex_cache)
+
+def html_step(config, use_pandoc=True):
+    return dict(config, step="html", pandoc=use_pandoc, output=config["output"].replace(".pdf", ".html"))
+
+def build_step(step):
+    """Ejecuta un paso de build ("pdf" o "html") para una guía (se ejecuta en el pool)"""
+    if step["step"] == "pdf":
+        if step["backend"] == "pandoc":
+            return create_pdf_with_pandoc(step)
+        return create_pdf_from_html(step)
+    return create_html_version(step)
+
+def uses_pandoc(step):
+    if step["step"] == "pdf":
+        return step["backend"] == "pandoc"
+    return step["pandoc"]
+
+def with_assets(steps):
+    """Etapa de assets: CSS del tema e Inter local donde se escribe HTML
+
+    Las versiones HTML van a OUTPUT_DIR y el HTML intermedio de los backends
+    en proceso a PDF_HTML_DIR; las dos carpetas reciben los mismos archivos,
+    así que el href es el mismo. El template de pandoc lleva su CSS en línea
+    y solo necesita el @font-face (o el @import de Google Fonts).
+
+    Cada paso recibe solo el asset que usa, porque la config forma parte de
+    su clave de build: el PDF de pandoc no usa ninguno y no tiene que
+    rehacerse cuando cambia el CSS o la fuente.
+    """
+    corpus = corpus_files(AGENT_DIR)
+    theme = generate_html_guides.THEME
+    stylesheet = publish_stylesheet(theme, OUTPUT_DIR, corpus)
+    publish_stylesheet(theme, PDF_HTML_DIR, corpus)
+    font = publish_font(OUTPUT_DIR, font_charset(corpus))
+    face = font_rule(f"assets/{font}" if font else None)
+
+    result = []
+    for step in steps:
+        if not uses_pandoc(step):
+            step = dict(step, stylesheet=stylesheet)
+        elif step["step"] == "html":
+            step = dict(step, font_face=face)
+        result.append(step)
+    return result
+
+def run_steps(steps, args):
+    """Corre los pasos que cambiaron en paralelo y devuelve cuántos están al día, por tipo"""
+    # Parsear cada guía una sola vez, en paralelo, antes de repartir los pasos;
+    # los errores de parseo los reporta después el paso correspondiente
+    inputs = sorted({step["input"] for step in steps if uses_pandoc(step)})
+    if inputs:
+        prepare(inputs, args.jobs)
+    
+    steps = with_assets(steps)
+    # Otra versión de pandoc puede dar otra salida con la misma fuente
+    steps = [dict(step, pandoc_version=pandoc_version()) if uses_pandoc(step) else step for step in steps]
+    manifest = Manifest.for_generator("generate_pdfs")
+    template_sources = [__file__, generate_html_guides.__file__, *ENGINE_SOURCES, *MINIFY_SOURCES, *PANDOC_SOURCES,
+                        *theme_sources(generate_html_guides.THEME),
+                        *layout_sources(generate_html_guides.LAYOUT), *layout_sources(PANDOC_LAYOUT)]
+    results, skipped = run_incremental(build_step, steps, manifest, template_sources, args.jobs, args.force)
+    
+    done = {"pdf": 0, "html": 0}
+    for step in skipped:
+        print(f"⏭️  Sin cambios: {step['output']}")
+        done[step["step"]] += 1
+    for step, ok, error in results:
+        if error:
+            print(f"❌ Error en {step['step'].upper()} de {step['title']}: {error}")
+        elif ok:
+            done[step["step"]] += 1
+    
+    # Etapa posterior: las versiones HTML, con .gz/.br y en el manifest de assets
+    pages = [step["output"] for step in skipped if step["step"] == "html"]
+    pages += [step["output"] for step, ok, error in results if step["step"] == "html" and ok and not error]
+    if pages:
+        entries = publish_compressed(OUTPUT_DIR, pages)
+        print(report(entries, [os.path.basename(page) for page in pages]))
+    # El HTML intermedio de los PDFs no pasa por publish_compressed
+    prune_assets(PDF_HTML_DIR)
+    return done
+
+def watch_steps(steps, args):
+    """En modo --watch, rehace solo los pasos de las guías que se editaron"""
+    if args.watch:
+        watch_documents(steps, lambda changed: run_steps(changed, args), AGENT_DIR)
+
+def connect_pandoc_server(args):
+    """Usa un `pandoc server` local si hay uno (o se puede levantar); si no, subprocess"""
+    if args.subprocess:
+        return
+    if PandocServer(args.pandoc_server).available():
+        use_server(args.pandoc_server)
+        print(f"🔌 Usando pandoc server en {args.pandoc_server}")
+        return
+    process = start_server(args.pandoc_server)
+    if process:
+        atexit.register(process.terminate)
+        use_server(args.pandoc_server)
+        print(f"🔌 pandoc server iniciado en {args.pandoc_server}")
+
+def choose_pdf_backend(name, has_pandoc):
+    """Resuelve --pdf-backend; None si no hay ninguna forma de generar PDFs"""
+    if name != "auto":
+        return name
+    if has_pandoc and shutil.which(LATEX_ENGINE):
+        return "pandoc"
+    backend = get_backend()
+    if backend:
+        return backend.name
+    return "pandoc" if has_pandoc else None
+
 def main():
+    parser = build_parser("Genera los PDFs y versiones HTML de las guías")
+    parser.add_argument(
+        "--pandoc-server",
+        metavar="URL",
+        default=DEFAULT_SERVER_URL,
+        help="Servidor pandoc a usar (o levantar) para las conversiones",
+    )
+    parser.add_argument(
+        "--subprocess",
+        action="store_true",
+        help="No usar pandoc server: un proceso de pandoc por conversión",
+    )
+    parser.add_argument(
+        "--no-latex-cache",
+        action="store_true",
+        help="Compilar el PDF con pandoc --pdf-engine sin reutilizar .tex/.aux/.toc",
+    )
+    parser.add_argument(
+        "--pdf-backend",
+        choices=["auto", "pandoc", *BACKENDS],
+        default="auto",
+        help="Cómo generar el PDF (auto: pandoc+xelatex si están, si no un backend en proceso)",
+    )
+    parser.add_argument(
+        "--install-pandoc",
+        action="store_true",
+        help="Intentar instalar pandoc con homebrew si no está",
+    )
+    args = parser.parse_args()
+    
     print("🚀 Generador de PDFs Profesionales - EBI 360")
     print("=" * 60)
+    connect_pandoc_server(args)
     
-    # Verificar pandoc
-    if not check_pandoc():
-        print("⚠️  Pandoc no está instalado")
-        response = input("¿Deseas instalarlo ahora? (s/n): ")
-        if response.lower() == 's':
-            if not install_pandoc():
-                print("❌ No se pudo instalar pandoc")
-                print("💡 Generando versiones HTML como alternativa...")
-                for config in files_to_convert:
-                    create_html_version(config)
-                return
-        else:
-            print("💡 Generando versiones HTML como alternativa...")
-            for config in files_to_convert:
-                create_html_version(config)
-            return
+    # Verificar pandoc (sin preguntar: el script corre también en CI)
+    has_pandoc = check_pandoc()
+    if not has_pandoc and args.install_pandoc:
+        has_pandoc = install_pandoc()
+    if not has_pandoc:
+        print("⚠️  Pandoc no está instalado: las versiones HTML se generan con el motor propio")
     
-    # Generar PDFs
-    print("\n📄 Generando PDFs...")
-    success_count = 0
+    html_steps = [html_step(config, has_pandoc) for config in files_to_convert]
+    backend = choose_pdf_backend(args.pdf_backend, has_pandoc)
+    if backend is None:
+        print("⚠️  No hay backend de PDF disponible (pandoc, xhtml2pdf o weasyprint)")
+        print("💡 Generando versiones HTML como alternativa...")
+        run_steps(html_steps, args)
+        watch_steps(html_steps, args)
+        return
     
-    for config in files_to_convert:
-        if create_pdf_with_pandoc(config):
-            success_count += 1
-        # También crear versión HTML
-        create_html_version(config)
+    # Generar PDFs y, en paralelo, también la versión HTML de cada guía
+    print(f"\n📄 Generando PDFs ({backend})...")
+    # Con xelatex disponible se compila en el cache de LaTeX de cada guía
+    latex_cache = not args.no_latex_cache and shutil.which(LATEX_ENGINE) is not None
+    steps = []
+    for config, html in zip(files_to_convert, html_steps):
+        steps.append(pdf_step(config, backend, latex_cache))
+        steps.append(html)
+    success_count = run_steps(steps, args)["pdf"]
     
     print("\n" + "=" * 60)
     print(f"✅ Proceso completado: {success_count}/{len(files_to_convert)} PDFs generados")
     print(f"📁 Archivos guardados en: {OUTPUT_DIR}")
     print("\n💡 También se generaron versiones HTML para visualización web")
+    
+    watch_steps(steps, args)
 
 if __name__ == "__main__":
     main()
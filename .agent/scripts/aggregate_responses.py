@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Agregados de puntajes por empresa, área y dominio
+Reparte el export de survey_responses en rangos entre varios procesos; cada
+uno lee su rango y devuelve agregados parciales (n, suma, suma de cuadrados, bandas e
+histograma para P10/mediana/P90) que se combinan en un solo reporte
+
+Con --incremental los agregados se guardan por encuesta y versión en
+.agent/.cache/aggregates y cada corrida suma solo los resultados posteriores
+a la marca de agua (answered_at o created_at) de la corrida anterior
+"""
+
+import argparse
+import os
+import time
+
+from ebi_surveys.aggregate import DEFAULT_RESOLUTION, aggregate_sharded
+from ebi_surveys.incremental import IncrementalState, state_path
+from ebi_surveys.logic_ts import load_questions
+from ebi_surveys.streaming import DEFAULT_CHUNK_SIZE, write_rows
+from generate_initial_survey_sql import LOGIC_TS, WORKSPACE
+from score_responses import load_plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agrega los puntajes de un export de survey_responses")
+    parser.add_argument("input", help="Export en CSV o Parquet (formato ancho q0..qN o largo)")
+    parser.add_argument("-o", "--output", help="CSV de salida (por defecto <input>_aggregates.csv)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Procesos en paralelo (por defecto, uno por CPU)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Filas por bloque de lectura")
+    parser.add_argument("--algorithm", help="JSON con el calculation_algorithm (por defecto el de EBI 360)")
+    parser.add_argument("--logic", default=LOGIC_TS, help="logic.ts con las preguntas")
+    parser.add_argument("--resolution", type=float, default=DEFAULT_RESOLUTION,
+                        help="Ancho de bin de los percentiles en la escala 0-10; error de a lo sumo la mitad "
+                             f"(por defecto {DEFAULT_RESOLUTION}: exactos)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Sumar solo lo nuevo desde la última corrida al estado guardado")
+    parser.add_argument("--state", help="Archivo de estado (por defecto .agent/.cache/aggregates/<código>-v<versión>.json)")
+    parser.add_argument("--rebuild", action="store_true", help="Con --incremental, descartar el estado y empezar de cero")
+    args = parser.parse_args()
+
+    questions = load_questions(args.logic)
+    plan = load_plan(args.algorithm, questions)
+    output = args.output or f"{os.path.splitext(args.input)[0]}_aggregates.csv"
+
+    if args.incremental or args.state:
+        incremental(args, plan, output)
+        return
+
+    jobs = args.jobs or os.cpu_count() or 1
+    print(f"🧮 Agregando {args.input} con {jobs} proceso(s)...")
+    start = time.perf_counter()
+    partial = aggregate_sharded(args.input, plan, jobs, args.chunk_size, args.resolution)
+    write_rows(output, partial.rows())
+
+    companies = {company for company, _ in partial.groups}
+    print(f"✅ {len(companies)} empresa(s), {len(partial.groups)} grupo(s) en {time.perf_counter() - start:.2f}s")
+    print(f"   📄 {os.path.relpath(output, WORKSPACE)}")
+
+
+def incremental(args, plan, output):
+    """Actualiza el estado guardado con los resultados nuevos del export"""
+    path = args.state or state_path(plan)
+    if args.rebuild:
+        state = IncrementalState(plan, resolution=args.resolution)
+    else:
+        state = IncrementalState.load(plan, path, args.resolution)
+    since = state.watermark
+
+    print(f"🔁 Actualizando {os.path.basename(path)} desde {since.isoformat() if since else 'el inicio'}...")
+    start = time.perf_counter()
+    added = state.update(args.input, args.chunk_size)
+    state.save(path)
+    write_rows(output, state.partial.rows())
+
+    print(f"✅ {added} resultado(s) nuevo(s), {len(state.partial.groups)} grupo(s) en {time.perf_counter() - start:.2f}s")
+    if state.watermark:
+        print(f"   ⏱️  Próximo export: WHERE answered_at >= '{state.watermark.isoformat()}+00'")
+    print(f"   📄 {os.path.relpath(output, WORKSPACE)}")
+
+
+if __name__ == "__main__":
+    main()
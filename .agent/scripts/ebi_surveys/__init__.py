@@ -0,0 +1,3 @@
+"""
+Herramientas compartidas para cargar y calcular las encuestas de EBI 360
+"""
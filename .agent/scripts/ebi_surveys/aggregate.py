@@ -0,0 +1,210 @@
+"""
+Agregados parciales combinables por empresa, área y dominio
+
+Cada Partial guarda, por clave (company_id, area_id) y por columna (los
+dominios del plan y el puntaje global): cantidad, suma, suma de cuadrados
+e histograma de bandas. Dos Partial se combinan sumando, así que se pueden
+calcular por separado (por proceso, por archivo, por período) y juntar
+después. Cada resultado suma también a la clave (company_id, "*"), el total
+de la empresa sin importar el área.
+
+Los puntajes ya vienen redondeados a un decimal, así que la suma se guarda
+en décimas y la suma de cuadrados en centésimas, como enteros: el resultado
+es exacto y no depende del orden en que se juntan bloques, shards o
+períodos.
+
+Para los percentiles (P10, mediana, P90) cada columna lleva además un
+histograma de ancho fijo `resolution` sobre la escala 0-10: es un sketch de
+cuantiles combinable (se suma como el resto) y de una sola pasada, con error
+de a lo sumo resolution / 2 en el valor. Los puntajes ya vienen redondeados
+a un decimal, así que con la resolución por defecto (0.1) los percentiles
+son exactos.
+
+aggregate_sharded reparte el export en rangos contiguos (de bytes en CSV,
+de filas en Parquet) que no parten ningún resultado; cada worker lee,
+puntúa y agrega su rango y devuelve solo su Partial, que el proceso
+principal suma. Como la suma es exacta, da lo mismo que dos rangos tengan
+filas de la misma empresa.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ebi_surveys.scoring import round_half_up, score_answers
+from ebi_surveys.streaming import (
+    DEFAULT_CHUNK_SIZE, GROUP_COLUMN, answered_domains, group_sums, iter_answer_chunks, split_ranges, tenths_mean,
+)
+
+AREA_COLUMN = "area_id"
+ALL_AREAS = "*"
+GLOBAL = "global"
+
+MAX_SCORE = 10
+DEFAULT_RESOLUTION = 0.1
+PERCENTILES = (10, 50, 90)
+
+# Campos de cada grupo; todos se combinan sumando
+FIELDS = ("count", "sum", "sumsq", "bands", "hist")
+
+
+def _labels(values, n):
+    """Etiquetas como arreglo de strings de NumPy ('' si falta el valor)"""
+    if values is None:
+        return np.full(n, "")
+    values = np.asarray(values)
+    if values.dtype.kind == "U":
+        return values
+    return np.array(["" if v is None else v for v in values.tolist()], dtype=object).astype(str)
+
+
+class Partial:
+    """Estado combinable por (empresa, área) y columna (dominios + global)"""
+
+    def __init__(self, plan, resolution=DEFAULT_RESOLUTION):
+        if not 0 < resolution <= MAX_SCORE:
+            raise ValueError(f"La resolución de los percentiles tiene que estar entre 0 y {MAX_SCORE}")
+        self.plan = plan
+        self.resolution = resolution
+        self.n_bins = int(round(MAX_SCORE / resolution)) + 1
+        self.columns = (*plan.domains, GLOBAL)
+        self.groups = {}
+
+    def _group(self, key):
+        group = self.groups.get(key)
+        if group is None:
+            k, b = len(self.columns), len(self.plan.band_names)
+            group = self.groups[key] = {
+                "count": np.zeros(k, dtype=np.int64),
+                "sum": np.zeros(k, dtype=np.int64),
+                "sumsq": np.zeros(k, dtype=np.int64),
+                "bands": np.zeros((k, b), dtype=np.int64),
+                "hist": np.zeros((k, self.n_bins), dtype=np.int64),
+            }
+        return group
+
+    def add_scores(self, companies, areas, scores, answered):
+        """Agrega un bloque puntuado; answered es la matriz N×D de dominios respondidos"""
+        n = len(scores.global_score)
+        values = np.column_stack([round_half_up(scores.domain), round_half_up(scores.global_score)])
+        valid = np.column_stack([answered, np.ones(n, dtype=bool)])
+        bands = np.column_stack([scores.domain_bands, scores.global_bands])
+
+        # Códigos enteros de empresa y área: np.unique sobre strings de NumPy
+        # es mucho más rápido que sobre objetos o sobre claves concatenadas
+        companies, company_code = np.unique(_labels(companies, n), return_inverse=True)
+        areas, area_code = np.unique(_labels(areas, n), return_inverse=True)
+        areas = [*areas.tolist(), ALL_AREAS]
+        # Cada fila suma a su área y al total de la empresa (última área)
+        width = len(areas)
+        codes = np.concatenate([company_code * width + area_code, company_code * width + width - 1])
+        groups, inverse = np.unique(codes, return_inverse=True)
+        keys = [(companies[g // width], areas[g % width]) for g in groups.tolist()]
+        self.add(keys, inverse, np.vstack([values, values]), np.vstack([valid, valid]), np.vstack([bands, bands]))
+
+    def add(self, keys, inverse, values, valid, bands):
+        """Suma filas ya agrupadas: inverse[i] es el índice en keys de la fila i"""
+        n_groups, k = len(keys), values.shape[1]
+        n_bands = len(self.plan.band_names)
+        weights = valid.astype(np.float64)
+
+        count = group_sums(inverse, n_groups, weights)
+        tenths = np.rint(values * 10)
+        total = group_sums(inverse, n_groups, tenths * weights)
+        sumsq = group_sums(inverse, n_groups, tenths * tenths * weights)
+        # Histograma: un bincount sobre (grupo, columna, banda)
+        slots = (inverse[:, None] * k + np.arange(k)) * n_bands + bands
+        hist = np.bincount(slots.ravel(), weights=weights.ravel(), minlength=n_groups * k * n_bands)
+        hist = hist.reshape(n_groups, k, n_bands)
+        # Sketch de cuantiles: el mismo bincount sobre (grupo, columna, bin de valor)
+        bins = np.clip(np.floor(values / self.resolution + 0.5), 0, self.n_bins - 1).astype(np.int64)
+        slots = (inverse[:, None] * k + np.arange(k)) * self.n_bins + bins
+        sketch = np.bincount(slots.ravel(), weights=weights.ravel(), minlength=n_groups * k * self.n_bins)
+        sketch = sketch.reshape(n_groups, k, self.n_bins)
+
+        for g, key in enumerate(keys):
+            group = self._group((str(key[0]), str(key[1])))
+            group["count"] += count[g].astype(np.int64)
+            group["sum"] += total[g].astype(np.int64)
+            group["sumsq"] += sumsq[g].astype(np.int64)
+            group["bands"] += hist[g].astype(np.int64)
+            group["hist"] += sketch[g].astype(np.int64)
+
+    def merge(self, other):
+        """Suma otro Partial del mismo plan (y la misma resolución) a este"""
+        if other.n_bins != self.n_bins:
+            raise ValueError("No se pueden combinar agregados con distinta resolución de percentiles")
+        for key, theirs in other.groups.items():
+            ours = self._group(key)
+            for field in FIELDS:
+                ours[field] += theirs[field]
+        return self
+
+    def percentiles(self, hist, count):
+        """Percentiles de rango más cercano (el primer bin que acumula q% de los casos)"""
+        cumulative = np.cumsum(hist)
+        ranks = np.ceil(np.asarray(PERCENTILES) / 100 * count).clip(1, None)
+        return np.searchsorted(cumulative, ranks) * self.resolution
+
+    def rows(self):
+        """Una fila por (empresa, área): n, promedio, desvío y bandas por columna"""
+        for key in sorted(self.groups):
+            group = self.groups[key]
+            row = {GROUP_COLUMN: key[0], AREA_COLUMN: key[1]}
+            for c, name in enumerate(self.columns):
+                n = int(group["count"][c])
+                total, sumsq = int(group["sum"][c]), int(group["sumsq"][c])
+                row[f"{name}_n"] = n
+                row[f"{name}_mean"] = tenths_mean(total, n) if n else None
+                if n > 1:
+                    variance = max(sumsq - total * total / n, 0.0) / (n - 1) / 100
+                    row[f"{name}_std"] = round(float(np.sqrt(variance)), 2)
+                else:
+                    row[f"{name}_std"] = None
+                quantiles = self.percentiles(group["hist"][c], n) if n else [None] * len(PERCENTILES)
+                for p, value in zip(PERCENTILES, quantiles):
+                    row[f"{name}_p{p}"] = None if value is None else round(float(value), 2)
+                for b, band in enumerate(self.plan.band_names):
+                    row[f"{name}_{band}"] = int(group["bands"][c, b])
+            yield row
+
+
+def aggregate_chunk(partial, ids, answers):
+    """Puntúa un bloque (ids, respuestas) y lo agrega a partial"""
+    scores = score_answers(answers, partial.plan)
+    partial.add_scores(ids.get(GROUP_COLUMN), ids.get(AREA_COLUMN), scores, answered_domains(answers, partial.plan))
+
+
+def aggregate_stream(path, plan, chunk_size=DEFAULT_CHUNK_SIZE, resolution=DEFAULT_RESOLUTION):
+    """Agregado en un solo proceso (el mismo resultado que aggregate_sharded)"""
+    partial = Partial(plan, resolution)
+    for ids, answers in iter_answer_chunks(path, plan.weight.size, chunk_size):
+        aggregate_chunk(partial, ids, answers)
+    return partial
+
+
+def _aggregate_part(path, plan, part, chunk_size, resolution):
+    """Worker: lee, puntúa y agrega su rango del export; devuelve solo los grupos"""
+    partial = Partial(plan, resolution)
+    for ids, answers in iter_answer_chunks(path, plan.weight.size, chunk_size, part):
+        aggregate_chunk(partial, ids, answers)
+    return partial.groups
+
+
+def aggregate_sharded(path, plan, jobs=None, chunk_size=DEFAULT_CHUNK_SIZE, resolution=DEFAULT_RESOLUTION):
+    """Agregado del export repartido en rangos entre `jobs` procesos"""
+    jobs = jobs or os.cpu_count() or 1
+    parts = split_ranges(path, jobs) if jobs > 1 else [None]
+    if len(parts) <= 1:
+        return aggregate_stream(path, plan, chunk_size, resolution)
+
+    result = Partial(plan, resolution)
+    # Si un worker muere, future.result() lanza BrokenProcessPool en lugar de esperar para siempre
+    with ProcessPoolExecutor(max_workers=len(parts)) as pool:
+        futures = [pool.submit(_aggregate_part, str(path), plan, part, chunk_size, resolution) for part in parts]
+        for future in futures:
+            theirs = Partial(plan, resolution)
+            theirs.groups = future.result()
+            result.merge(theirs)
+    return result
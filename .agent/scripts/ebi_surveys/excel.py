@@ -0,0 +1,392 @@
+"""
+Importador de encuestas desde la plantilla de Excel (Metadata / Questions / Algorithm)
+
+Sigue el formato de GUIA-FORMATO-EXCEL-ENCUESTAS.md y los mismos nombres de
+columna que acepta src/lib/surveys/parser.ts. También acepta la plantilla
+oficial (public/docs/EBI360-Plantilla-Oficial.xlsx), igual que parser.ts: las
+preguntas en la hoja "Respuestas" sin columna "#" (se numeran desde 0 en el
+orden de las filas), País "Global" y un algoritmo sin "domains" (los dominios
+salen de las preguntas, con peso 1.0). El libro se abre con openpyxl
+en modo read-only: Metadata y la celda A1 de Algorithm se leen primero y las
+filas de Questions se validan y se entregan al emisor de SQL de a una, en
+una sola pasada, sin cargar la hoja completa en memoria.
+"""
+
+import json
+import re
+
+SURVEY_TYPES = ("base", "regulatory", "custom")
+QUESTION_TYPES = ("RP", "FO", "MIXED")
+
+# Campo de Metadata -> clave del dict de la encuesta
+METADATA_FIELDS = {
+    "Código": "code",
+    "Nombre": "name",
+    "Descripción": "description",
+    "Tipo": "survey_type",
+    "País": "country_code",
+    "Normativa": "regulation_name",
+    "Versión": "version",
+    "Es Base": "is_base",
+    "Es Obligatoria": "is_mandatory",
+}
+REQUIRED_METADATA = ("code", "name", "description", "survey_type", "version", "is_base", "is_mandatory")
+
+# Columna de survey_questions -> encabezados aceptados en la hoja Questions
+QUESTION_HEADERS = {
+    "question_number": ("#", "Número"),
+    "domain": ("Dominio",),
+    "construct": ("Constructo",),
+    "question_type": ("Tipo",),
+    "question_text": ("Pregunta",),
+    "weight": ("Peso", "PD_constructo"),
+    "severity": ("Severidad", "SR_constructo"),
+    "personal_weight": ("Peso_Personal", "Peso_personal"),
+    "org_weight": ("Peso_Org", "Peso_organizacional"),
+}
+WEIGHT_COLUMNS = ("weight", "severity", "personal_weight", "org_weight")
+# Columnas que pueden faltar: sin "#" las preguntas se numeran en orden
+OPTIONAL_COLUMNS = ("question_number", "construct")
+
+# País de la plantilla oficial para encuestas sin país
+GLOBAL_COUNTRIES = ("GLOBAL",)
+DEFAULT_DOMAIN_WEIGHT = 1.0
+
+CODE_RE = re.compile(r"^[A-Z0-9_]+$")
+COUNTRY_RE = re.compile(r"^[A-Z]{2}$")
+VERSION_RE = re.compile(r"^\d+\.\d+$")
+
+# Tolerancia para Peso_Personal + Peso_Org = 1.0 (celdas con decimales binarios)
+_EPSILON = 1e-6
+
+
+class SurveyValidationError(ValueError):
+    """El libro no cumple el formato; `errors` tiene un mensaje por problema"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("\n".join(self.errors))
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _yes_no(value, field, errors):
+    text = _text(value).upper()
+    if text not in ("SI", "NO"):
+        errors.append(f"Metadata: \"{field}\" debe ser SI o NO (valor: {value!r})")
+    return text == "SI"
+
+
+def read_metadata(sheet):
+    """Dict de la encuesta a partir de la hoja Metadata (columnas Campo / Valor)"""
+    errors = []
+    survey = {}
+    rows = sheet.iter_rows(values_only=True)
+    next(rows, None)  # encabezado
+    for row in rows:
+        if not row or row[0] is None:
+            continue
+        key = METADATA_FIELDS.get(_text(row[0]))
+        if key:
+            survey[key] = row[1] if len(row) > 1 else None
+
+    for key in REQUIRED_METADATA:
+        if _text(survey.get(key)) == "":
+            field = next(f for f, k in METADATA_FIELDS.items() if k == key)
+            errors.append(f"Metadata: falta el campo obligatorio \"{field}\"")
+
+    code = _text(survey.get("code"))
+    if code and not CODE_RE.match(code):
+        errors.append(f"Metadata: el código \"{code}\" debe ir en mayúsculas, sin espacios ni caracteres especiales")
+    survey["code"] = code
+
+    survey_type = _text(survey.get("survey_type")).lower()
+    if survey_type and survey_type not in SURVEY_TYPES:
+        errors.append(f"Metadata: tipo \"{survey_type}\" inválido (base, regulatory o custom)")
+    survey["survey_type"] = survey_type
+
+    country = _text(survey.get("country_code")).upper()
+    if country in GLOBAL_COUNTRIES:
+        country = ""
+    if country and not COUNTRY_RE.match(country):
+        errors.append(f"Metadata: país \"{country}\" no es un código ISO de 2 letras")
+    if country:
+        survey["country_code"] = country
+    else:
+        survey.pop("country_code", None)
+
+    if not _text(survey.get("regulation_name")):
+        survey.pop("regulation_name", None)
+
+    version = _text(survey.get("version"))
+    if version and not VERSION_RE.match(version):
+        errors.append(f"Metadata: versión \"{version}\" debe tener el formato X.Y")
+    survey["version"] = version
+
+    survey["name"] = _text(survey.get("name"))
+    survey["description"] = _text(survey.get("description"))
+    survey["is_base"] = _yes_no(survey.get("is_base"), "Es Base", errors)
+    survey["is_mandatory"] = _yes_no(survey.get("is_mandatory"), "Es Obligatoria", errors)
+    return survey, errors
+
+
+def read_algorithm(sheet):
+    """JSON de la celda A1 de la hoja Algorithm, validado por sí mismo"""
+    errors = []
+    cell = next(sheet.iter_rows(min_row=1, max_row=1, max_col=1, values_only=True), (None,))[0]
+    if cell is None:
+        return None, ["Algorithm: la celda A1 está vacía"]
+    try:
+        algorithm = json.loads(cell) if isinstance(cell, str) else cell
+    except ValueError as e:
+        return None, [f"Algorithm: el algoritmo no es un JSON válido ({e})"]
+    if not isinstance(algorithm, dict):
+        return None, [f"Algorithm: el algoritmo tiene que ser un objeto JSON, no {type(algorithm).__name__}"]
+
+    if not algorithm.get("scoring_method"):
+        errors.append("Algorithm: falta scoring_method")
+    # Sin "domains" (plantilla oficial) los dominios salen de las preguntas
+    domains = algorithm.get("domains", [])
+    if not isinstance(domains, list) or not all(isinstance(d, dict) for d in domains):
+        errors.append("Algorithm: \"domains\" tiene que ser una lista de objetos")
+        algorithm["domains"] = domains = []
+    elif "domains" in algorithm and not domains:
+        errors.append("Algorithm: no hay dominios definidos")
+
+    seen = {}
+    for domain in domains:
+        questions = domain.get("questions", [])
+        if not isinstance(questions, list):
+            errors.append(f"Algorithm: las preguntas de \"{domain.get('name')}\" tienen que ser una lista")
+            domain["questions"] = questions = []
+        for number in questions:
+            if number in seen:
+                errors.append(f"Algorithm: la pregunta #{number} está en \"{seen[number]}\" y en \"{domain.get('name')}\"")
+            seen[number] = domain.get("name")
+
+    thresholds = algorithm.get("thresholds") or {}
+    if not isinstance(thresholds, dict):
+        errors.append("Algorithm: \"thresholds\" tiene que ser un objeto")
+    elif list(thresholds.values()) != sorted(thresholds.values()):
+        errors.append("Algorithm: los thresholds deben estar en orden ascendente")
+    return algorithm, errors
+
+
+def domain_weight_warning(algorithm):
+    """La guía pide que con weighted_average los pesos de dominio sumen la cantidad
+    de dominios; su propio ejemplo de NOM-035 no lo cumple, así que es un aviso"""
+    domains = algorithm.get("domains") or []
+    if algorithm.get("scoring_method") != "weighted_average" or not domains:
+        return None
+    total = sum(d.get("weight", 1.0) for d in domains)
+    if abs(total - len(domains)) > _EPSILON:
+        return f"Algorithm: la suma de pesos de dominio ({total:g}) no es igual a la cantidad de dominios ({len(domains)})"
+    return None
+
+
+def _header_map(header):
+    names = [_text(h) for h in header]
+    index = {}
+    for column, aliases in QUESTION_HEADERS.items():
+        for alias in aliases:
+            if alias in names:
+                index[column] = names.index(alias)
+                break
+    return index
+
+
+def _question_rows(rows, index):
+    """(línea, {columna: valor}) de las filas no vacías de la hoja de preguntas"""
+    for line, row in enumerate(rows, 2):
+        if not any(v is not None and _text(v) for v in row):
+            continue
+        yield line, {c: (row[i] if i < len(row) else None) for c, i in index.items()}
+
+
+def derive_domains(sheet):
+    """Dominios de la hoja de preguntas, en orden de aparición, con peso 1.0
+
+    Es el respaldo de parser.ts para un algoritmo sin "domains". Recorre la
+    hoja una vez antes del stream de preguntas (solo guarda los números).
+    """
+    rows = sheet.iter_rows(values_only=True)
+    index = _header_map(next(rows, None) or ())
+    if "domain" not in index:
+        return []
+    domains = {}
+    for ordinal, (_, values) in enumerate(_question_rows(rows, index)):
+        number = values.get("question_number", ordinal)
+        try:
+            number = int(_number(number))
+        except (TypeError, ValueError):
+            continue  # el stream de preguntas reporta el error
+        name = _text(values["domain"])
+        if name:
+            domains.setdefault(name, []).append(number)
+    return [{"name": name, "weight": DEFAULT_DOMAIN_WEIGHT, "questions": numbers}
+            for name, numbers in domains.items()]
+
+
+def _number(value):
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, (int, float)):
+        return value
+    return float(_text(value).replace(",", "."))
+
+
+class QuestionStream:
+    """Iterable de filas (en el orden de sql.COLUMNS) validadas contra la guía
+
+    Se consume una sola vez. Los errores se acumulan en `errors` y, al
+    terminar, `finish()` agrega los chequeos cruzados con el algoritmo que
+    solo se pueden hacer después de ver todas las filas.
+    """
+
+    def __init__(self, sheet, algorithm):
+        self.sheet = sheet
+        self.errors = []
+        self.count = 0
+        self._first = None
+        self._last = None
+        self._domains = set()
+        self._assigned = {}
+        for domain in (algorithm or {}).get("domains", []):
+            for number in domain.get("questions", []):
+                self._assigned[number] = domain.get("name")
+        self._algorithm_domains = {d.get("name") for d in (algorithm or {}).get("domains", [])}
+
+    def __iter__(self):
+        rows = self.sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            self.errors.append("Questions: la hoja está vacía")
+            return
+        index = _header_map(header)
+        missing = [QUESTION_HEADERS[c][0] for c in QUESTION_HEADERS if c not in index and c not in OPTIONAL_COLUMNS]
+        if missing:
+            self.errors.append(f"Questions: faltan las columnas {', '.join(missing)}")
+            return
+
+        for ordinal, (line, values) in enumerate(_question_rows(rows, index)):
+            if "question_number" not in index:
+                # Sin columna "#": numeradas desde 0 en orden, como parser.ts
+                values["question_number"] = ordinal
+            result = self._validate(line, values)
+            if result:
+                yield result
+
+    def _validate(self, line, values):
+        errors = self.errors
+        try:
+            number = int(_number(values["question_number"]))
+        except (TypeError, ValueError):
+            errors.append(f"Questions fila {line}: número de pregunta inválido ({values['question_number']!r})")
+            return None
+        label = f"Pregunta #{number}"
+
+        if self._last is None:
+            if number not in (0, 1):
+                errors.append(f"{label}: la numeración debe empezar en 0 o 1")
+            self._first = number
+        elif number != self._last + 1:
+            errors.append(f"{label}: números no secuenciales o duplicados (la anterior es #{self._last})")
+        self._last = number
+
+        domain = _text(values["domain"])
+        if not domain:
+            errors.append(f"{label} no tiene dominio asignado (fila {line})")
+        elif self._algorithm_domains and domain not in self._algorithm_domains:
+            errors.append(f"{label}: el dominio \"{domain}\" no existe en el algoritmo")
+        self._domains.add(domain)
+
+        question_type = _text(values["question_type"]).upper()
+        if question_type not in QUESTION_TYPES:
+            errors.append(f"{label}: tipo \"{question_type}\" inválido (RP, FO o MIXED)")
+
+        text = _text(values["question_text"])
+        if not text:
+            errors.append(f"{label}: el texto de la pregunta está vacío")
+
+        weights = {}
+        for column in WEIGHT_COLUMNS:
+            try:
+                weights[column] = _number(values[column])
+            except (TypeError, ValueError):
+                errors.append(f"{label}: {QUESTION_HEADERS[column][0]} no es un número ({values[column]!r})")
+                continue
+            if not 0.0 <= weights[column] <= 1.0:
+                errors.append(f"{label}: {QUESTION_HEADERS[column][0]} ({weights[column]}) fuera de 0.0 - 1.0")
+
+        if "personal_weight" in weights and "org_weight" in weights:
+            total = weights["personal_weight"] + weights["org_weight"]
+            if abs(total - 1.0) > _EPSILON:
+                errors.append(f"{label} - Peso_Personal ({weights['personal_weight']}) + "
+                              f"Peso_Org ({weights['org_weight']}) ≠ 1.0")
+
+        if self._assigned and number not in self._assigned:
+            errors.append(f"{label} no está asignada a ningún dominio en el algoritmo")
+
+        if len(weights) < len(WEIGHT_COLUMNS):
+            return None
+        self.count += 1
+        construct = _text(values.get("construct")) or None
+        return (number, domain, construct, question_type, text,
+                weights["weight"], weights["severity"], weights["personal_weight"], weights["org_weight"], number)
+
+    def finish(self):
+        """Chequeos cruzados con el algoritmo; devuelve la lista completa de errores"""
+        if self.count == 0 and not self.errors:
+            self.errors.append("Questions: no hay preguntas")
+        if self._last is not None:
+            present = range(self._first, self._last + 1)
+            for number in sorted(n for n in self._assigned if n not in present):
+                self.errors.append(f"Algorithm: la pregunta #{number} no existe en Questions")
+        for domain in sorted(d for d in self._algorithm_domains - self._domains if d):
+            self.errors.append(f"Algorithm: el dominio \"{domain}\" no tiene preguntas")
+        return self.errors
+
+
+def _sheet(workbook, *names):
+    for name in names:
+        if name in workbook.sheetnames:
+            return workbook[name]
+    return None
+
+
+def open_workbook(path):
+    """Abre el libro en modo streaming (openpyxl read-only)"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("Para importar Excel hace falta openpyxl: pip install openpyxl") from e
+    return load_workbook(path, read_only=True, data_only=True)
+
+
+def import_survey(workbook):
+    """Lee Metadata y Algorithm y prepara el stream de preguntas
+
+    Devuelve (survey, questions, errors): survey es el dict que espera el
+    emisor de SQL, questions es un QuestionStream y errors son los problemas
+    ya encontrados en Metadata y Algorithm (las preguntas agregan los suyos en
+    questions.finish()).
+    """
+    errors = []
+    meta_sheet = _sheet(workbook, "Metadata")
+    questions_sheet = _sheet(workbook, "Questions", "Respuestas")
+    algorithm_sheet = _sheet(workbook, "Algorithm")
+    for sheet, name in ((meta_sheet, "Metadata"), (questions_sheet, "Questions"), (algorithm_sheet, "Algorithm")):
+        if sheet is None:
+            errors.append(f"No se encontró la hoja \"{name}\"")
+    if errors:
+        raise SurveyValidationError(errors)
+
+    survey, meta_errors = read_metadata(meta_sheet)
+    algorithm, algorithm_errors = read_algorithm(algorithm_sheet)
+    if algorithm is not None and "domains" not in algorithm:
+        algorithm["domains"] = derive_domains(questions_sheet)
+    survey["calculation_algorithm"] = algorithm
+    return survey, QuestionStream(questions_sheet, algorithm), meta_errors + algorithm_errors
+
@@ -0,0 +1,178 @@
+"""
+Agregados incrementales por empresa, versión de encuesta y dominio
+
+El estado de un Partial (cantidad, suma, suma de cuadrados, bandas e
+histograma de percentiles por empresa, área y dominio) se guarda en .agent/.cache/aggregates, un archivo
+por encuesta y versión, junto con una marca de agua: el answered_at (o
+created_at) más reciente ya agregado. Cada corrida puntúa y suma solo los
+resultados posteriores a la marca, así que regenerar el reporte después de
+un check-in cuesta lo que cuesten las filas nuevas, no toda la historia.
+
+Los resultados con el mismo instante que la marca se distinguen por
+result_id (se guardan los de ese instante), para no perder ni duplicar
+resultados que llegan en el mismo segundo en dos exports distintos.
+
+Los domains, thresholds y la resolución del estado tienen que coincidir con
+los del plan y la corrida:
+si el calculation_algorithm cambia sin cambiar la versión, el estado no
+sirve y hay que reconstruirlo (--rebuild).
+"""
+
+import json
+import os
+import re
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ebi_surveys.aggregate import DEFAULT_RESOLUTION, FIELDS, Partial, aggregate_chunk
+from ebi_surveys.streaming import DEFAULT_CHUNK_SIZE, iter_answer_chunks
+
+STATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         ".cache", "aggregates")
+
+# Columnas de fecha que sirven de marca de agua, en orden de preferencia
+WATERMARK_COLUMNS = ("answered_at", "created_at")
+
+# Zona horaria de solo horas al final de una fecha con hora ('...T10:00:00+00')
+_SHORT_OFFSET = re.compile(r"(T.*[+-]\d\d)$")
+
+
+class StateMismatchError(ValueError):
+    """El estado guardado se calculó con otros dominios, thresholds o resolución"""
+
+
+def state_path(plan):
+    """Archivo de estado de la encuesta y versión del plan"""
+    if plan.code is None:
+        raise ValueError("Un calculation_algorithm sin código necesita una ruta de estado explícita (--state)")
+    return os.path.join(STATE_DIR, f"{plan.code}-v{plan.version}.json")
+
+
+def _instant(value):
+    """Una fecha (datetime o texto ISO, con o sin zona) como UTC sin zona"""
+    if isinstance(value, str):
+        # Postgres exporta '2026-01-05 10:00:00.123+00'; fromisoformat quiere '+00:00'
+        text = _SHORT_OFFSET.sub(r"\1:00", value.strip().replace(" ", "T", 1).replace("Z", "+00:00"))
+        value = datetime.fromisoformat(text)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def instants(values):
+    """Columna de fechas como datetime64[us] en UTC (NaT donde falta)"""
+    array = np.asarray(values)
+    if array.dtype.kind != "M":
+        # datetime o texto sin zona se convierten de una vez; con zona NumPy
+        # avisa que la descarta, así que esos se normalizan valor por valor
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                return array.astype("datetime64[us]")
+        except (TypeError, ValueError, UserWarning):
+            return np.array([None if v is None or v == "" else _instant(v) for v in array.tolist()],
+                            dtype="datetime64[us]")
+    # Timestamps de pyarrow: ya vienen en UTC
+    return array.astype("datetime64[us]")
+
+
+class IncrementalState:
+    """Partial persistido con su marca de agua"""
+
+    def __init__(self, plan, partial=None, watermark=None, seen=(), resolution=DEFAULT_RESOLUTION):
+        self.plan = plan
+        self.partial = partial or Partial(plan, resolution)
+        self.watermark = watermark
+        self.seen = set(seen)
+
+    @classmethod
+    def load(cls, plan, path, resolution=DEFAULT_RESOLUTION):
+        """Estado guardado en path, o uno vacío si no existe"""
+        if not os.path.exists(path):
+            return cls(plan, resolution=resolution)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if tuple(data["domains"]) != plan.domains or tuple(data["band_names"]) != plan.band_names:
+            raise StateMismatchError(
+                f"{path} tiene otros dominios o thresholds que el plan; reconstruir con --rebuild")
+        if data.get("resolution") != resolution:
+            raise StateMismatchError(
+                f"{path} usa otra resolución de percentiles ({data.get('resolution')}); reconstruir con --rebuild")
+
+        partial = Partial(plan, resolution)
+        for group in data["groups"]:
+            partial.groups[(group["company_id"], group["area_id"])] = {
+                field: np.array(group[field], dtype=np.int64)
+                for field in FIELDS
+            }
+        watermark = datetime.fromisoformat(data["watermark"]) if data["watermark"] else None
+        return cls(plan, partial, watermark, data["seen"])
+
+    def save(self, path):
+        """Guarda el estado (escribe a un temporal y lo reemplaza)"""
+        data = {
+            "code": self.plan.code,
+            "version": self.plan.version,
+            "domains": list(self.plan.domains),
+            "band_names": list(self.plan.band_names),
+            "resolution": self.partial.resolution,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "seen": sorted(self.seen),
+            "groups": [
+                {"company_id": company, "area_id": area, **{field: group[field].tolist() for field in FIELDS}}
+                for (company, area), group in sorted(self.partial.groups.items())
+            ],
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def _new_rows(self, ids, mark, seen):
+        """Máscara de filas posteriores a la marca `mark` (o en la marca y no vistas)"""
+        column = next((c for c in WATERMARK_COLUMNS if c in ids), None)
+        if column is None:
+            raise ValueError(f"El export incremental necesita una columna {' o '.join(WATERMARK_COLUMNS)}")
+        when = instants(ids[column])
+        results = np.asarray(ids["result_id"], dtype=object).astype(str) if "result_id" in ids else None
+
+        if mark is None:
+            keep = ~np.isnat(when)
+        else:
+            keep = when > mark
+            if results is not None:
+                keep |= (when == mark) & ~np.isin(results, list(seen))
+        return keep, when, results
+
+    def update(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Agrega los resultados del export posteriores a la marca; devuelve cuántos
+
+        El export no tiene por qué venir ordenado por fecha: todas las filas
+        se comparan con la marca del inicio y la nueva marca se fija al final.
+        """
+        mark = np.datetime64(self.watermark, "us") if self.watermark else None
+        seen = frozenset(self.seen)
+        latest, latest_ids = mark, set(seen)
+        added = 0
+        for ids, answers in iter_answer_chunks(path, self.plan.weight.size, chunk_size):
+            keep, when, results = self._new_rows(ids, mark, seen)
+            rows = np.flatnonzero(keep)
+            if not rows.size:
+                continue
+            part = {name: np.asarray(values)[rows] for name, values in ids.items()}
+            aggregate_chunk(self.partial, part, answers[rows])
+            added += rows.size
+
+            newest = when[rows].max()
+            if latest is None or newest > latest:
+                latest, latest_ids = newest, set()
+            if results is not None:
+                latest_ids.update(results[keep & (when == latest)].tolist())
+
+        if latest is not None:
+            self.watermark = latest.item()
+            self.seen = latest_ids
+        return added
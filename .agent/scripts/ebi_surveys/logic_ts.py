@@ -0,0 +1,168 @@
+"""
+Banco de preguntas leído desde src/lib/logic.ts
+
+La app define las preguntas en `export const questions: Question[] = [...]`.
+En lugar de copiarlas a mano en los scripts, se extrae ese literal, se pasa
+a JSON y se valida contra la interfaz Question. El resultado se guarda en
+.agent/.cache/logic-ts.json junto con el sha256 de logic.ts y de este
+parser, así que mientras ninguno de los dos cambie no se vuelve a parsear.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache"
+CACHE_FILE = CACHE_DIR / "logic-ts.json"
+
+DECLARATION_RE = re.compile(r"\bquestions\s*:\s*Question\[\]\s*=\s*\[")
+
+# Campos de la interfaz Question y su tipo
+QUESTION_FIELDS = {
+    "id": int,
+    "domain": str,
+    "construct": str,
+    "type": str,
+    "text": str,
+    "weight": (int, float),
+    "severity": (int, float),
+    "personal_weight": (int, float),
+    "org_weight": (int, float),
+}
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`)
+  | (?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<punct>[\[\]{},:])
+""", re.VERBOSE | re.DOTALL)
+
+
+class LogicParseError(ValueError):
+    """logic.ts no tiene el arreglo de preguntas esperado"""
+
+
+def _string(token):
+    """Valor de un string de TypeScript con comillas simples, dobles o backticks"""
+    quote, body = token[0], token[1:-1]
+    if quote == "`" and "${" in body:
+        raise LogicParseError("logic.ts usa un template string con interpolación en `questions`")
+    chars = []
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == "\\" and i + 1 < len(body):
+            nxt = body[i + 1]
+            chars.append(nxt if nxt in "'`" else c + nxt)
+            i += 2
+            continue
+        chars.append('\\"' if c == '"' else c)
+        i += 1
+    return json.loads('"' + "".join(chars) + '"')
+
+
+def _literal_to_json(source):
+    """Convierte el literal del arreglo `questions` en JSON, token por token
+
+    Acepta lo que suele aparecer en un literal de TypeScript: claves sin
+    comillas, comillas simples, comentarios, comas finales y números como .5.
+    """
+    match = DECLARATION_RE.search(source)
+    if not match:
+        raise LogicParseError("No se encontró `questions: Question[] = [` en logic.ts")
+
+    out = []
+    depth = 0
+    pos = match.end() - 1
+    while pos < len(source):
+        token = _TOKEN_RE.match(source, pos)
+        if not token:
+            raise LogicParseError(f"Carácter inesperado en logic.ts: {source[pos]!r}")
+        pos = token.end()
+        kind, text = token.lastgroup, token.group()
+        if kind in ("space", "comment"):
+            continue
+        if kind == "string":
+            out.append(json.dumps(_string(text), ensure_ascii=False))
+        elif kind == "number":
+            value = float(text)
+            out.append(json.dumps(int(value) if re.fullmatch(r"-?\d+", text) else value))
+        elif kind == "name":
+            following = _TOKEN_RE.match(source, pos)
+            while following and following.lastgroup in ("space", "comment"):
+                following = _TOKEN_RE.match(source, following.end())
+            if following and following.group() == ":":
+                out.append(json.dumps(text))
+            elif text in ("true", "false", "null"):
+                out.append(text)
+            else:
+                raise LogicParseError(f"`questions` en logic.ts no es un literal simple (usa `{text}`)")
+        else:
+            if text in "]}":
+                if out and out[-1] == ",":
+                    out.pop()
+                depth -= 1
+            elif text in "[{":
+                depth += 1
+            out.append(text)
+            if depth == 0:
+                return "".join(out)
+    raise LogicParseError("El arreglo `questions` de logic.ts no está cerrado")
+
+
+def parse_questions(source):
+    """Lista de preguntas (dicts con los campos de Question) a partir del código de logic.ts"""
+    literal = _literal_to_json(source)
+    try:
+        questions = json.loads(literal)
+    except ValueError as e:
+        raise LogicParseError(f"El arreglo `questions` de logic.ts no es un literal simple: {e}") from e
+
+    for i, q in enumerate(questions):
+        for field, kind in QUESTION_FIELDS.items():
+            if not isinstance(q.get(field), kind) or isinstance(q.get(field), bool):
+                raise LogicParseError(f"Pregunta {i} de logic.ts: campo \"{field}\" faltante o inválido")
+        if q["id"] != i:
+            raise LogicParseError(f"Pregunta {i} de logic.ts tiene id {q['id']} (se esperan ids 0..N-1 en orden)")
+    return questions
+
+
+def _parser_digest():
+    # Un arreglo en el parser invalida la cache aunque logic.ts no cambie
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def load_questions(path):
+    """Preguntas de logic.ts, desde la cache si no cambió ni el archivo ni el parser"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(_parser_digest() + data).hexdigest()
+
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get("sha256") == digest:
+            return cached["questions"]
+    except (OSError, ValueError):
+        pass
+
+    questions = parse_questions(data.decode('utf-8'))
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"sha256": digest, "questions": questions}, f, ensure_ascii=False)
+    os.replace(tmp, CACHE_FILE)
+    return questions
+
+
+def domains_config(questions, weight=1.0):
+    """Dominios en orden de aparición (como `domains` en logic.ts) con sus preguntas"""
+    domains = {}
+    for q in questions:
+        domains.setdefault(q["domain"], []).append(q["id"])
+    return [{"name": name, "weight": weight, "questions": ids} for name, ids in domains.items()]
@@ -0,0 +1,88 @@
+"""
+Plan de scoring compilado a partir del calculation_algorithm de una encuesta
+
+El JSON guarda, por dominio, la lista de números de pregunta. Cada
+consumidor (scoring por lotes, streaming, agregados) necesita lo mismo en
+forma de arreglos, así que se compila una vez por encuesta y versión:
+
+- weight: weight * severity de cada pregunta (vector denso)
+- membership: matriz Q×3D de pertenencia a dominio, ya multiplicada por
+  personal_weight / org_weight para los sub-puntajes (columnas
+  [dominio | personal | org]), para resolver todo con dos productos
+- domain_weight: peso de cada dominio en el global
+- cutoffs / band_names: thresholds ordenados por valor
+
+Los arreglos quedan de solo lectura y el plan es una namedtuple, así que se
+puede compartir entre scorers (y entre procesos) sin copias defensivas.
+"""
+
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("El plan de scoring necesita NumPy: pip install numpy") from e
+
+ScoringPlan = namedtuple(
+    "ScoringPlan",
+    "code version domains question_numbers weight personal org membership domain_weight cutoffs band_names",
+)
+
+_PLANS = {}
+
+
+def _frozen(array):
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+
+def compile_plan(questions, algorithm, code=None, version=None):
+    """Compila preguntas (formato de logic.ts) + calculation_algorithm en un ScoringPlan"""
+    position = {q["id"]: i for i, q in enumerate(questions)}
+    n_questions = len(questions)
+
+    weight = np.array([q["weight"] * q["severity"] for q in questions], dtype=np.float64)
+    personal = np.array([q["personal_weight"] for q in questions], dtype=np.float64)
+    org = np.array([q["org_weight"] for q in questions], dtype=np.float64)
+
+    domains = algorithm["domains"]
+    member = np.zeros((n_questions, len(domains)), dtype=np.float64)
+    for d, domain in enumerate(domains):
+        for number in domain["questions"]:
+            if number in position:
+                member[position[number], d] = 1.0
+    membership = np.hstack([member, member * personal[:, None], member * org[:, None]])
+
+    thresholds = sorted((algorithm.get("thresholds") or {"": 0}).items(), key=lambda item: item[1])
+    return ScoringPlan(
+        code=code,
+        version=version,
+        domains=tuple(d["name"] for d in domains),
+        question_numbers=tuple(q["id"] for q in questions),
+        weight=_frozen(weight),
+        personal=_frozen(personal),
+        org=_frozen(org),
+        membership=_frozen(membership),
+        domain_weight=_frozen([d.get("weight") or 1 for d in domains]),
+        cutoffs=_frozen([value for _, value in thresholds]),
+        band_names=tuple(name for name, _ in thresholds),
+    )
+
+
+def get_plan(code, version, questions, algorithm):
+    """Plan compilado de una encuesta, cacheado por (código, versión)
+
+    Una versión publicada de una encuesta no cambia, así que el JSON se
+    compila una sola vez por proceso.
+    """
+    key = (code, version)
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = _PLANS[key] = compile_plan(questions, algorithm, code, version)
+    return plan
+
+
+def survey_plan(survey, questions):
+    """Plan de un dict de encuesta (el de los emisores de SQL)"""
+    return get_plan(survey["code"], survey["version"], questions, survey["calculation_algorithm"])
@@ -0,0 +1,235 @@
+"""
+Scoring por lotes de respuestas de encuestas con NumPy
+
+Replica el cálculo de la app (calculateScore en src/lib/logic.ts y el
+armado de dominios de src/app/resultados/ResultsPageClient.tsx), pero sobre
+una matriz N×Q de respuestas en lugar de pregunta por pregunta:
+
+- puntaje de pregunta: (valor / 5) * weight * severity
+- puntaje de dominio: suma de puntajes / suma de weight * severity de las
+  preguntas respondidas (valor > 0), escalado a 0-10
+- global: promedio de los dominios ponderado por el weight de cada dominio
+- sub-puntajes personal y organizacional: igual que el dominio, con
+  personal_weight / org_weight como factor extra de cada pregunta
+- banda: el threshold más alto que el puntaje alcanza
+
+Los puntajes que muestra la app se redondean a un decimal con
+Math.round, así que acá se usa el mismo redondeo (mitades hacia arriba).
+"""
+
+import csv
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("El scoring por lotes necesita NumPy: pip install numpy") from e
+
+MAX_VALUE = 5
+
+# Columnas de identificación que se conservan en la salida si están en la entrada
+ID_COLUMNS = ("result_id", "user_id", "company_id", "area_id", "answered_at", "created_at")
+
+Scores = namedtuple("Scores", "question domain personal org global_score domain_bands global_bands")
+
+
+def answer_column(number):
+    """Nombre de la columna de una pregunta en el formato ancho"""
+    return f"q{number}"
+
+
+def arrow_columns(table):
+    """Columnas de una tabla de pyarrow como arreglos de NumPy"""
+    return {name: column.to_numpy(zero_copy_only=False) for name, column in zip(table.column_names, table.columns)}
+
+
+def _id_column(values):
+    """Columna de ids como lista; las fechas quedan como datetime64[us] (en ns pasarían a enteros)"""
+    array = np.asarray(values)
+    if array.dtype.kind == "M":
+        return array.astype("datetime64[us]")
+    return array.astype(object).tolist()
+
+
+def read_table(path):
+    """Columnas de un CSV o Parquet como {nombre: lista o arreglo}"""
+    path = str(path)
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Para leer Parquet hace falta pyarrow: pip install pyarrow") from e
+        return arrow_columns(pq.read_table(path))
+
+    try:
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        pa_csv = None
+    if pa_csv is not None:
+        return arrow_columns(pa_csv.read_csv(path))
+
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = [[] for _ in header]
+        for row in reader:
+            for column, value in zip(columns, row):
+                column.append(value)
+    return dict(zip(header, columns))
+
+
+def _floats(values):
+    """Arreglo float con 0 donde no hay respuesta (None, NaN o texto vacío)"""
+    try:
+        array = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        array = np.array([0.0 if v in (None, "") else float(v) for v in values], dtype=np.float64)
+    array[np.isnan(array)] = 0.0
+    return array
+
+
+def answer_matrix(table, n_questions):
+    """(ids, respuestas N×Q) a partir de un export de survey_responses
+
+    Acepta dos formatos:
+    - ancho: una fila por resultado y columnas q0..q{Q-1} (o 0..Q-1)
+    - largo: una fila por respuesta con result_id, question_number y
+      response_value (survey_responses unido con survey_questions); sale
+      una fila por result_id, en el orden de su primera respuesta
+    Las preguntas sin respuesta quedan en 0, como `answers[q.id] || 0` en la app.
+    """
+    if "response_value" in table:
+        return _pivot(table, n_questions)
+
+    n = len(next(iter(table.values()))) if table else 0
+    answers = np.zeros((n, n_questions), dtype=np.float64)
+    for number in range(n_questions):
+        for name in (answer_column(number), str(number)):
+            if name in table:
+                answers[:, number] = _floats(table[name])
+                break
+        else:
+            raise ValueError(f"Falta la columna de la pregunta {number} ({answer_column(number)})")
+    ids = {c: _id_column(table[c]) for c in ID_COLUMNS if c in table}
+    return ids, answers
+
+
+def _pivot(table, n_questions):
+    for column in ("result_id", "question_number"):
+        if column not in table:
+            raise ValueError(f"El export largo necesita la columna {column}")
+    keys, first, rows = np.unique(np.asarray(table["result_id"], dtype=object).astype(str),
+                                  return_index=True, return_inverse=True)
+    # Los resultados quedan en el orden en que aparecen en el archivo, como
+    # al leerlo por bloques (np.unique los devuelve ordenados)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    keys, first, rows = keys[order], first[order], rank[rows]
+    numbers = _floats(table["question_number"]).astype(np.int64)
+    if numbers.size and (numbers.min() < 0 or numbers.max() >= n_questions):
+        raise ValueError(f"question_number fuera de 0..{n_questions - 1}")
+
+    answers = np.zeros((len(keys), n_questions), dtype=np.float64)
+    answers[rows, numbers] = _floats(table["response_value"])
+    ids = {"result_id": keys.tolist()}
+    for column in ID_COLUMNS[1:]:
+        if column in table:
+            ids[column] = _id_column(np.asarray(table[column])[first])
+    return ids, answers
+
+
+def round_half_up(values, digits=1):
+    """Redondeo de Math.round(x * 10) / 10"""
+    scale = 10 ** digits
+    return np.floor(np.asarray(values) * scale + 0.5) / scale
+
+
+def _ratio(num, den):
+    out = np.zeros_like(num)
+    np.divide(num, den, out=out, where=den > 0)
+    return out * 10
+
+
+def score_answers(answers, plan):
+    """Puntajes de una matriz de respuestas (filas = resultados, columnas = preguntas)
+
+    `plan` es el ScoringPlan compilado de la encuesta (ver ebi_surveys.plan).
+    Devuelve Scores con los puntajes sin redondear y las bandas como índices
+    de plan.band_names.
+    """
+    answers = np.asarray(answers, dtype=np.float64)
+    if answers.shape[1] != plan.weight.size:
+        raise ValueError(f"La matriz tiene {answers.shape[1]} columnas y la encuesta {plan.weight.size} preguntas")
+
+    answered = answers > 0
+    max_score = answered * plan.weight
+    question = answers * (max_score / MAX_VALUE)
+
+    # Columnas [dominio | personal | org] en dos productos
+    ratio = _ratio(question @ plan.membership, max_score @ plan.membership)
+    n_domains = len(plan.domains)
+    domain = ratio[:, :n_domains]
+    global_score = domain @ plan.domain_weight / plan.domain_weight.sum()
+
+    return Scores(
+        question=question,
+        domain=domain,
+        personal=ratio[:, n_domains:2 * n_domains],
+        org=ratio[:, 2 * n_domains:],
+        global_score=global_score,
+        domain_bands=bands(round_half_up(domain), plan.cutoffs),
+        global_bands=bands(round_half_up(global_score), plan.cutoffs),
+    )
+
+
+def bands(scores, cutoffs):
+    """Índice del threshold más alto alcanzado (0 si está por debajo de todos)"""
+    return np.maximum(np.searchsorted(cutoffs, scores, side="right") - 1, 0)
+
+
+def score_columns(ids, scores, plan):
+    """Tabla de salida: ids, global, dominio, personal, org y bandas por resultado"""
+    names = np.asarray(plan.band_names, dtype=object)
+    columns = dict(ids)
+    columns["global_score"] = round_half_up(scores.global_score)
+    columns["global_band"] = names[scores.global_bands]
+    for d, name in enumerate(plan.domains):
+        columns[name] = round_half_up(scores.domain[:, d])
+        columns[f"{name}_personal"] = round_half_up(scores.personal[:, d])
+        columns[f"{name}_org"] = round_half_up(scores.org[:, d])
+        columns[f"{name}_band"] = names[scores.domain_bands[:, d]]
+    return columns
+
+
+def arrow_table(columns):
+    """Tabla de pyarrow con las columnas (los arreglos de NumPy conservan su tipo)"""
+    import pyarrow as pa
+
+    return pa.table({k: v if isinstance(v, np.ndarray) else list(v) for k, v in columns.items()})
+
+
+def csv_rows(columns):
+    """Filas para csv.writer; las fechas salen como datetime ('2024-01-01 10:00:00', como en Postgres)"""
+    return zip(*(v.tolist() if isinstance(v, np.ndarray) else list(v) for v in columns.values()))
+
+
+def write_table(path, columns):
+    """Escribe las columnas como CSV o, si la ruta termina en .parquet, como Parquet
+
+    Usa las mismas conversiones que streaming.ChunkWriter, así que la salida
+    es idéntica a la del modo por bloques.
+    """
+    path = str(path)
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Para escribir Parquet hace falta pyarrow: pip install pyarrow") from e
+        pq.write_table(arrow_table(columns), path)
+        return
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(csv_rows(columns))
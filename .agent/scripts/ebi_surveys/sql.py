@@ -0,0 +1,195 @@
+"""
+Emisores de SQL para sembrar una encuesta y sus preguntas
+
+Hay tres formatos para survey_questions:
+
+- "statements": un INSERT por pregunta dentro de un bloque DO $$ (el de
+  siempre; sirve para pegar en el editor SQL de Supabase).
+- "batched": INSERTs multi-fila de hasta `batch_size` preguntas, con el id de
+  la encuesta resuelto una sola vez en el bloque DO.
+- "copy": las preguntas van como datos de `COPY ... FROM STDIN` a una tabla
+  temporal y se pasan a survey_questions con un único INSERT ... SELECT.
+  Requiere psql (el editor de Supabase no acepta COPY FROM STDIN).
+
+Las preguntas se consumen como iterable y el SQL se genera línea por línea,
+así que una encuesta de cientos de ítems no se arma entera en memoria.
+"""
+
+import json
+from itertools import islice
+
+FORMATS = ("statements", "batched", "copy")
+DEFAULT_BATCH_SIZE = 500
+
+# Columnas de survey_questions que se cargan, además de survey_id
+COLUMNS = (
+    "question_number", "domain", "construct", "question_type", "question_text",
+    "weight", "severity", "personal_weight", "org_weight", "display_order",
+)
+
+# Tipos de la tabla temporal del modo COPY (los de la migración modular)
+_STAGE_TYPES = (
+    "INTEGER", "VARCHAR(100)", "VARCHAR(200)", "VARCHAR(10)", "TEXT",
+    "DECIMAL(4,3)", "DECIMAL(4,3)", "DECIMAL(4,3)", "DECIMAL(4,3)", "INTEGER",
+)
+_STAGE_TABLE = "survey_questions_stage"
+
+
+def question_row(q):
+    """Valores de COLUMNS para una pregunta con el formato de logic.ts"""
+    return (
+        q["id"], q["domain"], q["construct"], q["type"], q["text"],
+        q["weight"], q["severity"], q["personal_weight"], q["org_weight"], q["id"],
+    )
+
+
+def sql_literal(value):
+    """Literal SQL: números tal cual, textos entre comillas simples escapadas"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def copy_field(value):
+    """Campo del formato texto de COPY (tabulado, \\N para NULL)"""
+    if value is None:
+        return r"\N"
+    text = repr(value) if isinstance(value, float) else str(value)
+    return (text.replace("\\", "\\\\").replace("\t", "\\t")
+                .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def _values(row):
+    return ", ".join(sql_literal(v) for v in row)
+
+
+# Columnas opcionales de surveys; se emiten solo si el dict las trae
+OPTIONAL_SURVEY_COLUMNS = ("country_code", "regulation_name", "is_mandatory")
+
+
+def survey_insert(survey):
+    """INSERT de la fila de surveys; survey es un dict con code, name, description,
+    survey_type, version, is_base, calculation_algorithm y OPTIONAL_SURVEY_COLUMNS"""
+    algorithm = sql_literal(json.dumps(survey["calculation_algorithm"]))
+    extra = [c for c in OPTIONAL_SURVEY_COLUMNS if c in survey]
+    columns = "".join(f", {c}" for c in extra)
+    values = "".join(f", {sql_literal(survey[c])}" for c in extra)
+    yield f"INSERT INTO surveys (code, name, description, survey_type, version, status, is_base, calculation_algorithm{columns})"
+    yield (f"VALUES ({sql_literal(survey['code'])}, {sql_literal(survey['name'])}, "
+           f"{sql_literal(survey['description'])}, {sql_literal(survey.get('survey_type', 'base'))}, "
+           f"{sql_literal(survey['version'])}, 'active', {sql_literal(survey.get('is_base', True))}, {algorithm}{values});")
+
+
+def _survey_id(survey):
+    return f"SELECT id INTO v_survey_id FROM surveys WHERE code = {sql_literal(survey['code'])};"
+
+
+def _do_block(survey, body):
+    yield "DO $$"
+    yield "DECLARE"
+    yield "    v_survey_id UUID;"
+    yield "BEGIN"
+    yield f"    {_survey_id(survey)}"
+    yield ""
+    yield "    -- 3. Insertar Preguntas"
+    yield from body
+    yield "END $$;"
+
+
+def statements(survey, rows):
+    """Un INSERT por pregunta (formato original)"""
+    columns = ", ".join(COLUMNS)
+    body = (f"    INSERT INTO survey_questions (survey_id, {columns}) VALUES (v_survey_id, {_values(row)});"
+            for row in rows)
+    yield from _do_block(survey, body)
+
+
+def _check_batch_size(batch_size):
+    # Con 0 o menos islice devuelve lotes vacíos y no saldría ningún INSERT
+    if batch_size < 1:
+        raise ValueError(f"batch_size tiene que ser al menos 1 (se pidió {batch_size})")
+
+
+def batched(survey, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """INSERTs multi-fila de hasta batch_size preguntas"""
+    _check_batch_size(batch_size)
+    columns = ", ".join(COLUMNS)
+
+    def body():
+        it = iter(rows)
+        while True:
+            batch = list(islice(it, batch_size))
+            if not batch:
+                return
+            yield f"    INSERT INTO survey_questions (survey_id, {columns}) VALUES"
+            last = len(batch) - 1
+            for i, row in enumerate(batch):
+                yield f"        (v_survey_id, {_values(row)}){';' if i == last else ','}"
+
+    return _do_block(survey, body())
+
+
+def copy(survey, rows):
+    """COPY a una tabla temporal y un único INSERT ... SELECT con el id de la encuesta"""
+    stage_columns = ", ".join(f"{c} {t}" for c, t in zip(COLUMNS, _STAGE_TYPES))
+    columns = ", ".join(COLUMNS)
+    yield f"CREATE TEMP TABLE {_STAGE_TABLE} ({stage_columns}) ON COMMIT DROP;"
+    yield f"COPY {_STAGE_TABLE} ({columns}) FROM STDIN;"
+    for row in rows:
+        yield "\t".join(copy_field(v) for v in row)
+    yield "\\."
+    yield ""
+    yield "-- 3. Insertar Preguntas"
+    yield f"INSERT INTO survey_questions (survey_id, {columns})"
+    yield f"SELECT s.id, {', '.join('q.' + c for c in COLUMNS)}"
+    yield f"FROM {_STAGE_TABLE} q"
+    yield f"CROSS JOIN (SELECT id FROM surveys WHERE code = {sql_literal(survey['code'])}) s;"
+
+
+def seed_sql(survey, rows, fmt="statements", batch_size=DEFAULT_BATCH_SIZE, title=None):
+    """Genera, línea por línea, la migración completa de una encuesta
+
+    Los argumentos se validan al llamarla, no al pedir la primera línea, así
+    que un error sale antes de abrir el archivo de salida.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconocido: {fmt} (opciones: {', '.join(FORMATS)})")
+    if fmt == "batched":
+        _check_batch_size(batch_size)
+    return _seed_lines(survey, rows, fmt, batch_size, title)
+
+
+def _seed_lines(survey, rows, fmt, batch_size, title):
+    yield f"-- 🛠️ {title or 'Migración de Encuesta ' + survey['code']}"
+    yield "BEGIN;"
+    yield "\n-- 1. Insertar Encuesta"
+    yield from survey_insert(survey)
+    if fmt == "copy":
+        yield "\n-- 2. Cargar preguntas en una tabla temporal"
+        yield from copy(survey, rows)
+    else:
+        yield "\n-- 2. Obtener ID de la encuesta"
+        if fmt == "batched":
+            yield from batched(survey, rows, batch_size)
+        else:
+            yield from statements(survey, rows)
+    yield "\nCOMMIT;"
+
+
+def write_lines(out, lines):
+    """Escribe las líneas de seed_sql en el archivo abierto out; devuelve cuántas fueron"""
+    count = 0
+    for count, line in enumerate(lines, 1):
+        if count > 1:
+            out.write("\n")
+        out.write(line)
+    return count
+
+
+def write_seed(out, survey, rows, fmt="statements", batch_size=DEFAULT_BATCH_SIZE, title=None):
+    """Escribe seed_sql en el archivo abierto out; devuelve la cantidad de líneas"""
+    return write_lines(out, seed_sql(survey, rows, fmt, batch_size, title))
@@ -0,0 +1,433 @@
+"""
+Scoring en streaming para exports más grandes que la memoria
+
+El export se lee por bloques de `chunk_size` filas, cada bloque se puntúa
+con el plan compilado y se suma a totales corrientes por empresa y
+dominio; los puntajes por resultado, si se piden, se escriben bloque a
+bloque. En memoria solo hay un bloque y un acumulador por empresa, así que
+el pico no depende del tamaño del archivo.
+
+Los promedios usan los puntajes redondeados a un decimal, los mismos que la
+app guarda en results.domain_scores y promedia en los reportes.
+"""
+
+import csv
+import io
+import os
+from itertools import islice
+
+import numpy as np
+
+from ebi_surveys.scoring import (
+    answer_matrix, arrow_columns, arrow_table, csv_rows, score_answers, score_columns,
+)
+
+DEFAULT_CHUNK_SIZE = 50_000
+GROUP_COLUMN = "company_id"
+RESULT_COLUMN = "result_id"
+
+
+def _csv_chunks(path, chunk_size, part=None):
+    try:
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        pa_csv = None
+
+    if pa_csv is not None:
+        # El lector de pyarrow decodifica por bloques de bytes; se re-agrupan en chunk_size filas
+        reader = pa_csv.open_csv(_range_file(path, part) if part else path)
+        pending = []
+        rows = 0
+        for batch in reader:
+            pending.append(batch)
+            rows += batch.num_rows
+            if rows >= chunk_size:
+                yield _concat(pending)
+                pending, rows = [], 0
+        if pending:
+            yield _concat(pending)
+        return
+
+    source = io.TextIOWrapper(_range_file(path, part), encoding='utf-8', newline='') if part else \
+        open(path, newline='', encoding='utf-8')
+    with source as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            yield {name: list(values) for name, values in zip(header, zip(*rows))}
+
+
+def _concat(batches):
+    import pyarrow as pa
+
+    return arrow_columns(pa.Table.from_batches(batches))
+
+
+def _parquet_file(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Para leer Parquet hace falta pyarrow: pip install pyarrow") from e
+    return pq.ParquetFile(path)
+
+
+def _parquet_chunks(path, chunk_size, part=None):
+    pf = _parquet_file(path)
+    if part is None:
+        for batch in pf.iter_batches(batch_size=chunk_size):
+            yield arrow_columns(batch)
+        return
+
+    # Filas [start, end): solo los row groups que las contienen, recortando los bordes
+    _, start, end = part
+    offsets = np.cumsum([0] + [pf.metadata.row_group(g).num_rows for g in range(pf.num_row_groups)])
+    first = int(np.searchsorted(offsets, start, side="right")) - 1
+    last = int(np.searchsorted(offsets, end, side="left"))
+    row = int(offsets[first])
+    for batch in pf.iter_batches(batch_size=chunk_size, row_groups=list(range(first, last))):
+        lo, hi = max(start, row), min(end, row + batch.num_rows)
+        if lo < hi:
+            yield arrow_columns(batch.slice(lo - row, hi - lo))
+        row += batch.num_rows
+
+
+def iter_tables(path, chunk_size=DEFAULT_CHUNK_SIZE, part=None):
+    """Bloques del export como {columna: valores}, de a ~chunk_size filas
+
+    `part` es uno de los rangos de split_ranges: solo se leen esas filas.
+    """
+    path = str(path)
+    if path.endswith(".parquet"):
+        return _parquet_chunks(path, chunk_size, part)
+    return _csv_chunks(path, chunk_size, part)
+
+
+class _RangeFile(io.RawIOBase):
+    """Los bytes [start, end) de un CSV precedidos por su encabezado"""
+
+    def __init__(self, path, header, start, end):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._header = header
+        self._left = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._header:
+            n = min(len(buffer), len(self._header))
+            buffer[:n] = self._header[:n]
+            self._header = self._header[n:]
+            return n
+        data = self._file.read(min(len(buffer), self._left))
+        buffer[:len(data)] = data
+        self._left -= len(data)
+        return len(data)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def _range_file(path, part):
+    _, start, end = part
+    with open(path, 'rb') as f:
+        header = f.readline()
+    return io.BufferedReader(_RangeFile(path, header, start, end))
+
+
+def _csv_boundary(f, offset, key):
+    """Primer inicio de línea desde offset que además empieza un result_id nuevo"""
+    f.seek(offset - 1)
+    f.readline()  # termina la línea en curso (o solo el '\n' si offset ya es inicio de línea)
+    if key is None:
+        return f.tell()
+    start = f.tell()
+    line = f.readline()
+    first = _csv_key(line, key)
+    while line:
+        start = f.tell()
+        line = f.readline()
+        if not line or _csv_key(line, key) != first:
+            break
+    return start
+
+
+def _csv_key(line, index):
+    fields = next(csv.reader([line.decode('utf-8')]), [])
+    return fields[index] if index < len(fields) else None
+
+
+def _csv_ranges(path, parts):
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        names = next(csv.reader([header.decode('utf-8')]))
+        key = names.index(RESULT_COLUMN) if RESULT_COLUMN in names else None
+        data = f.tell()
+        cuts = [data]
+        for k in range(1, parts):
+            cut = _csv_boundary(f, data + (size - data) * k // parts, key)
+            if cuts[-1] < cut < size:
+                cuts.append(cut)
+    cuts.append(size)
+    return [("csv", a, b) for a, b in zip(cuts, cuts[1:])]
+
+
+def _parquet_ranges(path, parts):
+    pf = _parquet_file(path)
+    total = pf.metadata.num_rows
+    offsets = np.cumsum([0] + [pf.metadata.row_group(g).num_rows for g in range(pf.num_row_groups)])
+    has_key = RESULT_COLUMN in pf.schema_arrow.names
+    cuts = [0]
+    for k in range(1, parts):
+        # Se corta en el inicio del row group más cercano y se corre hasta el próximo resultado
+        g = int(np.searchsorted(offsets, total * k // parts))
+        if g >= pf.num_row_groups:
+            break
+        cut = int(offsets[g])
+        if has_key and cut > 0:
+            cut = _parquet_boundary(pf, offsets, g)
+        if cuts[-1] < cut < total:
+            cuts.append(cut)
+    cuts.append(total)
+    return [("parquet", a, b) for a, b in zip(cuts, cuts[1:])]
+
+
+def _parquet_boundary(pf, offsets, g):
+    """Primera fila desde el row group g cuyo result_id es distinto del de la fila anterior"""
+    previous = pf.read_row_group(g - 1, columns=[RESULT_COLUMN]).column(0)[-1].as_py()
+    while g < pf.num_row_groups:
+        ids = pf.read_row_group(g, columns=[RESULT_COLUMN]).column(0).to_numpy(zero_copy_only=False)
+        change = np.flatnonzero(ids != previous)
+        if change.size:
+            return int(offsets[g]) + int(change[0])
+        g += 1
+    return int(offsets[-1])
+
+
+def split_ranges(path, parts):
+    """Hasta `parts` rangos contiguos del export que no parten ningún resultado
+
+    CSV: rangos de bytes cortados en inicio de línea; Parquet: rangos de
+    filas (el corte se busca desde un inicio de row group, así que un
+    archivo con un solo row group da un solo rango). En el formato largo
+    el corte se corre hasta el primer result_id nuevo, así que las
+    respuestas de un resultado quedan siempre en el mismo rango. Supone,
+    como el resto del módulo, que los campos del CSV no tienen saltos de
+    línea.
+    """
+    path = str(path)
+    if parts <= 1:
+        return [None]
+    if path.endswith(".parquet"):
+        return _parquet_ranges(path, parts)
+    return _csv_ranges(path, parts)
+
+
+def _split_last_result(table):
+    """Separa las filas del último result_id (puede seguir en el próximo bloque)"""
+    keys = table["result_id"]
+    last = keys[-1]
+    cut = len(keys)
+    while cut > 0 and keys[cut - 1] == last:
+        cut -= 1
+    head = {name: values[:cut] for name, values in table.items()}
+    tail = {name: values[cut:] for name, values in table.items()}
+    return head, tail
+
+
+def iter_answer_chunks(path, n_questions, chunk_size=DEFAULT_CHUNK_SIZE, part=None):
+    """(ids, respuestas) por bloque, de todo el export o de un rango de split_ranges
+
+    En el formato largo el export tiene que venir ordenado por result_id
+    (ORDER BY result_id); las respuestas de un resultado que quedan partidas
+    entre dos bloques se juntan antes de puntuar.
+    """
+    carry = None
+    for table in iter_tables(path, chunk_size, part):
+        if "response_value" not in table:
+            yield answer_matrix(table, n_questions)
+            continue
+        if carry:
+            table = {name: np.concatenate([carry[name], values]) for name, values in table.items()}
+        table, carry = _split_last_result(table)
+        if len(table["result_id"]):
+            yield answer_matrix(table, n_questions)
+    if carry and len(carry["result_id"]):
+        yield answer_matrix(carry, n_questions)
+
+
+def group_sums(inverse, n_groups, values):
+    """Suma por grupo de cada columna de values (N×k) en un solo bincount
+
+    `inverse` es el índice de grupo de cada fila (el de np.unique).
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(len(inverse), -1)
+    k = values.shape[1]
+    offsets = inverse[:, None] * k + np.arange(k)
+    sums = np.bincount(offsets.ravel(), weights=values.ravel(), minlength=n_groups * k)
+    return sums.reshape(n_groups, k)
+
+
+def tenths(scores):
+    """Puntajes redondeados a un decimal (Math.round) como enteros en décimas"""
+    return np.floor(np.asarray(scores) * 10 + 0.5)
+
+
+def tenths_mean(total, n):
+    """Promedio a dos decimales de una suma exacta en décimas"""
+    return round(total / n / 10, 2)
+
+
+class RunningTotals:
+    """Sumas y cuentas corrientes por grupo (empresa) y dominio
+
+    `domain_count` cuenta solo los resultados que respondieron al menos una
+    pregunta del dominio; `count` cuenta todos los resultados del grupo. Las
+    sumas se guardan en décimas enteras, como en aggregate.Partial, así que
+    el resumen no depende del tamaño de bloque ni del formato del export.
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.groups = {}
+
+    def _group(self, key):
+        group = self.groups.get(key)
+        if group is None:
+            n = len(self.plan.domains)
+            group = self.groups[key] = {
+                "count": 0,
+                "global_sum": 0,
+                "domain_count": np.zeros(n, dtype=np.int64),
+                "domain_sum": np.zeros(n, dtype=np.int64),
+                "personal_sum": np.zeros(n, dtype=np.int64),
+                "org_sum": np.zeros(n, dtype=np.int64),
+            }
+        return group
+
+    def add(self, keys, scores, answered):
+        """Suma un bloque; answered es la matriz N×D de dominios respondidos"""
+        labels, inverse = np.unique(np.asarray(keys, dtype=object).astype(str), return_inverse=True)
+        n_groups = len(labels)
+
+        def per_group(values):
+            return group_sums(inverse, n_groups, values).astype(np.int64)
+
+        count = np.bincount(inverse, minlength=n_groups)
+        global_sum = per_group(tenths(scores.global_score))[:, 0]
+        domain_count = per_group(answered)
+        domain_sum = per_group(tenths(scores.domain))
+        personal_sum = per_group(tenths(scores.personal))
+        org_sum = per_group(tenths(scores.org))
+
+        for g, label in enumerate(labels):
+            group = self._group(label)
+            group["count"] += int(count[g])
+            group["global_sum"] += int(global_sum[g])
+            group["domain_count"] += domain_count[g]
+            group["domain_sum"] += domain_sum[g]
+            group["personal_sum"] += personal_sum[g]
+            group["org_sum"] += org_sum[g]
+
+    def rows(self):
+        """Una fila por grupo con resultados, promedio global y promedios por dominio"""
+        for key in sorted(self.groups):
+            group = self.groups[key]
+            row = {GROUP_COLUMN: key, "results": group["count"],
+                   "global_score": tenths_mean(group["global_sum"], group["count"])}
+            for d, name in enumerate(self.plan.domains):
+                n = int(group["domain_count"][d])
+                row[f"{name}_results"] = n
+                for suffix, sums in (("", "domain_sum"), ("_personal", "personal_sum"), ("_org", "org_sum")):
+                    row[f"{name}{suffix}"] = tenths_mean(int(group[sums][d]), n) if n else None
+            yield row
+
+
+def answered_domains(answers, plan):
+    """Matriz N×D: el resultado respondió al menos una pregunta del dominio"""
+    n_domains = len(plan.domains)
+    return ((answers > 0) @ (plan.membership[:, :n_domains] > 0)) > 0
+
+
+class ChunkWriter:
+    """Escribe tablas por bloques en CSV o Parquet (ParquetWriter)"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = None
+        self._writer = None
+
+    def write(self, columns):
+        if self.path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            table = arrow_table(columns)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+            return
+
+        if self._writer is None:
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(columns)
+        self._writer.writerows(csv_rows(columns))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+
+def group_keys(ids, n, group_by=None):
+    """Claves de agrupación de un bloque de n resultados
+
+    Sin group_by se agrupa por GROUP_COLUMN, o todo en un solo grupo si el
+    export no la trae. Un group_by explícito tiene que existir: una columna
+    mal escrita no puede terminar en un único grupo que parece válido.
+    """
+    if group_by is None:
+        return ids[GROUP_COLUMN] if GROUP_COLUMN in ids else [""] * n
+    if group_by not in ids:
+        raise ValueError(f"El export no tiene la columna \"{group_by}\" para agrupar "
+                         f"(columnas: {', '.join(ids)})")
+    return ids[group_by]
+
+
+def score_stream(path, plan, chunk_size=DEFAULT_CHUNK_SIZE, output=None, group_by=None):
+    """Puntúa un export por bloques; devuelve (RunningTotals, resultados procesados)"""
+    totals = RunningTotals(plan)
+    writer = ChunkWriter(output) if output else None
+    processed = 0
+    try:
+        for ids, answers in iter_answer_chunks(path, plan.weight.size, chunk_size):
+            scores = score_answers(answers, plan)
+            totals.add(group_keys(ids, len(answers), group_by), scores, answered_domains(answers, plan))
+            if writer:
+                writer.write(score_columns(ids, scores, plan))
+            processed += len(answers)
+    finally:
+        if writer:
+            writer.close()
+    return totals, processed
+
+
+def write_rows(path, rows):
+    """Escribe dicts (todas con las mismas claves) como CSV"""
+    rows = iter(rows)
+    first = next(rows, None)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if first is None:
+            return
+        writer = csv.DictWriter(f, fieldnames=list(first))
+        writer.writeheader()
+        writer.writerow(first)
+        writer.writerows(rows)
+
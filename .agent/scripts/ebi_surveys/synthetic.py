@@ -0,0 +1,262 @@
+"""
+Respuestas sintéticas de la encuesta para pruebas de carga
+
+Genera resultados con la forma de survey_responses (una fila por respuesta,
+o una fila por resultado con columnas q0..qN en el formato ancho) a partir
+del plan compilado de la encuesta. Cada respuesta sale de un nivel latente
+por dominio que suma:
+
+- el efecto de la empresa (un nivel general más un ajuste por dominio)
+- el efecto del área dentro de la empresa
+- el de la persona: un factor general compartido por todos los dominios más
+  uno propio de cada dominio, mezclados según `correlation`
+
+más un ruido por pregunta, redondeado a la escala 1-5. Con `missing` se
+dejan preguntas sin responder (0 en el formato ancho, sin fila en el largo).
+
+Todo sale de `seed`: la población (empresas, áreas, tamaños) con un
+generador propio y cada bloque de BLOCK_SIZE resultados con otro derivado
+de (seed, bloque), así que el mismo seed da el mismo archivo sin importar
+el formato de salida, y los bloques se escriben apenas se generan.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from ebi_surveys.scoring import answer_column
+from ebi_surveys.sql import sql_literal
+from ebi_surveys.streaming import ChunkWriter
+
+DEFAULT_RESULTS = 100_000
+DEFAULT_COMPANIES = 50
+DEFAULT_AREAS = 5
+DEFAULT_SEED = 360
+DEFAULT_CORRELATION = 0.5
+DEFAULT_MISSING = 0.02
+DEFAULT_START = "2026-01-01"
+DEFAULT_DAYS = 365
+
+# Resultados por bloque; fija la secuencia aleatoria, no solo la memoria
+BLOCK_SIZE = 10_000
+
+# Parámetros del modelo latente, en puntos de la escala 1-5
+BASE_LEVEL = 3.4
+COMPANY_SD = 0.35
+AREA_SD = 0.2
+PERSON_SD = 0.7
+QUESTION_SD = 0.6
+
+ID_COLUMNS = ("result_id", "user_id", "company_id", "area_id", "answered_at")
+LONG_COLUMNS = (*ID_COLUMNS[:4], "question_number", "response_value", ID_COLUMNS[4])
+
+# Columnas del COPY: las de survey_responses más el result_id
+_STAGE_TABLE = "survey_responses_stage"
+_STAGE_COLUMNS = ("result_id", "question_number", "response_value", "answered_at")
+_STAGE_TYPES = ("UUID", "INTEGER", "DECIMAL(4,2)", "TIMESTAMP WITH TIME ZONE")
+
+Population = namedtuple("Population", "company_ids area_ids company_effect area_effect share")
+
+
+def _uuids(rng, n):
+    """n UUID v4 (como texto) a partir de bytes de rng"""
+    raw = rng.integers(0, 256, (n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    h = raw.tobytes().hex()
+    return np.array([f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+                     for i in range(0, len(h), 32)], dtype=object)
+
+
+def population(plan, n_companies=DEFAULT_COMPANIES, n_areas=DEFAULT_AREAS, seed=DEFAULT_SEED):
+    """Empresas y áreas con sus efectos por dominio y el peso de cada empresa"""
+    rng = np.random.default_rng([seed, 0])
+    n_domains = len(plan.domains)
+    company_effect = (rng.normal(0, COMPANY_SD, (n_companies, 1))
+                      + rng.normal(0, COMPANY_SD / 2, (n_companies, n_domains)))
+    area_effect = rng.normal(0, AREA_SD, (n_companies, n_areas, n_domains))
+    # Tamaños desparejos: pocas empresas grandes y muchas chicas
+    share = rng.lognormal(0, 1, n_companies)
+    return Population(
+        company_ids=_uuids(rng, n_companies),
+        area_ids=_uuids(rng, n_companies * n_areas).reshape(n_companies, n_areas),
+        company_effect=company_effect,
+        area_effect=area_effect,
+        share=share / share.sum(),
+    )
+
+
+def generate(plan, people, n_results=DEFAULT_RESULTS, seed=DEFAULT_SEED, correlation=DEFAULT_CORRELATION,
+             missing=DEFAULT_MISSING, start=DEFAULT_START, days=DEFAULT_DAYS):
+    """Bloques (ids, respuestas N×Q en int8) de hasta BLOCK_SIZE resultados
+
+    answered_at crece con el número de resultado (cada bloque cubre su tramo
+    del período), así que el archivo sirve también para probar los agregados
+    incrementales.
+    """
+    if not 0 <= correlation <= 1:
+        raise ValueError("correlation tiene que estar entre 0 y 1")
+    if not 0 <= missing < 1:
+        raise ValueError("missing tiene que estar entre 0 y 1 (sin incluir el 1)")
+
+    n_domains = len(plan.domains)
+    question_domain = plan.membership[:, :n_domains].argmax(axis=1)
+    n_companies, n_areas = people.area_ids.shape
+    start = np.datetime64(start, "us")
+    span = np.timedelta64(days * 86_400_000_000, "us")
+
+    for block, first in enumerate(range(0, n_results, BLOCK_SIZE)):
+        rng = np.random.default_rng([seed, 1, block])
+        n = min(BLOCK_SIZE, n_results - first)
+        company = rng.choice(n_companies, n, p=people.share)
+        area = rng.integers(0, n_areas, n)
+
+        general = rng.standard_normal((n, 1))
+        own = rng.standard_normal((n, n_domains))
+        person = np.sqrt(correlation) * general + np.sqrt(1 - correlation) * own
+        latent = people.company_effect[company] + people.area_effect[company, area] + PERSON_SD * person
+
+        noise = rng.normal(0, QUESTION_SD, (n, question_domain.size))
+        answers = np.clip(np.rint(BASE_LEVEL + latent[:, question_domain] + noise), 1, 5).astype(np.int8)
+        answers[rng.random(answers.shape) < missing] = 0
+
+        offsets = np.sort(rng.random(n)) + np.arange(first, first + n)
+        answered_at = start + (span * (offsets / n_results)).astype("timedelta64[us]")
+
+        ids = {
+            "result_id": _uuids(rng, n),
+            "user_id": _uuids(rng, n),
+            "company_id": people.company_ids[company],
+            "area_id": people.area_ids[company, area],
+            "answered_at": answered_at,
+        }
+        yield ids, answers
+
+
+def long_rows(ids, answers, plan):
+    """Columnas de survey_responses: una fila por pregunta respondida"""
+    rows, questions = np.nonzero(answers)
+    columns = {name: ids[name][rows] for name in ID_COLUMNS[:4]}
+    columns["question_number"] = np.asarray(plan.question_numbers)[questions]
+    columns["response_value"] = answers[rows, questions]
+    columns["answered_at"] = ids["answered_at"][rows]
+    return columns
+
+
+def wide_rows(ids, answers, plan):
+    """Columnas del export ancho: ids y q0..qN (0 sin respuesta)"""
+    columns = dict(ids)
+    for q, number in enumerate(plan.question_numbers):
+        columns[answer_column(number)] = answers[:, q]
+    return columns
+
+
+def _timestamps(values, sep="T", zone="Z"):
+    # En microsegundos, como timestamptz y la marca de agua de incremental: en
+    # segundos, dos resultados del mismo segundo quedarían empatados
+    text = np.datetime_as_string(values, unit="us")
+    return np.char.add(np.char.replace(text, "T", sep), zone).astype(object)
+
+
+def _delimited(out, delimiter):
+    """Escritor de bloques como texto delimitado, sin comillas, en el archivo binario out
+
+    Los valores generados (UUID, enteros, fechas) no llevan separadores,
+    comillas ni saltos de línea, así que el mismo texto sirve de CSV y de
+    datos de COPY. Con pyarrow se escribe en C; si no, con join.
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        pa_csv = None
+
+    if pa_csv is not None:
+        options = pa_csv.WriteOptions(include_header=False, delimiter=delimiter, quoting_style="none")
+        return lambda columns: pa_csv.write_csv(pa.table(columns), out, options)
+
+    def write(columns):
+        values = [v.tolist() for v in columns.values()]
+        out.write("".join(delimiter.join(map(str, row)) + "\n" for row in zip(*values)).encode("utf-8"))
+    return write
+
+
+def write_copy(out, survey, tables):
+    """Script de psql: COPY de las respuestas a una tabla temporal y de ahí a
+    results y survey_responses (las preguntas se buscan por question_number)
+
+    results.user_id y results.area_id quedan en NULL: son claves foráneas a
+    profiles (que a su vez referencia auth.users) y a areas, y el generador
+    no crea esas filas. Las empresas, áreas y usuarios sintéticos solo
+    existen en los exports CSV/Parquet.
+    """
+    stage = ", ".join(f"{c} {t}" for c, t in zip(_STAGE_COLUMNS, _STAGE_TYPES))
+    code = sql_literal(survey["code"])
+    lines = [
+        f"-- 🧪 Respuestas sintéticas de {survey['code']} v{survey['version']}",
+        "BEGIN;",
+        "",
+        f"CREATE TEMP TABLE {_STAGE_TABLE} ({stage}) ON COMMIT DROP;",
+        f"COPY {_STAGE_TABLE} ({', '.join(_STAGE_COLUMNS)}) FROM STDIN;",
+    ]
+    out.write(("\n".join(lines) + "\n").encode("utf-8"))
+    write = _delimited(out, "\t")
+    for columns in tables:
+        columns["answered_at"] = _timestamps(columns["answered_at"], " ", "+00")
+        write({c: columns[c] for c in _STAGE_COLUMNS})
+    lines = [
+        "\\.",
+        "",
+        "INSERT INTO results (id, survey_id, survey_version, created_at)",
+        "SELECT r.result_id, s.id, s.version, min(r.answered_at)",
+        f"FROM {_STAGE_TABLE} r",
+        f"CROSS JOIN (SELECT id, version FROM surveys WHERE code = {code}) s",
+        "GROUP BY r.result_id, s.id, s.version;",
+        "",
+        "INSERT INTO survey_responses (result_id, question_id, response_value, answered_at)",
+        "SELECT r.result_id, q.id, r.response_value, r.answered_at",
+        f"FROM {_STAGE_TABLE} r",
+        "JOIN survey_questions q ON q.question_number = r.question_number",
+        f"JOIN surveys s ON s.id = q.survey_id AND s.code = {code};",
+        "",
+        "COMMIT;",
+    ]
+    out.write(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def write_responses(path, survey, plan, blocks, wide=False):
+    """Escribe los bloques en CSV, Parquet o (.sql) COPY; devuelve la cantidad de filas"""
+    path = str(path)
+    count = 0
+
+    def tables():
+        nonlocal count
+        for ids, answers in blocks:
+            columns = wide_rows(ids, answers, plan) if wide else long_rows(ids, answers, plan)
+            count += len(columns["result_id"])
+            yield columns
+
+    if path.endswith(".parquet"):
+        writer = ChunkWriter(path)
+        try:
+            for columns in tables():
+                writer.write(columns)
+        finally:
+            writer.close()
+        return count
+
+    with open(path, 'wb') as out:
+        if path.endswith(".sql"):
+            if wide:
+                raise ValueError("El COPY a survey_responses solo existe en el formato largo")
+            write_copy(out, survey, tables())
+            return count
+
+        write = None
+        for columns in tables():
+            columns["answered_at"] = _timestamps(columns["answered_at"])
+            if write is None:
+                out.write((",".join(columns) + "\n").encode("utf-8"))
+                write = _delimited(out, ",")
+            write(columns)
+    return count
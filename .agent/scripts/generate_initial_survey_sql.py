@@ -1,319 +1,137 @@
-import json
+import argparse
+import filecmp
+import os
+import sys
 
-# Data extracted from src/lib/logic.ts
-questions = [
-    {
-        "id": 0,
-        "domain": "Físico",
-        "construct": "Bienestar corporal básico",
-        "type": "RP",
-        "text": "¿Dormís lo suficiente como para sentirte descansado/a la mayoría de los días?",
-        "weight": 0.6,
-        "severity": 0.9,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 1,
-        "domain": "Físico",
-        "construct": "Bienestar corporal básico",
-        "type": "FO",
-        "text": "¿Tu jornada laboral permite mantener horarios regulares de descanso?",
-        "weight": 0.6,
-        "severity": 0.9,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 2,
-        "domain": "Físico",
-        "construct": "Cuidado físico diario",
-        "type": "RP",
-        "text": "¿Te tomás pequeñas pausas o te movés unos minutos durante tu jornada?",
-        "weight": 0.4,
-        "severity": 0.8,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 3,
-        "domain": "Físico",
-        "construct": "Cuidado físico diario",
-        "type": "FO",
-        "text": "¿El ritmo de trabajo permite hacer pausas breves cuando las necesitás?",
-        "weight": 0.4,
-        "severity": 0.8,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 4,
-        "domain": "Nutricional",
-        "construct": "Hábitos alimentarios básicos",
-        "type": "RP",
-        "text": "¿Mantenés horarios mínimos para comer sin saltearte comidas?",
-        "weight": 1.0,
-        "severity": 0.7,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 5,
-        "domain": "Nutricional",
-        "construct": "Hábitos alimentarios básicos",
-        "type": "FO",
-        "text": "¿Podés comer sin apuros durante tu jornada laboral?",
-        "weight": 1.0,
-        "severity": 0.7,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 6,
-        "domain": "Emocional",
-        "construct": "Tensión mental/emocional",
-        "type": "RP",
-        "text": "¿Podés manejar el estrés diario sin sentirte desbordado/a?",
-        "weight": 0.4,
-        "severity": 0.9,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 7,
-        "domain": "Emocional",
-        "construct": "Tensión mental/emocional",
-        "type": "FO",
-        "text": "¿Las exigencias del trabajo mantienen tu nivel de estrés en algo manejable?",
-        "weight": 0.4,
-        "severity": 0.9,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 8,
-        "domain": "Emocional",
-        "construct": "Manejo emocional",
-        "type": "RP",
-        "text": "¿Lográs regular tus emociones en situaciones tensas?",
-        "weight": 0.35,
-        "severity": 0.85,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 9,
-        "domain": "Emocional",
-        "construct": "Manejo emocional",
-        "type": "FO",
-        "text": "¿El ambiente laboral favorece un clima emocional saludable?",
-        "weight": 0.35,
-        "severity": 0.85,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 10,
-        "domain": "Emocional",
-        "construct": "Satisfacción emocional",
-        "type": "RP",
-        "text": "¿Disfrutás al menos una parte de tu trabajo en el día a día?",
-        "weight": 0.25,
-        "severity": 0.7,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 11,
-        "domain": "Emocional",
-        "construct": "Satisfacción emocional",
-        "type": "FO",
-        "text": "¿El entorno laboral favorece experiencias positivas durante la jornada?",
-        "weight": 0.25,
-        "severity": 0.7,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 12,
-        "domain": "Social",
-        "construct": "Vínculos sociales",
-        "type": "RP",
-        "text": "¿Te involucrás activamente para mantener relaciones positivas con tu equipo?",
-        "weight": 0.55,
-        "severity": 0.8,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 13,
-        "domain": "Social",
-        "construct": "Vínculos sociales",
-        "type": "FO",
-        "text": "¿Te sentís incluido/a y bien tratado/a por tu equipo?",
-        "weight": 0.55,
-        "severity": 0.8,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 14,
-        "domain": "Social",
-        "construct": "Intercambio humano",
-        "type": "RP",
-        "text": "¿Pedís ayuda cuando realmente la necesitás?",
-        "weight": 0.45,
-        "severity": 0.7,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 15,
-        "domain": "Social",
-        "construct": "Intercambio humano",
-        "type": "FO",
-        "text": "¿Tus compañeros suelen brindarte apoyo cuando lo necesitás?",
-        "weight": 0.45,
-        "severity": 0.7,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 16,
-        "domain": "Familiar",
-        "construct": "Armonía trabajo–vida",
-        "type": "RP",
-        "text": "¿Lográs organizar tu vida personal sin que se vea afectada constantemente por el trabajo?",
-        "weight": 0.6,
-        "severity": 0.85,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 17,
-        "domain": "Familiar",
-        "construct": "Armonía trabajo–vida",
-        "type": "FO",
-        "text": "¿La empresa respeta tus horarios y límites personales fuera del trabajo?",
-        "weight": 0.6,
-        "severity": 0.85,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 18,
-        "domain": "Familiar",
-        "construct": "Soporte del entorno",
-        "type": "RP",
-        "text": "¿Sentís apoyo de tu entorno para cumplir tus responsabilidades laborales?",
-        "weight": 0.4,
-        "severity": 0.7,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 19,
-        "domain": "Familiar",
-        "construct": "Soporte del entorno",
-        "type": "FO",
-        "text": "¿La empresa comprende y acompaña situaciones personales cuando es necesario?",
-        "weight": 0.4,
-        "severity": 0.7,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 20,
-        "domain": "Económico",
-        "construct": "Seguridad económica",
-        "type": "RP",
-        "text": "¿Sentís tranquilidad en cómo manejás tus finanzas personales?",
-        "weight": 0.6,
-        "severity": 0.85,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 21,
-        "domain": "Económico",
-        "construct": "Seguridad económica",
-        "type": "FO",
-        "text": "¿La estabilidad de tu ingreso te permite sentir tranquilidad mes a mes?",
-        "weight": 0.6,
-        "severity": 0.85,
-        "personal_weight": 0,
-        "org_weight": 1
-    },
-    {
-        "id": 22,
-        "domain": "Económico",
-        "construct": "Gestión económica personal",
-        "type": "RP",
-        "text": "¿Tenés tus finanzas personales organizadas de manera clara?",
-        "weight": 0.4,
-        "severity": 0.8,
-        "personal_weight": 1,
-        "org_weight": 0
-    },
-    {
-        "id": 23,
-        "domain": "Económico",
-        "construct": "Gestión económica personal",
-        "type": "FO",
-        "text": "¿Recibís tu información salarial de forma clara y confiable?",
-        "weight": 0.4,
-        "severity": 0.8,
-        "personal_weight": 0,
-        "org_weight": 1
-    }
-]
+from ebi_surveys.excel import SurveyValidationError, domain_weight_warning, import_survey, open_workbook
+from ebi_surveys.logic_ts import domains_config, load_questions
+from ebi_surveys.sql import DEFAULT_BATCH_SIZE, FORMATS, question_row, seed_sql, write_lines
+
+WORKSPACE = "/Users/leandrofierro/Workspaces/ebi-360"
+OUTPUT_FILE = f"{WORKSPACE}/.agent/migrations/seed_ebi360_survey.sql"
+LOGIC_TS = f"{WORKSPACE}/src/lib/logic.ts"
 
 survey_code = "EBI360"
 survey_name = "EBI 360 v2.0"
 survey_version = "2.0"
 
-scoring_config = {
-    "scoring_method": "weighted_average",
-    "domains": [
-        {"name": "Físico", "weight": 1.0, "questions": [0, 1, 2, 3]},
-        {"name": "Nutricional", "weight": 1.0, "questions": [4, 5]},
-        {"name": "Emocional", "weight": 1.0, "questions": [6, 7, 8, 9, 10, 11]},
-        {"name": "Social", "weight": 1.0, "questions": [12, 13, 14, 15]},
-        {"name": "Familiar", "weight": 1.0, "questions": [16, 17, 18, 19]},
-        {"name": "Económico", "weight": 1.0, "questions": [20, 21, 22, 23]}
-    ],
-    "thresholds": {
-        "low": 0,
-        "medium": 5,
-        "high": 7,
-        "excellent": 9
-    }
+THRESHOLDS = {
+    "low": 0,
+    "medium": 5,
+    "high": 7,
+    "excellent": 9
 }
 
-sql = []
-sql.append("-- 🛠️ Migración de Encuesta Base EBI 360")
-sql.append("BEGIN;")
-sql.append("\n-- 1. Insertar Encuesta")
-sql.append(f"INSERT INTO surveys (code, name, description, survey_type, version, status, is_base, calculation_algorithm)")
-sql.append(f"VALUES ('{survey_code}', '{survey_name}', 'Evaluación de Bienestar Integral 360', 'base', '{survey_version}', 'active', true, '{json.dumps(scoring_config)}');")
 
-sql.append("\n-- 2. Obtener ID de la encuesta")
-sql.append("DO $$")
-sql.append("DECLARE")
-sql.append("    v_survey_id UUID;")
-sql.append("BEGIN")
-sql.append(f"    SELECT id INTO v_survey_id FROM surveys WHERE code = '{survey_code}';")
+def scoring_config(questions):
+    # Los dominios salen de las preguntas, igual que `domains` en logic.ts
+    return {
+        "scoring_method": "weighted_average",
+        "domains": domains_config(questions),
+        "thresholds": THRESHOLDS,
+    }
+
+
+def build_survey(questions):
+    return {
+        "code": survey_code,
+        "name": survey_name,
+        "description": "Evaluación de Bienestar Integral 360",
+        "survey_type": "base",
+        "version": survey_version,
+        "is_base": True,
+        "calculation_algorithm": scoring_config(questions),
+    }
+
+
+def write_migration(output, survey, rows, args, title):
+    # Se escribe a un temporal: con Excel los errores de las preguntas se
+    # conocen recién al terminar de recorrer la hoja
+    lines = seed_sql(survey, rows, args.format, args.batch_size, title=title)
+    tmp = f"{output}.tmp"
+    with open(tmp, "w") as f:
+        write_lines(f, lines)
+    return tmp
+
+
+def publish(tmp, output):
+    """Reemplaza output con tmp solo si cambió (para poder correrlo en cada build)"""
+    if os.path.exists(output) and filecmp.cmp(tmp, output, shallow=False):
+        os.remove(tmp)
+        return False
+    os.replace(tmp, output)
+    return True
+
+
+def import_excel(args):
+    """Genera la migración desde un libro con la plantilla de encuestas"""
+    workbook = open_workbook(args.excel)
+    try:
+        survey, rows, errors = import_survey(workbook)
+        if errors:
+            # Se recorren igual las preguntas para reportar todos los errores juntos
+            for _ in rows:
+                pass
+            raise SurveyValidationError(errors + rows.finish())
+        warning = domain_weight_warning(survey["calculation_algorithm"])
+        if warning:
+            print(f"⚠️  {warning}")
+
+        output = args.output or f"{WORKSPACE}/.agent/migrations/seed_{survey['code'].lower()}_survey.sql"
+        title = f"Migración de Encuesta {survey['code']} (GENERADO DESDE {os.path.basename(args.excel)})"
+        tmp = write_migration(output, survey, rows, args, title)
+    finally:
+        workbook.close()
+
+    errors = rows.finish()
+    if errors:
+        os.remove(tmp)
+        raise SurveyValidationError(errors)
+    return output, publish(tmp, output), rows.count
+
+
+def positive_int(value):
+    """Tipo de argparse: entero mayor que 0"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"tiene que ser al menos 1 (se pidió {value})")
+    return number
+
 
-sql.append("\n    -- 3. Insertar Preguntas")
-for q in questions:
-    q_sql = f"    INSERT INTO survey_questions (survey_id, question_number, domain, construct, question_type, question_text, weight, severity, personal_weight, org_weight, display_order)"
-    q_sql += f" VALUES (v_survey_id, {q['id']}, '{q['domain']}', '{q['construct']}', '{q['type']}', '{q['text']}', {q['weight']}, {q['severity']}, {q['personal_weight']}, {q['org_weight']}, {q['id']});"
-    sql.append(q_sql)
+def main():
+    parser = argparse.ArgumentParser(description="Genera la migración de la encuesta base EBI 360")
+    parser.add_argument("--format", choices=FORMATS, default="statements",
+                        help="statements: un INSERT por pregunta; batched: INSERTs multi-fila; "
+                             "copy: COPY FROM STDIN (requiere psql)")
+    parser.add_argument("--batch-size", type=positive_int, default=DEFAULT_BATCH_SIZE,
+                        help="Preguntas por INSERT en el formato batched")
+    parser.add_argument("--excel", metavar="XLSX",
+                        help="Importar la encuesta desde un Excel con la plantilla "
+                             "(Metadata / Questions / Algorithm) en lugar de la lista de este script")
+    parser.add_argument("--logic", default=LOGIC_TS,
+                        help="logic.ts de donde se leen las preguntas de la encuesta base")
+    parser.add_argument("-o", "--output")
+    args = parser.parse_args()
 
-sql.append("END $$;")
-sql.append("\nCOMMIT;")
+    if args.excel:
+        try:
+            output, changed, count = import_excel(args)
+        except SurveyValidationError as e:
+            for error in e.errors:
+                print(f"❌ ERROR: {error}")
+            sys.exit(1)
+        print(f"✅ {count} preguntas importadas de {os.path.basename(args.excel)}")
+    else:
+        output = args.output or OUTPUT_FILE
+        questions = load_questions(args.logic)
+        rows = (question_row(q) for q in questions)
+        tmp = write_migration(output, build_survey(questions), rows, args, "Migración de Encuesta Base EBI 360")
+        changed = publish(tmp, output)
 
-with open("/Users/leandrofierro/Workspaces/ebi-360/.agent/migrations/seed_ebi360_survey.sql", "w") as f:
-    f.write("\n".join(sql))
+    if changed:
+        print(f"✅ Script de migración ({args.format}) generado en {os.path.relpath(output, WORKSPACE)}")
+    else:
+        print(f"⏭️  Sin cambios en {os.path.relpath(output, WORKSPACE)}")
 
-print("✅ Script de migración generado en .agent/migrations/seed_ebi360_survey.sql")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Generador de respuestas sintéticas de la encuesta EBI 360
+Escribe millones de filas con la forma de survey_responses (CSV, Parquet o
+un script COPY para psql) por bloques, con un seed fijo: es el fixture de
+las pruebas de carga de scoring, agregados y carga a la base
+"""
+
+import argparse
+import os
+import time
+
+from ebi_surveys.logic_ts import load_questions
+from ebi_surveys.plan import survey_plan
+from ebi_surveys.synthetic import (
+    DEFAULT_AREAS, DEFAULT_COMPANIES, DEFAULT_CORRELATION, DEFAULT_DAYS, DEFAULT_MISSING, DEFAULT_RESULTS,
+    DEFAULT_SEED, DEFAULT_START, generate, population, write_responses,
+)
+from generate_initial_survey_sql import LOGIC_TS, WORKSPACE, build_survey
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera respuestas sintéticas de la encuesta EBI 360")
+    parser.add_argument("output", help="Archivo de salida: .csv, .parquet o .sql (COPY para psql)")
+    parser.add_argument("-n", "--results", type=int, default=DEFAULT_RESULTS,
+                        help=f"Resultados (encuestas completas) a generar (por defecto {DEFAULT_RESULTS})")
+    parser.add_argument("--companies", type=int, default=DEFAULT_COMPANIES, help="Cantidad de empresas")
+    parser.add_argument("--areas", type=int, default=DEFAULT_AREAS, help="Áreas por empresa")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed (mismo seed, mismos datos)")
+    parser.add_argument("--correlation", type=float, default=DEFAULT_CORRELATION,
+                        help="Correlación entre dominios de una misma persona (0-1)")
+    parser.add_argument("--missing", type=float, default=DEFAULT_MISSING,
+                        help="Proporción de preguntas sin responder")
+    parser.add_argument("--start", default=DEFAULT_START, help="Fecha del primer resultado (answered_at)")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Días que cubren los resultados")
+    parser.add_argument("--wide", action="store_true",
+                        help="Una fila por resultado con columnas q0..qN (en lugar de una por respuesta)")
+    parser.add_argument("--logic", default=LOGIC_TS, help="logic.ts con las preguntas")
+    args = parser.parse_args()
+
+    questions = load_questions(args.logic)
+    survey = build_survey(questions)
+    plan = survey_plan(survey, questions)
+
+    print(f"🧪 Generando {args.results} resultados de {args.companies} empresa(s) x {args.areas} área(s), seed {args.seed}...")
+    start = time.perf_counter()
+    people = population(plan, args.companies, args.areas, args.seed)
+    blocks = generate(plan, people, args.results, args.seed, args.correlation, args.missing, args.start, args.days)
+    rows = write_responses(args.output, survey, plan, blocks, wide=args.wide)
+
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.output) / 1e6
+    print(f"✅ {rows} filas ({size:.1f} MB) en {elapsed:.2f}s, {rows / elapsed:,.0f} filas/s")
+    print(f"   📄 {os.path.relpath(args.output, WORKSPACE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Scoring offline de un export de survey_responses (CSV o Parquet)
+Calcula puntaje global, por dominio, personal/organizacional y bandas de
+toda la matriz de respuestas de una vez, con el mismo cálculo que la app
+"""
+
+import argparse
+import json
+import os
+import time
+
+from ebi_surveys.logic_ts import load_questions
+from ebi_surveys.plan import compile_plan, survey_plan
+from ebi_surveys.scoring import answer_matrix, read_table, score_answers, score_columns, write_table
+from ebi_surveys.streaming import (
+    DEFAULT_CHUNK_SIZE, RunningTotals, answered_domains, group_keys, score_stream, write_rows,
+)
+from generate_initial_survey_sql import LOGIC_TS, WORKSPACE, build_survey
+
+
+def load_plan(path, questions):
+    """Plan de la encuesta base EBI 360, o de un calculation_algorithm en JSON"""
+    if not path:
+        return survey_plan(build_survey(questions), questions)
+    with open(path, 'r', encoding='utf-8') as f:
+        return compile_plan(questions, json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calcula los puntajes de un export de survey_responses")
+    parser.add_argument("input", help="Export en CSV o Parquet (formato ancho q0..qN o largo)")
+    parser.add_argument("-o", "--output", help="CSV o .parquet de salida (por defecto <input>_scores.csv)")
+    parser.add_argument("--algorithm", help="JSON con el calculation_algorithm (por defecto el de EBI 360)")
+    parser.add_argument("--logic", default=LOGIC_TS, help="logic.ts con las preguntas")
+    parser.add_argument("--chunk-size", type=int, nargs="?", const=DEFAULT_CHUNK_SIZE,
+                        help=f"Procesar en streaming, de a N filas (por defecto {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--summary", metavar="CSV",
+                        help="Promedios por empresa y dominio (columna company_id)")
+    parser.add_argument("--no-scores", action="store_true",
+                        help="En streaming, no escribir los puntajes por resultado (solo --summary)")
+    args = parser.parse_args()
+
+    questions = load_questions(args.logic)
+    plan = load_plan(args.algorithm, questions)
+    output = args.output or f"{os.path.splitext(args.input)[0]}_scores.csv"
+
+    if args.chunk_size:
+        stream(args, plan, output)
+        return
+
+    print(f"📥 Leyendo {args.input}...")
+    start = time.perf_counter()
+    ids, answers = answer_matrix(read_table(args.input), len(questions))
+    loaded = time.perf_counter()
+
+    scores = score_answers(answers, plan)
+    scored = time.perf_counter()
+
+    write_table(output, score_columns(ids, scores, plan))
+    print(f"✅ {len(answers)} resultados: lectura {loaded - start:.2f}s, "
+          f"scoring {scored - loaded:.2f}s, escritura {time.perf_counter() - scored:.2f}s")
+    print(f"   📄 {os.path.relpath(output, WORKSPACE)}")
+
+    if args.summary:
+        totals = RunningTotals(plan)
+        totals.add(group_keys(ids, len(answers)), scores, answered_domains(answers, plan))
+        write_rows(args.summary, totals.rows())
+        print(f"   📄 {os.path.relpath(args.summary, WORKSPACE)}")
+
+
+def stream(args, plan, output):
+    """Modo streaming: bloques de --chunk-size filas y totales corrientes por empresa"""
+    print(f"🌊 Procesando {args.input} en bloques de {args.chunk_size} filas...")
+    start = time.perf_counter()
+    totals, processed = score_stream(args.input, plan, args.chunk_size,
+                                     output=None if args.no_scores else output)
+    print(f"✅ {processed} resultados de {len(totals.groups)} empresa(s) en {time.perf_counter() - start:.2f}s")
+    if not args.no_scores:
+        print(f"   📄 {os.path.relpath(output, WORKSPACE)}")
+    if args.summary:
+        write_rows(args.summary, totals.rows())
+        print(f"   📄 {os.path.relpath(args.summary, WORKSPACE)}")
+
+if __name__ == "__main__":
+    main()
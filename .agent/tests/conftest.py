@@ -0,0 +1,64 @@
+"""
+Fixtures compartidas de los tests de .agent
+
+Los scripts se importan como en los generadores (ebi_docs y ebi_surveys
+como paquetes de nivel superior), así que acá se agregan .agent y
+.agent/scripts al path. Las preguntas salen del logic.ts del repo, no de la
+ruta de WORKSPACE.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+AGENT_DIR = Path(__file__).resolve().parents[1]
+REPO_DIR = AGENT_DIR.parent
+LOGIC_TS = REPO_DIR / "src" / "lib" / "logic.ts"
+
+sys.path[:0] = [str(AGENT_DIR), str(AGENT_DIR / "scripts")]
+
+from ebi_surveys.logic_ts import load_questions  # noqa: E402
+from ebi_surveys.plan import survey_plan  # noqa: E402
+from generate_initial_survey_sql import build_survey  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def questions():
+    return load_questions(LOGIC_TS)
+
+
+@pytest.fixture(scope="session")
+def survey(questions):
+    return build_survey(questions)
+
+
+@pytest.fixture(scope="session")
+def plan(survey, questions):
+    return survey_plan(survey, questions)
+
+
+@pytest.fixture(scope="session")
+def exports(tmp_path_factory, survey, plan):
+    """Exports sintéticos chicos en cada formato: {nombre: ruta}
+
+    Con bloques de 500 resultados el Parquet queda con varios row groups,
+    así que aggregate_sharded tiene rangos que repartir también ahí.
+    """
+    from ebi_surveys import synthetic
+
+    root = tmp_path_factory.mktemp("exports")
+    paths = {}
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(synthetic, "BLOCK_SIZE", 500)
+        people = synthetic.population(plan, n_companies=7, n_areas=3)
+        for name, wide in (("long.csv", False), ("wide.csv", True), ("long.parquet", False), ("wide.parquet", True)):
+            if name.endswith(".parquet"):
+                try:
+                    import pyarrow  # noqa: F401
+                except ImportError:
+                    continue
+            blocks = synthetic.generate(plan, people, n_results=2_000)
+            synthetic.write_responses(root / name, survey, plan, blocks, wide=wide)
+            paths[name] = root / name
+    return paths
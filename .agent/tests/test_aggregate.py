@@ -0,0 +1,76 @@
+"""
+Agregados combinables: el orden de los merge y el reparto entre procesos no cambian el resultado
+"""
+
+import os
+
+import pytest
+
+from ebi_surveys import synthetic
+from ebi_surveys.aggregate import Partial, aggregate_chunk, aggregate_sharded, aggregate_stream
+from ebi_surveys.streaming import iter_answer_chunks, split_ranges
+
+
+@pytest.fixture(scope="module")
+def blocks(plan):
+    """Tres bloques (ids, respuestas) con empresas y áreas en común"""
+    people = synthetic.population(plan, n_companies=4, n_areas=2)
+    ids, answers = next(synthetic.generate(plan, people, n_results=900))
+    return [({k: v[i::3] for k, v in ids.items()}, answers[i::3]) for i in range(3)]
+
+
+def partial(plan, *chunks):
+    result = Partial(plan)
+    for ids, answers in chunks:
+        aggregate_chunk(result, ids, answers)
+    return result
+
+
+def test_merge_is_associative(plan, blocks):
+    a, b, c = blocks
+    left = partial(plan, a).merge(partial(plan, b)).merge(partial(plan, c))
+    right = partial(plan, a).merge(partial(plan, b).merge(partial(plan, c)))
+    reordered = partial(plan, c).merge(partial(plan, a)).merge(partial(plan, b))
+    together = partial(plan, a, b, c)
+    assert list(left.rows()) == list(right.rows()) == list(reordered.rows()) == list(together.rows())
+
+
+def test_merge_rejects_other_resolution(plan):
+    with pytest.raises(ValueError):
+        Partial(plan).merge(Partial(plan, resolution=0.5))
+
+
+@pytest.mark.parametrize("name", ["long.csv", "wide.csv", "long.parquet", "wide.parquet"])
+def test_ranges_cover_the_export(exports, name):
+    if name not in exports:
+        pytest.skip("sin pyarrow")
+    ranges = split_ranges(exports[name], 3)
+    assert len(ranges) > 1
+    for (_, _, end), (_, start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+    if name.endswith(".csv"):
+        assert ranges[-1][2] == os.path.getsize(exports[name])
+
+
+@pytest.mark.parametrize("name", ["long.csv", "wide.csv", "long.parquet", "wide.parquet"])
+def test_sharded_equals_serial(plan, exports, name):
+    if name not in exports:
+        pytest.skip("sin pyarrow")
+    serial = list(aggregate_stream(exports[name], plan, chunk_size=700).rows())
+    for jobs in (2, 3):
+        sharded = aggregate_sharded(exports[name], plan, jobs, chunk_size=700)
+        assert list(sharded.rows()) == serial
+
+
+@pytest.mark.parametrize("name", ["long.csv", "long.parquet"])
+def test_ranges_do_not_split_a_result(plan, exports, name):
+    if name not in exports:
+        pytest.skip("sin pyarrow")
+    seen = set()
+    for part in split_ranges(exports[name], 4):
+        ids = set()
+        for chunk_ids, _ in iter_answer_chunks(exports[name], plan.weight.size, 300, part):
+            ids.update(chunk_ids["result_id"])
+        assert not ids & seen
+        seen |= ids
+    assert len(seen) == 2_000
@@ -0,0 +1,16 @@
+"""
+Assets de la documentación: las páginas solo enlazan archivos publicados
+"""
+
+from ebi_docs.assets import publish_stylesheet, stylesheet_href
+
+
+def test_href_without_asset_stage_points_to_a_written_file(tmp_path):
+    href = stylesheet_href("guias", tmp_path)
+    assert (tmp_path / href).is_file()
+
+
+def test_href_is_the_published_one(tmp_path):
+    published = publish_stylesheet("guias", tmp_path)
+    assert stylesheet_href("guias", tmp_path) == published
+    assert stylesheet_href("encuestas", tmp_path) != published
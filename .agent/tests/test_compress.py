@@ -0,0 +1,71 @@
+"""
+Etapa de compresión: minificado por partes y limpieza de páginas borradas
+"""
+
+import io
+import json
+import random
+
+import pytest
+
+from ebi_docs import compress
+from ebi_docs.compress import MANIFEST_NAME, MinifyingWriter, minify_html, publish_compressed
+
+PAGE = """<!DOCTYPE html>
+<html>
+  <head>
+    <!-- comentario -->
+    <style>
+      body  { margin: 0 }
+    </style>
+    <!--[if IE]> <p>viejo</p> <![endif]-->
+  </head>
+  <body>
+    <h1>Título   con\tespacios</h1>
+    <pre>  código
+      indentado  </pre>
+    <prefix>  no es pre  </prefix>
+    <p>texto
+       en  varias líneas</p>
+    <script>var a  =  1;</script>
+  </body>
+</html>
+"""
+
+
+def streamed(parts):
+    out = io.StringIO()
+    writer = MinifyingWriter(out)
+    for part in parts:
+        writer.write(part)
+    writer.close()
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_streamed_minify_matches_whole_page(monkeypatch, chunk_size):
+    monkeypatch.setattr(compress, "_CHUNK_SIZE", chunk_size)
+    want = minify_html(PAGE)
+    assert streamed([PAGE]) == want
+    assert streamed(PAGE.splitlines(keepends=True)) == want
+    rng = random.Random(chunk_size)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(PAGE)), rng.randint(1, 40)))
+        parts = [PAGE[a:b] for a, b in zip([0] + cuts, cuts + [len(PAGE)])]
+        assert streamed(parts) == want
+
+
+def test_removed_page_loses_copies_and_manifest_entry(tmp_path):
+    pages = [tmp_path / "a.html", tmp_path / "b.html"]
+    for page in pages:
+        page.write_text(minify_html(PAGE), encoding='utf-8')
+    publish_compressed(tmp_path, pages)
+    assert (tmp_path / "b.html.gz").exists()
+
+    pages[1].unlink()
+    entries = publish_compressed(tmp_path, pages[:1])
+
+    assert "b.html" not in entries
+    assert "b.html" not in json.loads((tmp_path / MANIFEST_NAME).read_text(encoding='utf-8'))
+    assert not list(tmp_path.glob("b.html.*"))
+    assert (tmp_path / "a.html.gz").exists()
@@ -0,0 +1,61 @@
+"""
+Build de PDFs con LaTeX: el caché de .tex no puede devolver un PDF viejo
+"""
+
+import subprocess
+
+import pytest
+
+from ebi_docs import latex
+
+
+class FakeLatex:
+    """pandoc y xelatex de mentira: el .tex es `source`, el PDF lo que diga `result`"""
+
+    def __init__(self, monkeypatch, workdir):
+        self.source = ""
+        self.result = ""
+        self.runs = 0
+        monkeypatch.setattr(latex, "LATEX_DIR", workdir)
+        monkeypatch.setattr(latex, "ast_to_file", self.ast_to_file)
+        monkeypatch.setattr(latex, "_run_latex", self.run_latex)
+
+    def ast_to_file(self, ast, path, args):
+        path.write_text(self.source, encoding='utf-8')
+
+    def run_latex(self, workdir, name, source_dir):
+        self.runs += 1
+        if self.result is None:
+            raise subprocess.CalledProcessError(1, ["xelatex"])
+        (workdir / f"{name}.pdf").write_text(self.result, encoding='utf-8')
+
+
+def test_latex_failure_does_not_leave_a_stale_pdf(monkeypatch, tmp_path):
+    engine = FakeLatex(monkeypatch, tmp_path / "latex")
+    output = tmp_path / "guia.pdf"
+    source = tmp_path / "guia.md"
+
+    engine.source, engine.result = "v1", "PDF v1"
+    latex.build_pdf(None, source, output, [])
+    assert output.read_text() == "PDF v1"
+
+    engine.source, engine.result = "v2", None
+    with pytest.raises(subprocess.CalledProcessError):
+        latex.build_pdf(None, source, output, [])
+
+    # El mismo .tex otra vez: tiene que recompilar, no copiar el PDF de v1
+    runs = engine.runs
+    engine.result = "PDF v2"
+    latex.build_pdf(None, source, output, [])
+    assert engine.runs > runs
+    assert output.read_text() == "PDF v2"
+
+
+def test_latex_skips_unchanged_tex(monkeypatch, tmp_path):
+    engine = FakeLatex(monkeypatch, tmp_path / "latex")
+    engine.source, engine.result = "v1", "PDF v1"
+    output = tmp_path / "guia.pdf"
+    latex.build_pdf(None, tmp_path / "guia.md", output, [])
+    runs = engine.runs
+    assert latex.build_pdf(None, tmp_path / "guia.md", output, []) == 0
+    assert engine.runs == runs
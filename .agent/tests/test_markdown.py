@@ -0,0 +1,222 @@
+"""
+El motor de ebi_docs.markdown contra el markdown_to_html original de cada generador
+
+Cada `reference_*` es una copia del conversor que tenía ese generador antes
+del motor compartido, con las correcciones que introdujo el motor (ver
+ebi_docs.markdown) escritas en el código y marcadas `# motor:`. Fuera de
+eso la salida completa de cada dialecto tiene que ser idéntica byte a
+byte, sin normalizar nada.
+"""
+
+import io
+import random
+import re
+
+import pytest
+
+from ebi_docs.markdown import HtmlRenderer, StrategyRenderer, markdown_to_html, read_lines, write_html
+from test_tokenizer import CORPUS, legacy_surveys, random_document, read
+
+# motor: un número de lista solo abre un ítem si lo sigue un espacio
+ORDERED_ITEM = r'^\d+\.\s+'
+
+
+def reference_guides(markdown_text):
+    """markdown_to_html de generate_html_guides.py"""
+    # motor: las guías también convierten checkboxes (mismo renderer que las encuestas)
+    html = legacy_surveys(markdown_text)
+
+    # Listas
+    lines = html.split('\n')
+    in_list = None  # motor: se recuerda qué lista está abierta
+    result = []
+
+    for line in lines:
+        if line.strip().startswith('- ') or line.strip().startswith('* ') or line.strip().startswith('<li'):
+            # motor: cambiar de <ol> a <ul> cierra la lista anterior
+            if in_list != 'ul':
+                if in_list:
+                    result.append(f'</{in_list}>')
+                result.append('<ul>')
+                in_list = 'ul'
+            item = line.strip() if line.strip().startswith('<li') else f'<li>{line.strip()[2:]}</li>'
+            result.append(item)
+        # motor: también los ítems de 10 en adelante
+        elif re.match(ORDERED_ITEM, line.strip()):
+            if in_list != 'ol':
+                if in_list:
+                    result.append(f'</{in_list}>')
+                result.append('<ol>')
+                in_list = 'ol'
+            item = re.sub(r'^\d+\.\s+', '', line.strip())
+            result.append(f'<li>{item}</li>')
+        else:
+            if in_list:
+                # motor: se cierra con la etiqueta que se abrió
+                result.append(f'</{in_list}>')
+                in_list = None
+            if line.strip():
+                if not line.strip().startswith('<'):
+                    result.append(f'<p>{line}</p>')
+                else:
+                    result.append(line)
+            else:
+                result.append('<br>')
+
+    if in_list:
+        result.append(f'</{in_list}>')
+
+    return '\n'.join(result)
+
+
+def reference_surveys(markdown_text):
+    """markdown_to_html de generate_surveys_html.py"""
+    html = legacy_surveys(markdown_text)
+
+    # Listas
+    lines = html.split('\n')
+    current = None  # motor: una sola lista abierta a la vez, nunca intercaladas
+    result = []
+
+    for line in lines:
+        stripped = line.strip()
+
+        # Detectar inicio de lista
+        # motor: los checkboxes son ítems de una <ul>
+        if stripped.startswith('- ') or stripped.startswith('* ') or stripped.startswith('<li'):
+            if current != 'ul':
+                if current:
+                    result.append(f'</{current}>')
+                result.append('<ul>')
+                current = 'ul'
+            item = stripped if stripped.startswith('<li') else f'<li>{stripped[2:]}</li>'
+            result.append(item)
+        elif re.match(ORDERED_ITEM, stripped):
+            if current != 'ol':
+                if current:
+                    result.append(f'</{current}>')
+                result.append('<ol>')
+                current = 'ol'
+            item = re.sub(r'^\d+\.\s+', '', stripped)
+            result.append(f'<li>{item}</li>')
+        else:
+            # Cerrar listas si estaban abiertas
+            if current:
+                result.append(f'</{current}>')
+                current = None
+
+            # Procesar línea normal
+            if stripped:
+                if not stripped.startswith('<'):
+                    result.append(f'<p>{line}</p>')
+                else:
+                    result.append(line)
+            else:
+                result.append('<br>')
+
+    # Cerrar listas al final si quedaron abiertas
+    if current:
+        result.append(f'</{current}>')
+
+    return '\n'.join(result)
+
+
+def reference_strategy(markdown_text):
+    """markdown_to_html de generate_strategy_html.py"""
+    html = markdown_text
+
+    # Headers
+    html = re.sub(r'^# (.*?)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
+    html = re.sub(r'^## (.*?)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
+    html = re.sub(r'^### (.*?)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
+
+    # Bold & Italic
+    html = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html)
+    html = re.sub(r'\*(.*?)\*', r'<em>\1</em>', html)
+
+    # motor: código inline y links, en el mismo orden que los otros dialectos
+    html = re.sub(r'`([^`]+)`', r'<code>\1</code>', html)
+    html = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', html)
+
+    # Checkboxes
+    html = re.sub(r'- \[ \]', r'<li class="checkbox">☐', html)
+    html = re.sub(r'- \[x\]', r'<li class="checkbox checked">☑', html)
+
+    # Listas
+    lines = html.split('\n')
+    result = []
+    in_list = None  # motor: se recuerda qué lista está abierta
+
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('- ') or stripped.startswith('* ') or stripped.startswith('<li'):
+            if in_list != 'ul':
+                if in_list:
+                    result.append(f'</{in_list}>')
+                result.append('<ul>')
+                in_list = 'ul'
+            if stripped.startswith('<li'):
+                result.append(stripped)
+            else:
+                result.append(f'<li>{stripped[2:]}</li>')
+        # motor: listas numeradas
+        elif re.match(ORDERED_ITEM, stripped):
+            if in_list != 'ol':
+                if in_list:
+                    result.append(f'</{in_list}>')
+                result.append('<ol>')
+                in_list = 'ol'
+            item = re.sub(r'^\d+\.\s+', '', stripped)
+            result.append(f'<li>{item}</li>')
+        else:
+            if in_list:
+                result.append(f'</{in_list}>')
+                in_list = None
+            if stripped:
+                if not stripped.startswith('<'):
+                    result.append(f'<p>{line}</p>')
+                else:
+                    result.append(line)
+
+    if in_list:
+        result.append(f'</{in_list}>')
+
+    return '\n'.join(result)
+
+
+# Dialecto: (conversor de referencia, renderer que usa ese generador)
+DIALECTS = {
+    "guides": (reference_guides, HtmlRenderer()),
+    "surveys": (reference_surveys, HtmlRenderer()),
+    "strategy": (reference_strategy, StrategyRenderer()),
+}
+
+
+def test_corpus_is_not_empty():
+    assert len(CORPUS) > 10
+
+
+@pytest.mark.parametrize("dialect", DIALECTS)
+@pytest.mark.parametrize("path", CORPUS, ids=[p.name for p in CORPUS])
+def test_matches_reference_converter(path, dialect):
+    reference, renderer = DIALECTS[dialect]
+    text = read(path)
+    assert markdown_to_html(text, renderer) == reference(text)
+
+
+@pytest.mark.parametrize("dialect", DIALECTS)
+def test_random_documents_match_reference_converter(dialect):
+    reference, renderer = DIALECTS[dialect]
+    rng = random.Random(dialect)
+    for _ in range(3000):
+        text = random_document(rng)
+        assert markdown_to_html(text, renderer) == reference(text), text
+
+
+@pytest.mark.parametrize("dialect", DIALECTS)
+@pytest.mark.parametrize("path", CORPUS, ids=[p.name for p in CORPUS])
+def test_streaming_matches_whole_document(path, dialect):
+    _, renderer = DIALECTS[dialect]
+    out = io.StringIO()
+    write_html(out, read_lines(path), renderer)
+    assert out.getvalue() == markdown_to_html(read(path), renderer)
@@ -0,0 +1,100 @@
+"""
+Paridad del scorer por lotes con el cálculo de la app
+
+La referencia es una copia literal, respuesta por respuesta, de
+calculateScore (src/lib/logic.ts) y del armado de dominios y global de
+src/app/resultados/ResultsPageClient.tsx, incluido Math.round.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from ebi_surveys.scoring import round_half_up, score_answers
+
+
+def math_round(x):
+    """Math.round(x * 10) / 10 de JavaScript (mitades hacia +infinito)"""
+    return math.floor(x * 10 + 0.5) / 10
+
+
+def calculate_score(value, question):
+    """calculateScore de src/lib/logic.ts"""
+    return (value / 5) * question["weight"] * question["severity"]
+
+
+def app_scores(answers, questions, algorithm):
+    """(puntaje por dominio, global) como los calcula ResultsPageClient.tsx"""
+    domain_scores = {}
+    total_weighted = total_weight = 0
+    for domain in algorithm["domains"]:
+        domain_sum = domain_max = 0
+        for q in questions:
+            if q["id"] not in domain["questions"]:
+                continue
+            value = answers.get(q["id"]) or 0
+            if value > 0:
+                domain_sum += calculate_score(value, q)
+                domain_max += 1 * q["weight"] * q["severity"]
+        normalized = domain_sum / domain_max * 10 if domain_max > 0 else 0
+        domain_scores[domain["name"]] = math_round(normalized)
+        total_weighted += normalized * (domain.get("weight") or 1)
+        total_weight += domain.get("weight") or 1
+    return domain_scores, math_round(total_weighted / total_weight) if total_weight > 0 else 0
+
+
+def app_band(score, thresholds):
+    """El threshold más alto que alcanza el puntaje (el más bajo si no alcanza ninguno)"""
+    reached = [(value, name) for name, value in thresholds.items() if score >= value]
+    return max(reached)[1] if reached else min((value, name) for name, value in thresholds.items())[1]
+
+
+# Casos fijos: respuestas -> (todos los dominios, global)
+FIXTURES = [
+    ("todo 5", lambda n: [5] * n, 10.0, 10.0),
+    ("todo 1", lambda n: [1] * n, 2.0, 2.0),
+    ("todo 3", lambda n: [3] * n, 6.0, 6.0),
+    ("sin respuestas", lambda n: [0] * n, 0.0, 0.0),
+]
+
+
+@pytest.mark.parametrize("name, answers, domain, global_score", FIXTURES, ids=[f[0] for f in FIXTURES])
+def test_fixed_cases(plan, name, answers, domain, global_score):
+    scores = score_answers(np.array([answers(plan.weight.size)], dtype=float), plan)
+    assert round_half_up(scores.domain[0]).tolist() == [domain] * len(plan.domains)
+    assert round_half_up(scores.global_score[0]) == global_score
+
+
+def test_matches_app_calculation(plan, questions, survey):
+    algorithm = survey["calculation_algorithm"]
+    rng = np.random.default_rng(360)
+    answers = rng.integers(1, 6, (500, len(questions))).astype(float)
+    answers[rng.random(answers.shape) < 0.15] = 0
+    answers[0] = 0  # un resultado vacío
+    answers[1, :4] = 0  # un dominio entero sin responder
+
+    scores = score_answers(answers, plan)
+    domains = round_half_up(scores.domain)
+    global_scores = round_half_up(scores.global_score)
+    band_names = np.asarray(plan.band_names)
+    for i, row in enumerate(answers):
+        expected_domains, expected_global = app_scores(
+            {q["id"]: row[j] for j, q in enumerate(questions)}, questions, algorithm)
+        assert dict(zip(plan.domains, domains[i].tolist())) == expected_domains
+        assert global_scores[i] == expected_global
+        assert band_names[scores.global_bands[i]] == app_band(expected_global, algorithm["thresholds"])
+        for d, name in enumerate(plan.domains):
+            assert band_names[scores.domain_bands[i, d]] == app_band(expected_domains[name], algorithm["thresholds"])
+
+
+def test_question_scores_are_calculate_score(plan, questions):
+    answers = np.arange(len(questions), dtype=float)[None, :] % 5 + 1
+    scores = score_answers(answers, plan)
+    expected = [calculate_score(answers[0, j], q) for j, q in enumerate(questions)]
+    np.testing.assert_allclose(scores.question[0], expected)
+
+
+def test_rejects_wrong_number_of_questions(plan):
+    with pytest.raises(ValueError):
+        score_answers(np.ones((2, plan.weight.size + 1)), plan)
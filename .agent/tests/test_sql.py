@@ -0,0 +1,28 @@
+"""
+Emisores de SQL de la encuesta: validación de argumentos antes de escribir
+"""
+
+import argparse
+
+import pytest
+
+from ebi_surveys.sql import batched, seed_sql
+from generate_initial_survey_sql import positive_int, write_migration
+
+
+@pytest.mark.parametrize("size", [0, -1])
+def test_batch_size_below_one(survey, size):
+    with pytest.raises(ValueError):
+        batched(survey, [], size)
+    with pytest.raises(ValueError):
+        seed_sql(survey, [], "batched", size)
+    with pytest.raises(argparse.ArgumentTypeError):
+        positive_int(str(size))
+
+
+def test_invalid_batch_size_leaves_no_temp_file(survey, tmp_path):
+    output = tmp_path / "seed.sql"
+    args = argparse.Namespace(format="batched", batch_size=0)
+    with pytest.raises(ValueError):
+        write_migration(str(output), survey, [], args, "seed")
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,76 @@
+"""
+Scoring por bloques contra el scoring en memoria: la misma salida, byte a byte
+"""
+
+import numpy as np
+import pytest
+
+from ebi_surveys.scoring import answer_matrix, read_table, score_answers, score_columns, write_table
+from ebi_surveys.streaming import (
+    RunningTotals, answered_domains, group_keys, score_stream, tenths_mean, write_rows,
+)
+
+NAMES = ["long.csv", "wide.csv", "long.parquet", "wide.parquet"]
+
+
+def in_memory(path, plan, output, summary):
+    """Lo que hace score_responses.py sin --chunk-size"""
+    ids, answers = answer_matrix(read_table(path), plan.weight.size)
+    scores = score_answers(answers, plan)
+    write_table(output, score_columns(ids, scores, plan))
+    totals = RunningTotals(plan)
+    totals.add(group_keys(ids, len(answers)), scores, answered_domains(answers, plan))
+    write_rows(summary, totals.rows())
+
+
+@pytest.mark.parametrize("name", NAMES)
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_streaming_matches_in_memory(plan, exports, tmp_path, name, suffix):
+    if name not in exports:
+        pytest.skip("sin pyarrow")
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    in_memory(exports[name], plan, tmp_path / f"memory{suffix}", tmp_path / "memory_summary.csv")
+    expected = (tmp_path / f"memory{suffix}").read_bytes()
+    expected_summary = (tmp_path / "memory_summary.csv").read_bytes()
+
+    for chunk_size in (333, 700, 10_000):
+        output = tmp_path / f"stream{chunk_size}{suffix}"
+        totals, _ = score_stream(exports[name], plan, chunk_size, output=output)
+        write_rows(tmp_path / "stream_summary.csv", totals.rows())
+        if suffix == ".csv":
+            assert output.read_bytes() == expected
+        else:
+            import pyarrow.parquet as pq
+            assert pq.read_table(output).equals(pq.read_table(tmp_path / f"memory{suffix}"))
+        assert (tmp_path / "stream_summary.csv").read_bytes() == expected_summary
+
+
+def test_summary_does_not_depend_on_block_order(plan):
+    # 7.3 + 7.4 + 7.2 + 7.4 = 29.3: en float la suma depende del orden en que
+    # llegan los bloques; en décimas enteras no
+    answers = np.zeros((4, plan.weight.size))
+    scores = score_answers(answers, plan)._replace(global_score=np.array([7.3, 7.4, 7.2, 7.4]))
+    answered = answered_domains(answers, plan)
+    summaries = []
+    for order in ([0, 1, 2, 3], [3, 2, 1, 0], [2, 0, 3, 1]):
+        totals = RunningTotals(plan)
+        for i in order:
+            totals.add(["a"], type(scores)(*(field[i:i + 1] for field in scores)), answered[i:i + 1])
+        summaries.append(list(totals.rows()))
+    assert summaries[0][0]["global_score"] == tenths_mean(293, 4)
+    assert summaries[0] == summaries[1] == summaries[2]
+
+
+def test_unknown_group_by(plan, exports):
+    with pytest.raises(ValueError, match="empresa"):
+        score_stream(exports["wide.csv"], plan, 500, group_by="empresa")
+
+
+def test_group_by_defaults():
+    ids = {"company_id": ["a", "b"]}
+    assert group_keys(ids, 2) == ["a", "b"]
+    assert group_keys({}, 2) == ["", ""]
+    assert group_keys(ids, 2, "company_id") == ["a", "b"]
+    with pytest.raises(ValueError):
+        group_keys({}, 2, "company_id")
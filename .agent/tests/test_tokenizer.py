@@ -0,0 +1,121 @@
+"""
+El tokenizador contra la cadena de re.sub de cada conversor original
+
+Cada `legacy_*` es, literal, la parte inline del markdown_to_html que tenía
+cada generador antes del tokenizador (todo lo anterior a `lines =
+html.split('\n')`). Las líneas que emite tokenize con las opciones de ese
+dialecto, unidas con '\n', tienen que ser exactamente ese texto.
+"""
+
+import random
+import re
+
+import pytest
+
+from conftest import AGENT_DIR
+from ebi_docs.fonts import corpus_files
+from ebi_docs.tokenizer import tokenize
+
+CORPUS = [path for path in corpus_files(AGENT_DIR) if path.suffix == ".md"]
+
+
+def legacy_guides(markdown_text):
+    """generate_html_guides.py"""
+    html = markdown_text
+
+    # Headers
+    html = re.sub(r'^# (.*?)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
+    html = re.sub(r'^## (.*?)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
+    html = re.sub(r'^### (.*?)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
+    html = re.sub(r'^#### (.*?)$', r'<h4>\1</h4>', html, flags=re.MULTILINE)
+
+    # Bold
+    html = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html)
+
+    # Italic
+    html = re.sub(r'\*(.*?)\*', r'<em>\1</em>', html)
+
+    # Code inline
+    html = re.sub(r'`([^`]+)`', r'<code>\1</code>', html)
+
+    # Links
+    html = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', html)
+
+    return html
+
+
+def legacy_surveys(markdown_text):
+    """generate_surveys_html.py"""
+    html = legacy_guides(markdown_text)
+
+    # Checkboxes
+    html = re.sub(r'- \[ \]', r'<li class="checkbox">☐', html)
+    html = re.sub(r'- \[x\]', r'<li class="checkbox checked">☑', html)
+
+    return html
+
+
+def legacy_strategy(markdown_text):
+    """generate_strategy_html.py"""
+    html = markdown_text
+
+    # Headers
+    html = re.sub(r'^# (.*?)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
+    html = re.sub(r'^## (.*?)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
+    html = re.sub(r'^### (.*?)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
+
+    # Bold & Italic
+    html = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html)
+    html = re.sub(r'\*(.*?)\*', r'<em>\1</em>', html)
+
+    # Checkboxes
+    html = re.sub(r'- \[ \]', r'<li class="checkbox">☐', html)
+    html = re.sub(r'- \[x\]', r'<li class="checkbox checked">☑', html)
+
+    return html
+
+
+# Dialecto: (conversor original, opciones de tokenize)
+DIALECTS = {
+    "guides": (legacy_guides, dict(checkboxes=False)),
+    "surveys": (legacy_surveys, dict()),
+    "strategy": (legacy_strategy, dict(header_levels=3, code=False, links=False)),
+}
+
+# Fragmentos que disparan cada regla, incluidos los casos raros (``` y
+# backticks sin cierre, ** sueltos, # sin espacio)
+PIECES = [
+    "# ", "## ", "### ", "#### ", "##### ", "#", "**", "*", "`", "```",
+    "[a](b)", "[x", "](y)", "- ", "* ", "- [ ] ", "- [x] ", "1. ", "12. ",
+    "  ", "<div>", "texto", "ñandú", "\n", "\n", "\n", "\n\n",
+]
+
+
+def random_document(rng):
+    return "".join(rng.choice(PIECES) for _ in range(rng.randrange(1, 60)))
+
+
+def tokenized(text, options):
+    return "\n".join(token.line for token in tokenize(text.split("\n"), **options))
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("dialect", DIALECTS)
+@pytest.mark.parametrize("path", CORPUS, ids=[p.name for p in CORPUS])
+def test_corpus_matches_legacy_inline_rules(path, dialect):
+    legacy, options = DIALECTS[dialect]
+    text = read(path)
+    assert tokenized(text, options) == legacy(text)
+
+
+@pytest.mark.parametrize("dialect", DIALECTS)
+def test_random_documents_match_legacy_inline_rules(dialect):
+    legacy, options = DIALECTS[dialect]
+    rng = random.Random(dialect)
+    for _ in range(3000):
+        text = random_document(rng)
+        assert tokenized(text, options) == legacy(text), text